@@ -0,0 +1,317 @@
+"""Dispatcher microbenchmarks.
+
+Feeds synthetic updates into a `Dispatcher` and measures throughput and per-update
+latency for different numbers of handlers, filter depths and pending continuations.
+Nothing is sent to Telegram, handlers never call the api.
+
+Usage:
+    python benchmarks/dispatcher_benchmark.py --output results.json
+    python benchmarks/dispatcher_benchmark.py --handlers 10 100 --processors sequential
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import platform
+import random
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable
+
+from telegrambots.wrapper.types.objects import CallbackQuery, Message, Update
+
+from telegrambots.custom import Dispatcher, TelegramBot
+from telegrambots.custom import callback_query_filters as cf
+from telegrambots.custom import message_filters as mf
+from telegrambots.custom.contexts import ContinuouslyHandler
+from telegrambots.custom.filters import Filter
+from telegrambots.custom.key_resolvers import CallbackQuerySenderId, MessageSenderId
+from telegrambots.custom.processor import (
+    ParallelProcessor,
+    ProcessorTemplate,
+    SequentialProcessor,
+)
+
+PROCESSORS: dict[str, type[ProcessorTemplate[Any]]] = {
+    "sequential": SequentialProcessor,
+    "parallel": ParallelProcessor,
+}
+
+UPDATE_KINDS = ("message", "callback_query")
+
+# -> users that send synthetic updates, continuations are pending for other users.
+ACTIVE_USERS = range(1, 101)
+
+
+@dataclass
+class Scenario:
+    update_kind: str
+    processor: str
+    handlers: int
+    filter_depth: int
+    continuations: int
+
+
+@dataclass
+class Result(Scenario):
+    updates: int
+    seconds: float
+    updates_per_second: float
+    latency_p50_us: float
+    latency_p90_us: float
+    latency_p99_us: float
+    latency_max_us: float
+
+
+class _TimedDispatcher(Dispatcher):
+    """Records the time each update spends from feeding till processed."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.fed_at: dict[int, float] = {}
+        self.latencies: list[float] = []
+        self.done = asyncio.Event()
+        self.expected = 0
+
+    async def feed_update(self, update: Update[Any]):
+        self.fed_at[update.update_id] = time.perf_counter()
+        await super().feed_update(update)
+
+    async def _process_update(self, update: Update[Any]):
+        await super()._process_update(update)
+        self.latencies.append(
+            time.perf_counter() - self.fed_at.pop(update.update_id)
+        )
+        if len(self.latencies) >= self.expected:
+            self.done.set()
+
+
+_ids = itertools.count(1)
+
+
+def _message_update(text: str, user_id: int) -> Update[Any]:
+    return Update.deserialize(
+        {
+            "update_id": next(_ids),
+            "message": {
+                "message_id": next(_ids),
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": {"id": user_id, "is_bot": False, "first_name": "bench"},
+                "text": text,
+            },
+        }
+    )
+
+
+def _callback_query_update(data: str, user_id: int) -> Update[Any]:
+    return Update.deserialize(
+        {
+            "update_id": next(_ids),
+            "callback_query": {
+                "id": str(next(_ids)),
+                "from": {"id": user_id, "is_bot": False, "first_name": "bench"},
+                "chat_instance": "bench",
+                "data": data,
+                "message": {
+                    "message_id": next(_ids),
+                    "date": int(time.time()),
+                    "chat": {"id": user_id, "type": "private"},
+                },
+            },
+        }
+    )
+
+
+def _message_filter(index: int, depth: int) -> Filter[Message]:
+    filter = mf.Regex(f"^/cmd{index}\\b")
+    for level in range(depth - 1):
+        if level % 2 == 0:
+            filter = filter & mf.private
+        else:
+            filter = filter | mf.chat_type("channel")
+    return filter
+
+
+def _callback_query_filter(index: int, depth: int) -> Filter[CallbackQuery]:
+    filter = cf.regex(f"^btn{index}\\b")
+    for level in range(depth - 1):
+        if level % 2 == 0:
+            filter = filter & cf.any_callback
+        else:
+            filter = filter | cf.regex("^never$")
+    return filter
+
+
+async def _noop(_: Any) -> None:
+    return None
+
+
+def _build(scenario: Scenario) -> _TimedDispatcher:
+    dp = _TimedDispatcher(
+        TelegramBot("123456:benchmark"),
+        processor_type=PROCESSORS[scenario.processor],
+    )
+
+    for index in range(scenario.handlers):
+        if scenario.update_kind == "message":
+            dp.add.handlers.message(
+                f"handler_{index}",
+                _noop,
+                _message_filter(index, scenario.filter_depth),
+            )
+        else:
+            dp.add.handlers.callback_query(
+                f"handler_{index}",
+                _noop,
+                _callback_query_filter(index, scenario.filter_depth),
+            )
+
+    if scenario.update_kind == "message":
+        dp.add.handlers.message("continued", _noop, continue_after=["handler_0"])
+        for index in range(scenario.continuations):
+            dp.add_continuously_handler(
+                ContinuouslyHandler(
+                    "continued",
+                    "handler_0",
+                    Message,
+                    [MessageSenderId(10_000 + index)],
+                )
+            )
+    else:
+        dp.add.handlers.callback_query(
+            "continued", _noop, continue_after=["handler_0"]
+        )
+        for index in range(scenario.continuations):
+            dp.add_continuously_handler(
+                ContinuouslyHandler(
+                    "continued",
+                    "handler_0",
+                    CallbackQuery,
+                    [CallbackQuerySenderId(10_000 + index)],
+                )
+            )
+    return dp
+
+
+def _updates(scenario: Scenario, count: int, seed: int) -> list[Update[Any]]:
+    rnd = random.Random(seed)
+    create: Callable[[str, int], Update[Any]]
+    if scenario.update_kind == "message":
+        create, prefix = _message_update, "/cmd"
+    else:
+        create, prefix = _callback_query_update, "btn"
+
+    # -> a few updates match no handler at all.
+    return [
+        create(
+            f"{prefix}{rnd.randrange(int(scenario.handlers * 1.1) + 1)}",
+            rnd.choice(ACTIVE_USERS),
+        )
+        for _ in range(count)
+    ]
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def _run(scenario: Scenario, count: int, warmup: int, seed: int) -> Result:
+    dp = _build(scenario)
+
+    dp.expected = warmup
+    for update in _updates(scenario, warmup, seed):
+        await dp.feed_update(update)
+    if warmup:
+        await dp.done.wait()
+
+    updates = _updates(scenario, count, seed + 1)
+    dp.latencies.clear()
+    dp.done.clear()
+    dp.expected = count
+
+    started = time.perf_counter()
+    for update in updates:
+        await dp.feed_update(update)
+    await dp.done.wait()
+    elapsed = time.perf_counter() - started
+
+    latencies = [x * 1_000_000 for x in dp.latencies]
+    return Result(
+        **asdict(scenario),
+        updates=count,
+        seconds=elapsed,
+        updates_per_second=count / elapsed,
+        latency_p50_us=statistics.median(latencies),
+        latency_p90_us=_percentile(latencies, 90),
+        latency_p99_us=_percentile(latencies, 99),
+        latency_max_us=max(latencies),
+    )
+
+
+def _package_version() -> str:
+    try:
+        from importlib.metadata import version
+
+        return version("telegrambots-custom")
+    except Exception:
+        return "unknown"
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--handlers", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--depths", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--continuations", type=int, nargs="+", default=[0, 100, 1000])
+    parser.add_argument(
+        "--processors", nargs="+", choices=list(PROCESSORS), default=list(PROCESSORS)
+    )
+    parser.add_argument(
+        "--kinds", nargs="+", choices=UPDATE_KINDS, default=list(UPDATE_KINDS)
+    )
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Path to write json results to.")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+
+    results: list[Result] = []
+    for kind, processor, handlers, depth, continuations in itertools.product(
+        args.kinds, args.processors, args.handlers, args.depths, args.continuations
+    ):
+        scenario = Scenario(kind, processor, handlers, depth, continuations)
+        result = asyncio.run(_run(scenario, args.updates, args.warmup, args.seed))
+        results.append(result)
+        print(
+            f"{kind:>14} {processor:>10} handlers={handlers:<5} depth={depth:<2} "
+            f"continuations={continuations:<5} {result.updates_per_second:>10.0f} upd/s "
+            f"p50={result.latency_p50_us:.0f}us p99={result.latency_p99_us:.0f}us"
+        )
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(
+                {
+                    "package_version": _package_version(),
+                    "python": sys.version,
+                    "platform": platform.platform(),
+                    "created_at": time.time(),
+                    "updates_per_scenario": args.updates,
+                    "results": [asdict(result) for result in results],
+                },
+                output,
+                indent=2,
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,4 +1,5 @@
-from typing import Any, Optional, cast, Union
+import time
+from typing import Any, Callable, Optional, cast, Union
 
 from telegrambots.wrapper.client import TelegramBotsClient
 from telegrambots.wrapper.types.methods import (
@@ -101,11 +102,21 @@ from telegrambots.wrapper.types.objects import (
     # InputMediaVideo,
 )
 from .dispatcher import Dispatcher
+from .general import RECEIVED_AT, stamp
 
 
 class TelegramBot(TelegramBotsClient):
-    def __init__(self, token: str):
+    def __init__(self, token: str, base_url: Optional[str] = None):
+        """Creates a new bot client.
+
+        Args:
+            token (`str`): The bot token.
+            base_url (`Optional[str]`, optional): Url of the Bot API server to use instead of `https://api.telegram.org`,
+                like a local Bot API server or `FakeBotApiServer`.
+        """
         super().__init__(token)
+        if base_url is not None:
+            self._base_url = "{}/bot{}/".format(base_url.rstrip("/"), token)
         self._dispatcher: Optional[Dispatcher] = None
 
     @property
@@ -208,25 +219,55 @@ class TelegramBot(TelegramBotsClient):
             )
         )
 
-    async def stream_updates(self, allowed_updates: Optional[list[str]] = None):
+    async def stream_updates(
+        self,
+        allowed_updates: Optional[list[str] | Callable[[], list[str]]] = None,
+    ):
         """Streams updates from Telegram server.
 
         Args:
-            allowed_updates (`Optional[list[str]]`, optional): List the types of updates you want your bot to receive.
+            allowed_updates (`Optional[list[str] | Callable[[], list[str]]]`, optional): List the types of updates
+                you want your bot to receive. A callable is called before each request.
 
         Yields:
             `Update`: Updates received from the server.
         """
+        async for updates in self.stream_update_batches(allowed_updates):
+            for update in updates:
+                yield update
+
+    async def stream_update_batches(
+        self,
+        allowed_updates: Optional[list[str] | Callable[[], list[str]]] = None,
+    ):
+        """Streams updates from Telegram server, as they're received ( up to 100 at once ).
+
+        Args:
+            allowed_updates (`Optional[list[str] | Callable[[], list[str]]]`, optional): List the types of updates
+                you want your bot to receive. A callable is called before each request,
+                so the list can change while streaming ( e.g. `Dispatcher.allowed_updates` ).
+
+        Yields:
+            `list[Update]`: Batches of updates received from the server.
+        """
         offset = 0
 
         while True:
             updates = await self.get_updates(
-                offset, limit=100, timeout=290, allowed_updates=allowed_updates
+                offset,
+                limit=100,
+                timeout=290,
+                allowed_updates=(
+                    allowed_updates() if callable(allowed_updates) else allowed_updates
+                ),
             )
 
-            for update in updates:
-                yield update
-                offset = update.update_id + 1
+            if updates:
+                received_at = time.time()
+                for update in updates:
+                    stamp(update, RECEIVED_AT, received_at)
+                offset = updates[-1].update_id + 1
+                yield updates
 
     async def add_sticker_to_set(
         self,
@@ -2,6 +2,7 @@ from ._contexts.context_template import Context
 from ._contexts.message_context import MessageContext
 from ._contexts.callback_query_context import CallbackQueryContext
 from ._contexts._continuously_handler import ContinuouslyHandler, ContinueWithInfo
+from ._contexts.snapshot import ContextSnapshot, cpu_bound
 
 __all__ = [
     "Context",
@@ -9,4 +10,6 @@ __all__ = [
     "CallbackQueryContext",
     "ContinuouslyHandler",
     "ContinueWithInfo",
+    "ContextSnapshot",
+    "cpu_bound",
 ]
@@ -1,8 +1,10 @@
 from typing import (
     Any,
+    Callable,
     Generic,
     Mapping,
     Optional,
+    TypeVar,
     final,
     TYPE_CHECKING,
 )
@@ -17,6 +19,11 @@ from ...general import TKey
 if TYPE_CHECKING:
     from ...dispatcher import Dispatcher
     from ...client import TelegramBot
+    from ...sessions import Session
+    from .snapshot import ContextSnapshot
+
+
+TResult = TypeVar("TResult")
 
 
 class Context(Generic[TUpdate], Mapping[str, Any]):
@@ -105,6 +112,14 @@ class Context(Generic[TUpdate], Mapping[str, Any]):
             self.__propagation = PropagationExtension(self)
         return self.__propagation
 
+    @final
+    @property
+    def marked_propagation(self) -> Optional[bool]:
+        """Propagation that is marked on `propagation`, without raising. None if nothing is marked."""
+        if self.__propagation is None:
+            return None
+        return self.__propagation.marked
+
     @final
     @property
     def continue_with(self) -> ContinueWithExtensions:
@@ -113,6 +128,36 @@ class Context(Generic[TUpdate], Mapping[str, Any]):
             self.__continue_with = ContinueWithExtensions(self)
         return self.__continue_with
 
+    @final
+    @property
+    def session(self) -> "Session":
+        """Data of the user who sent the update, that is kept between updates."""
+        return self.__dp.sessions.of(self.__update)
+
+    @final
+    @property
+    def chat_session(self) -> "Session":
+        """Data of the chat that the update belongs to, that is kept between updates."""
+        return self.__dp.sessions.of(self.__update, chat=True)
+
+    def snapshot(self) -> "ContextSnapshot[TUpdate]":
+        """Returns a picklable copy of the context, to use in other processes."""
+        from .snapshot import ContextSnapshot
+
+        return ContextSnapshot.of(self)
+
+    async def offload(
+        self, function: Callable[..., TResult], *args: Any, process: bool = False
+    ) -> TResult:
+        """Runs a blocking function in the dispatcher's thread or process pool, and waits for the result.
+
+        Args:
+            function (`Callable[..., TResult]`): The function, for processes it should be picklable.
+            *args (`Any`): Arguments of the function. Use `snapshot()` to pass the context to processes.
+            process (`bool`, optional): Use the process pool instead of the thread pool. Defaults to False.
+        """
+        return await self.dp.run_in_executor(function, *args, process=process)
+
     def try_get_data(
         self, /, name: str, type_of_data: type[TKey] = None
     ) -> Optional[TKey]:
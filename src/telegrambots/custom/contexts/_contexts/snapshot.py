@@ -0,0 +1,158 @@
+import functools
+import importlib
+import pickle
+import re
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Generic,
+    Optional,
+    TypeVar,
+    overload,
+)
+
+from telegrambots.wrapper.types.objects import Update
+
+from ...general import TUpdate
+
+if TYPE_CHECKING:
+    from .context_template import Context
+
+
+TResult = TypeVar("TResult")
+
+
+@dataclass
+class ContextSnapshot(Generic[TUpdate]):
+    """A picklable copy of a context, to send to other processes.
+
+    It has the raw update and handler data ( like filter metadata ), but nothing alive, such as
+    the bot, the dispatcher or it's shared data. Regex matches ( like `matches` of `Regex` filters )
+    are left out too, they can't be pickled. `PatternMatch`es are kept without their `match`.
+    Other handler data should be picklable to send the snapshot to other processes.
+    """
+
+    raw_update: dict[str, Any]
+    handler_tag: str
+    data: dict[str, Any] = field(default_factory=dict)
+    _wrapper_update: Optional[Update[TUpdate]] = field(
+        default=None, repr=False, compare=False
+    )
+
+    @property
+    def wrapper_update(self) -> Update[TUpdate]:
+        if self._wrapper_update is None:
+            self._wrapper_update = Update.deserialize(self.raw_update)  # type: ignore
+        return self._wrapper_update  # type: ignore
+
+    @property
+    def update(self) -> TUpdate:
+        """`TUpdate`: Update instance"""
+        return self.wrapper_update.actual_update
+
+    def __getitem__(self, name: str) -> Any:
+        return self.data[name]
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_wrapper_update"] = None  # -> cheaper to rebuild than to pickle.
+        try:
+            state["data"] = pickle.dumps(self.data)
+        except Exception as e:
+            raise TypeError(
+                f"Data of handler {self.handler_tag} can't be sent to another process: {e}. "
+                "Keep it picklable, or use a thread."
+            ) from e
+        return state
+
+    def __setstate__(self, state: dict[str, Any]):
+        state["data"] = pickle.loads(state["data"])
+        self.__dict__.update(state)
+
+    @classmethod
+    def of(cls, context: "Context[TUpdate]") -> "ContextSnapshot[TUpdate]":
+        """Takes a snapshot of the context."""
+        shared = context.dp.shared_data
+        data = {
+            key: value
+            for key, value in context.kwargs.items()
+            if not (key in shared and shared[key] is value)
+            and not isinstance(value, re.Match)
+        }
+
+        return cls(
+            context.wrapper_update.serialize(),
+            context.handler_tag,
+            data,
+            context.wrapper_update,
+        )
+
+
+def _call_by_reference(module: str, qualname: str, *args: Any) -> Any:
+    # -> runs in worker processes, where decorated functions are replaced by their wrappers.
+    target: Any = importlib.import_module(module)
+    for name in qualname.split("."):
+        target = getattr(target, name)
+    return getattr(target, "__wrapped__", target)(*args)
+
+
+@overload
+def cpu_bound(
+    function: Callable[..., TResult],
+) -> Callable[..., Awaitable[TResult]]:
+    ...
+
+
+@overload
+def cpu_bound(
+    *, process: bool = False
+) -> Callable[[Callable[..., TResult]], Callable[..., Awaitable[TResult]]]:
+    ...
+
+
+def cpu_bound(function: Optional[Callable[..., Any]] = None, *, process: bool = False):
+    """Marks a sync function as CPU bound. It's called with a `ContextSnapshot` ( and other arguments ),
+    in a thread or process pool that the dispatcher owns. The decorated function takes a context instead
+    and is awaited.
+
+    For processes, the function should be defined at module level.
+
+    Example:
+        ```py
+        @cpu_bound(process=True)
+        def count_words(snapshot: ContextSnapshot[Message]) -> int:
+            return len(snapshot.update.text.split())
+
+        @dp.add.handlers.via_decorator.message(mf.text_message)
+        async def handle(context: MessageContext):
+            count = await count_words(context)
+            await context.reply_text(f"{count} words")
+        ```
+
+    Args:
+        process (`bool`, optional): Run in the process pool instead of the thread pool. Defaults to False.
+    """
+
+    def decorator(function: Callable[..., Any]):
+        @functools.wraps(function)
+        async def wrapper(context: "Context[Any]", *args: Any) -> Any:
+            snapshot = context.snapshot()
+            if process:
+                return await context.offload(
+                    _call_by_reference,
+                    function.__module__,
+                    function.__qualname__,
+                    snapshot,
+                    *args,
+                    process=True,
+                )
+            return await context.offload(function, snapshot, *args)
+
+        return wrapper
+
+    if function is not None:
+        return decorator(function)
+    return decorator
@@ -0,0 +1,11 @@
+from ._continuations.store_template import ContinuationStore, Batch
+from ._continuations.memory_store import MemoryContinuationStore
+from ._continuations.sqlite_store import SqliteContinuationStore
+
+
+__all__ = [
+    "ContinuationStore",
+    "Batch",
+    "MemoryContinuationStore",
+    "SqliteContinuationStore",
+]
@@ -0,0 +1,89 @@
+from typing import Any, Hashable, Iterable
+
+from telegrambots.wrapper.types.objects import Update
+
+from ...key_resolvers.key_resolver import AbstractKeyResolver
+from .store_template import Batch, ContinuationStore, index_of, resolve_index
+
+
+class MemoryContinuationStore(ContinuationStore):
+    """Keeps continuations in memory. This is the default store."""
+
+    def __init__(self) -> None:
+        self._next_id = 0
+        self._batches: dict[int, Batch] = {}
+        self._entries: dict[int, list[tuple[type[Any], Any, Hashable]]] = {}
+        self._index: dict[tuple[type[Any], Any, Hashable], set[int]] = {}
+        self._unindexed: dict[type[Any], set[int]] = {}
+        # -> one resolver of each type, used to resolve keys of updates.
+        self._resolvers: dict[
+            type[Any], dict[type[Any], AbstractKeyResolver[Any, Any]]
+        ] = {}
+
+    def __len__(self) -> int:
+        return len(self._batches)
+
+    def add(self, batch: Batch) -> int:
+        self._next_id += 1
+        batch_id = self._next_id
+        self._batches[batch_id] = batch
+
+        entries: dict[tuple[type[Any], Any, Hashable], None] = {}
+        for continuation in batch:
+            index = index_of(continuation)
+            if index is None:
+                entries[(continuation.update_type, None, None)] = None
+                self._unindexed.setdefault(continuation.update_type, set()).add(
+                    batch_id
+                )
+                continue
+
+            resolver_type, key = index
+            resolvers = self._resolvers.setdefault(continuation.update_type, {})
+            if resolver_type not in resolvers:
+                resolvers[resolver_type] = next(
+                    x for x in continuation.keys if type(x) is resolver_type
+                )
+            entry = (continuation.update_type, resolver_type, key)
+            entries[entry] = None
+            self._index.setdefault(entry, set()).add(batch_id)
+
+        self._entries[batch_id] = list(entries)
+        return batch_id
+
+    def candidates(
+        self, update: Update[Any], update_type: type[Any]
+    ) -> Iterable[tuple[int, Batch]]:
+        ids = set(self._unindexed.get(update_type, ()))
+        for resolver_type, resolver in self._resolvers.get(update_type, {}).items():
+            key = resolve_index(resolver, update)
+            if key is None:
+                continue
+            ids.update(self._index.get((update_type, resolver_type, key), ()))
+
+        for batch_id in sorted(ids):
+            batch = self._batches.get(batch_id)
+            if batch is not None:  # -> removed while iterating.
+                yield batch_id, batch
+
+    def remove(self, batch_id: int) -> bool:
+        if self._batches.pop(batch_id, None) is None:
+            return False
+
+        for update_type, resolver_type, key in self._entries.pop(batch_id):
+            if resolver_type is None:
+                ids = self._unindexed[update_type]
+                ids.discard(batch_id)
+                if not ids:
+                    del self._unindexed[update_type]
+                continue
+
+            entry = (update_type, resolver_type, key)
+            ids = self._index[entry]
+            ids.discard(batch_id)
+            if not ids:
+                del self._index[entry]
+        return True
+
+    def update_types(self) -> set[type[Any]]:
+        return {x.update_type for batch in self._batches.values() for x in batch}
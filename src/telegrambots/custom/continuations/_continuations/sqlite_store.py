@@ -0,0 +1,203 @@
+import importlib
+import pickle
+import sqlite3
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from telegrambots.wrapper.types.objects import Update
+
+from ...contexts._contexts._continuously_handler import (
+    ContinuouslyHandler,
+    ContinuouslyHandlerTemplate,
+)
+from ...key_resolvers.key_resolver import AbstractKeyResolver
+from .store_template import Batch, ContinuationStore, index_of, resolve_index
+
+
+def _name_of(cls: type[Any]) -> str:
+    return f"{cls.__module__}:{cls.__qualname__}"
+
+
+def _type_of(name: str) -> type[Any]:
+    module, qualname = name.split(":", 1)
+    target: Any = importlib.import_module(module)
+    for part in qualname.split("."):
+        target = getattr(target, part)
+    return target
+
+
+def _can_pickle(value: Any) -> bool:
+    try:
+        pickle.dumps(value)
+    except Exception:
+        return False
+    return True
+
+
+def _picklable(continuation: ContinuouslyHandlerTemplate):
+    if not isinstance(continuation, ContinuouslyHandler):
+        return continuation
+
+    # -> shared data ( like connections ) is added again when it's handled.
+    return ContinuouslyHandler(
+        continuation.target_tag,
+        continuation.start_tag,
+        continuation.update_type,
+        continuation.keys,
+        continuation.priority,
+        *continuation.args,
+        **{k: v for k, v in continuation.kwargs.items() if _can_pickle(v)},
+    )
+
+
+class SqliteContinuationStore(ContinuationStore):
+    """Keeps continuations in a sqlite database, so they survive restarts
+    and can be shared between processes that use the same file.
+
+    Continuations are pickled, so their keys should be picklable ( keys made by
+    `create_key` with lambdas are not ). Arguments that can't be pickled are skipped.
+
+    Args:
+        path (`str | Path`): Path of the database file.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self._connection = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False
+        )
+        self._connection.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS continuations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                data BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS continuation_keys (
+                batch_id INTEGER NOT NULL REFERENCES continuations (id) ON DELETE CASCADE,
+                update_type TEXT NOT NULL,
+                resolver TEXT,
+                key TEXT
+            );
+            CREATE INDEX IF NOT EXISTS continuation_keys_lookup
+                ON continuation_keys (update_type, resolver, key);
+            CREATE INDEX IF NOT EXISTS continuation_keys_batch
+                ON continuation_keys (batch_id);
+            """
+        )
+        self._resolvers: dict[str, AbstractKeyResolver[Any, Any]] = {}
+
+    def __len__(self) -> int:
+        return self._connection.execute(
+            "SELECT COUNT(*) FROM continuations"
+        ).fetchone()[0]
+
+    def add(self, batch: Batch) -> int:
+        try:
+            data = pickle.dumps(tuple(batch))
+        except Exception:
+            try:
+                data = pickle.dumps(tuple(_picklable(x) for x in batch))
+            except Exception as e:
+                raise ValueError(
+                    "Continuations should be picklable to be stored in sqlite, "
+                    "use key resolver classes instead of `create_key`."
+                ) from e
+
+        rows: list[tuple[str, Optional[str], Optional[str]]] = []
+        for continuation in batch:
+            index = index_of(continuation)
+            if index is None:
+                rows.append((_name_of(continuation.update_type), None, None))
+                continue
+
+            resolver_type, key = index
+            resolver_name = _name_of(resolver_type)
+            if resolver_name not in self._resolvers:
+                self._resolvers[resolver_name] = next(
+                    x for x in continuation.keys if type(x) is resolver_type
+                )
+            rows.append((_name_of(continuation.update_type), resolver_name, repr(key)))
+
+        with self._connection:
+            self._connection.execute("BEGIN IMMEDIATE")
+            batch_id = self._connection.execute(
+                "INSERT INTO continuations (data) VALUES (?)", (data,)
+            ).lastrowid
+            self._connection.executemany(
+                "INSERT INTO continuation_keys VALUES (?, ?, ?, ?)",
+                ((batch_id, *row) for row in rows),
+            )
+        return batch_id  # type: ignore
+
+    def candidates(
+        self, update: Update[Any], update_type: type[Any]
+    ) -> Iterable[tuple[int, Batch]]:
+        type_name = _name_of(update_type)
+
+        conditions = ["resolver IS NULL"]
+        params: list[Any] = [type_name]
+        for (resolver_name,) in self._connection.execute(
+            "SELECT DISTINCT resolver FROM continuation_keys"
+            " WHERE update_type = ? AND resolver IS NOT NULL",
+            (type_name,),
+        ).fetchall():
+            resolver = self._resolver(resolver_name)
+            if resolver is None:
+                continue
+            key = resolve_index(resolver, update)
+            if key is None:
+                continue
+            conditions.append("(resolver = ? AND key = ?)")
+            params += [resolver_name, repr(key)]
+
+        rows = self._connection.execute(
+            "SELECT id, data FROM continuations WHERE id IN ("
+            " SELECT batch_id FROM continuation_keys"
+            f" WHERE update_type = ? AND ({' OR '.join(conditions)})"
+            ") ORDER BY id",
+            params,
+        ).fetchall()
+        for batch_id, data in rows:
+            yield batch_id, pickle.loads(data)
+
+    def remove(self, batch_id: int) -> bool:
+        with self._connection:
+            self._connection.execute("BEGIN IMMEDIATE")
+            removed = self._connection.execute(
+                "DELETE FROM continuations WHERE id = ?", (batch_id,)
+            ).rowcount
+            self._connection.execute(
+                "DELETE FROM continuation_keys WHERE batch_id = ?", (batch_id,)
+            )
+        return removed > 0
+
+    def update_types(self) -> set[type[Any]]:
+        return {
+            _type_of(name)
+            for (name,) in self._connection.execute(
+                "SELECT DISTINCT update_type FROM continuation_keys"
+            )
+        }
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def _resolver(self, name: str) -> Optional[AbstractKeyResolver[Any, Any]]:
+        resolver = self._resolvers.get(name)
+        if resolver is not None:
+            return resolver
+
+        # -> added by another process, take it from one of the stored continuations.
+        row = self._connection.execute(
+            "SELECT data FROM continuations WHERE id = ("
+            " SELECT batch_id FROM continuation_keys WHERE resolver = ? LIMIT 1)",
+            (name,),
+        ).fetchone()
+        if row is None:
+            return None
+        for continuation in pickle.loads(row[0]):
+            for key in continuation.keys:
+                if _name_of(type(key)) == name:
+                    self._resolvers[name] = key
+                    return key
+        return None
@@ -0,0 +1,97 @@
+from abc import ABC, abstractmethod
+from typing import Any, Hashable, Iterable, Optional, Sequence
+
+from telegrambots.wrapper.types.objects import Update
+
+from ...contexts._contexts._continuously_handler import ContinuouslyHandlerTemplate
+from ...key_resolvers.key_resolver import AbstractKeyResolver, KeyResolver
+
+
+Batch = Sequence[ContinuouslyHandlerTemplate]
+"""Continuations that are added together, only one of them is handled."""
+
+
+def index_of(
+    continuation: ContinuouslyHandlerTemplate,
+) -> Optional[tuple[type[AbstractKeyResolver[Any, Any]], Hashable]]:
+    """Returns `(resolver type, key)` of the first key that can be used to index the continuation.
+
+    Keys made by `create_key` ( `KeyResolver` ) carry their own resolve function,
+    so they can't be resolved by type and are skipped. If no key is left, `None` is returned
+    and the continuation should be checked against every update of its type.
+    """
+    for key in continuation.keys:
+        if isinstance(key, KeyResolver):
+            continue
+        try:
+            hash(key.key)
+        except TypeError:
+            continue
+        return type(key), key.key
+    return None
+
+
+def resolve_index(
+    resolver: AbstractKeyResolver[Any, Any], update: Update[Any]
+) -> Optional[Hashable]:
+    """Resolves the key of an update, using a resolver of the same type. `None` if it can't be resolved."""
+    try:
+        return resolver.resolver(resolver.__extractor__(update))
+    except Exception:
+        return None
+
+
+class ContinuationStore(ABC):
+    """Keeps continuations ( `ContinuouslyHandler`s ) that are waiting for next updates.
+
+    Continuations are indexed by their keys, so finding ones that may match an
+    update doesn't need to check all of them.
+    """
+
+    @abstractmethod
+    def add(self, batch: Batch) -> int:
+        """Adds a batch of continuations.
+
+        Args:
+            batch (`Batch`): Continuations that are added together.
+
+        Returns:
+            `int`: Id of the batch, ids are increasing.
+        """
+        ...
+
+    @abstractmethod
+    def candidates(
+        self, update: Update[Any], update_type: type[Any]
+    ) -> Iterable[tuple[int, Batch]]:
+        """Returns batches that may continue with the update, in the order they're added.
+
+        Keys are not fully checked here, `check_keys` of each continuation should be used.
+
+        Args:
+            update (`Update`): The update.
+            update_type (`type`): Type of the update.
+        """
+        ...
+
+    @abstractmethod
+    def remove(self, batch_id: int) -> bool:
+        """Removes a batch. Returns `False` if it's already removed."""
+        ...
+
+    def claim(self, batch_id: int) -> bool:
+        """Takes a batch to handle it, so it's removed. Only one caller gets `True`,
+        others should ignore the batch.
+
+        Stores shared between processes should claim atomically, the default uses `remove`.
+        """
+        return self.remove(batch_id)
+
+    @abstractmethod
+    def update_types(self) -> set[type[Any]]:
+        """Returns update types that stored continuations are waiting for."""
+        ...
+
+    def close(self) -> None:
+        """Releases resources of the store."""
+        ...
@@ -1,10 +1,14 @@
 import asyncio
-import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import fields
 from typing import (
     Any,
+    Callable,
+    Coroutine,
     Mapping,
     Optional,
-    cast,
+    Sequence,
     final,
     overload,
     TYPE_CHECKING,
@@ -13,24 +17,40 @@ from typing import (
 from telegrambots.wrapper.types.objects import Update
 
 from .contexts._contexts._continuously_handler import ContinuouslyHandlerTemplate
-from .exceptions.handlers import HandlerRegistered
+from .continuations import ContinuationStore, MemoryContinuationStore
+from .exceptions.handlers import HandlerRegistered, HandlerTimeout
 from .exceptions.propagations import BreakPropagation, ContinuePropagation
 from .handlers._handlers.handler_template import HandlerTemplate
+from .handlers._handlers.router import HandlerRouter
+from .handlers._handlers.state_machine import StateMachine
 from .processor import ProcessorTemplate, SequentialProcessor
 from .extensions.dispatcher import AddExtensions
 from .handlers import AbstractExceptionHandler, default_exception_handler
-from .general import TKey
+from .observers import DispatcherObserver
+from .sessions import SessionStore
+from .stages import UpdateStage
+from .general import DISPATCHED_AT, RECEIVED_AT, ContainedResult, TKey, stamp
+from .logs import dispatcher_logger, hot_path_logger
+from .middleware import CallNext, Invocation, Middleware, MiddlewareScope, compose
 
 if TYPE_CHECKING:
     from .client import TelegramBot
 
 
-logging.basicConfig(
-    format="%(asctime)s %(message)s",
-    datefmt="%m/%d/%Y %I:%M:%S %p",
-    level=logging.INFO,
-)
-dispatcher_logger = logging.getLogger("telegrambots.dispatcher")
+# -> read by `LoopWatchdog` from it's own thread, to find the handler that blocks the loop.
+_running_handlers: dict["asyncio.Task[Any]", HandlerTemplate] = {}
+
+
+def running_handler(task: "asyncio.Task[Any]") -> Optional[HandlerTemplate]:
+    """Returns the handler that the task is running ( or that started it, for background tasks ), if any."""
+    return _running_handlers.get(task)
+
+
+def _track(task: "asyncio.Task[Any]", handler: Optional[HandlerTemplate]):
+    if handler is None:
+        return
+    _running_handlers[task] = handler
+    task.add_done_callback(lambda x: _running_handlers.pop(x, None))
 
 
 class Dispatcher:
@@ -39,6 +59,9 @@ class Dispatcher:
         _bot: "TelegramBot",
         *,
         processor_type: Optional[type[ProcessorTemplate[Update[Any]]]] = None,
+        handler_timeout: Optional[float] = None,
+        continuation_store: Optional[ContinuationStore] = None,
+        session_store: Optional[SessionStore] = None,
     ) -> None:
 
         """Initializes the dispatcher.
@@ -47,11 +70,36 @@ class Dispatcher:
             bot (`TelegramBot`): The bot to use.
             handle_error (`Callable[[TelegramBot, Exception], Coroutine[None, None, None]]`, optional): A function that handles errors.
             processor_type (`type[ProcessorTemplate[Update]]`, optional): The type of processor to use. Defaults to None.
+            handler_timeout (`Optional[float]`, optional): Seconds any handler can run before it's cancelled,
+                unless the handler has it's own timeout. Defaults to None ( no timeout ).
+            continuation_store (`Optional[ContinuationStore]`, optional): Where continuations are kept,
+                like `SqliteContinuationStore`. Defaults to None ( `MemoryContinuationStore` ).
+            session_store (`Optional[SessionStore]`, optional): Where `context.session` is kept.
+                Defaults to None ( an in memory `SessionStore`, created on first use ).
         """
         self._bot = _bot
+        self._handler_timeout = handler_timeout
         self._handlers: dict[type[Any], dict[str, HandlerTemplate]] = {}
-        self._continuously_handlers: list[tuple[ContinuouslyHandlerTemplate]] = []
+        self._routers: dict[type[Any], HandlerRouter] = {}
+        self._prerouted: dict[
+            int,
+            tuple[Update[Any], HandlerRouter, list[tuple[HandlerTemplate, ContainedResult]]],
+        ] = {}
+        self._continuations = (
+            continuation_store
+            if continuation_store is not None
+            else MemoryContinuationStore()
+        )
+        self._state_machines: list[StateMachine] = []
         self._handle_errors: list[AbstractExceptionHandler] = []
+        self._observers: list[DispatcherObserver] = []
+        self._middlewares: list[MiddlewareScope] = []
+        self._chains: dict[HandlerTemplate, Optional[CallNext]] = {}
+        self._stages: list[UpdateStage] = []
+        self._background: set[asyncio.Task[Any]] = set()
+        self._thread_pool: Optional[Executor] = None
+        self._process_pool: Optional[Executor] = None
+        self._sessions = session_store
         self._shared_data: dict[str, Any] = {}
 
         self._processor: ProcessorTemplate[Update[Any]]
@@ -69,6 +117,26 @@ class Dispatcher:
         """Returns the bot."""
         return self._bot
 
+    @final
+    @property
+    def shared_data(self) -> Mapping[str, Any]:
+        """Returns data that is shared with all handlers, see `add_shared_data`."""
+        return self._shared_data
+
+    @final
+    @property
+    def continuations(self) -> ContinuationStore:
+        """Returns the store of continuations."""
+        return self._continuations
+
+    @final
+    @property
+    def sessions(self) -> SessionStore:
+        """Returns the store of user and chat sessions."""
+        if self._sessions is None:
+            self._sessions = SessionStore()
+        return self._sessions
+
     @final
     @property
     def add(self) -> AddExtensions:
@@ -83,15 +151,127 @@ class Dispatcher:
         Args:
             update (`Update`): The update to feed.
         """
-        dispatcher_logger.info(
-            f"Feeding update {cast(type, update.update_type).__name__}:{update.update_id}"
-        )
-        await self._processor.process(update)
+        await self.feed_updates([update])
+
+    async def feed_updates(self, updates: Sequence[Update[Any]]):
+        """Feeds a batch of updates to the dispatcher.
+
+        Updates pass the stages first, then filters are evaluated for the
+        whole batch at once, then updates are processed one by one, in order.
+        So filters of an update run before handlers of earlier updates in the same
+        batch, they shouldn't depend on what those handlers change ( like sessions ).
+
+        Args:
+            updates (`Sequence[Update]`): The updates to feed.
+        """
+        received_at = time.time()
+        for update in updates:
+            stamp(update, RECEIVED_AT, received_at)
+            try:
+                # -> resolve it before stages read `actual_update`, which would resolve it wrong.
+                update.update_type
+            except ValueError:
+                pass
+
+        await self._feed(updates, self._stages)
+
+    async def feed_after(self, stage: UpdateStage, updates: Sequence[Update[Any]]):
+        """Feeds updates that a stage held back ( like buffered ones ), they only pass the stages after it.
+
+        If the stage is removed meanwhile, updates pass no stages.
+
+        Args:
+            stage (`UpdateStage`): The stage that held updates back.
+            updates (`Sequence[Update]`): The updates to feed.
+        """
+        if stage in self._stages:
+            stages = self._stages[self._stages.index(stage) + 1 :]
+        else:
+            stages = []
+        await self._feed(updates, stages)
+
+    async def _feed(self, updates: Sequence[Update[Any]], stages: Sequence[UpdateStage]):
+        if stages:
+            updates = list(updates)
+            for stage in stages:
+                updates = await stage.__process__(self, updates)
+                if not updates:
+                    return
+
+        batches: dict[type[Any], list[Update[Any]]] = {}
+        for update in updates:
+            try:
+                batches.setdefault(update.update_type, []).append(update)
+            except ValueError:
+                continue
+
+        for update_type, batch in batches.items():
+            router = self._get_router(update_type)
+            if router is None or len(batch) < 2:
+                continue
+            for update, routes in zip(
+                batch, router.route_many(batch, self._filtered_callback())
+            ):
+                self._prerouted[id(update)] = (update, router, routes)
+
+        for index, update in enumerate(updates):
+            if hot_path_logger.should_log():
+                hot_path_logger.log(
+                    "Feeding update %s:%s",
+                    getattr(update.update_type, "__name__", None),
+                    update.update_id,
+                )
+            try:
+                await self._processor.process(update)
+            except BaseException:
+                # -> the rest never reach `_process_update`, which pops them.
+                for rest in updates[index:]:
+                    self._prerouted.pop(id(rest), None)
+                raise
+
+    async def process_with(self, tag: str, update: Update[Any]):
+        """Processes an update with a handler, skipping filters and other handlers.
+
+        Args:
+            tag (`str`): Tag of the handler, of the same update type.
+            update (`Update`): The update to process.
+        """
+        handler = self._handlers.get(update.update_type, {}).get(tag)
+        if handler is None:
+            await self._try_handle_error(
+                ValueError(f"No {update.update_type.__name__} handler with tag {tag}.")
+            )
+            return
+        await self._do_handling(handler, update, {})
 
     def unlimited(self, *allowed_updates: str):
-        """Sets the dispatcher to unlimited mode. receiving updates till unlimited timout."""
+        """Sets the dispatcher to unlimited mode. receiving updates till unlimited timout.
+
+        Args:
+            *allowed_updates (`str`): Update kinds to receive, like `"message"`. If nothing is given,
+                only kinds that registered handlers can handle are received ( see `allowed_updates` ).
+        """
         asyncio.run(self._unlimited(*allowed_updates))
 
+    def allowed_updates(self) -> list[str]:
+        """Returns the update kinds ( `Update` field names ) that registered handlers can handle.
+
+        Kinds that share a type are all included, e.g. `Message` handlers need
+        `message`, `edited_message`, `channel_post` and `edited_channel_post`.
+        """
+        update_types = {t for t, handlers in self._handlers.items() if handlers}
+        update_types.update(self._continuations.update_types())
+        for machine in self._state_machines:
+            update_types.update(machine.update_types)
+
+        return [
+            field.name
+            for field in fields(Update)
+            if field.name != "update_id"
+            and not field.name.startswith("_")
+            and field.metadata.get("ac_type", [None])[0] in update_types
+        ]
+
     def handler_tag_exists(self, tag: str, update_type: type[Any]):
         """Checks if a handler with the given tag exists.
 
@@ -122,7 +302,7 @@ class Dispatcher:
         """
         if handler.update_type not in self._handlers:
             dispatcher_logger.info(
-                f"Added handler batch for {handler.update_type.__name__}s"
+                "Added handler batch for %ss", handler.update_type.__name__
             )
             self._handlers[handler.update_type] = {}
 
@@ -130,9 +310,50 @@ class Dispatcher:
             raise HandlerRegistered(handler.tag, handler.update_type)
 
         self._handlers[handler.update_type][handler.tag] = handler
+        self._routers.pop(handler.update_type, None)
+        self._chains.pop(handler, None)
+        self._chain_of(handler)
         dispatcher_logger.info(
-            f"Added handler {handler.update_type.__name__}:{handler.tag}"
+            "Added handler %s:%s", handler.update_type.__name__, handler.tag
+        )
+
+    def add_state_machine(self, machine: StateMachine):
+        """Compiles and adds a state machine. It's checked after continuations and before other handlers.
+
+        Args:
+            machine (`StateMachine`): The state machine to add.
+        """
+        machine.compile(self)
+        self._state_machines.append(machine)
+        dispatcher_logger.info("Added state machine %s", machine.name)
+
+    def add_middleware(
+        self,
+        middleware: Middleware,
+        *,
+        update_type: Optional[type[Any]] = None,
+        tags: Optional[Sequence[str]] = None,
+    ) -> Middleware:
+        """Adds a middleware that wraps handlers, the first added one is the outermost.
+
+        Middlewares of each handler are composed into one call when they're added,
+        not for each update. See `Middleware`.
+
+        Args:
+            middleware (`Middleware`): The middleware to add.
+            update_type (`Optional[type[Any]]`, optional): Only wrap handlers of this update type.
+            tags (`Optional[Sequence[str]]`, optional): Only wrap handlers with these tags.
+        """
+        self._middlewares.append(
+            MiddlewareScope(
+                middleware, update_type, frozenset(tags) if tags is not None else None
+            )
         )
+        self._chains.clear()
+        for handlers in self._handlers.values():
+            for handler in handlers.values():
+                self._chain_of(handler)
+        return middleware
 
     def add_exception_handler(self, exception_handler: AbstractExceptionHandler):
         """Adds an exception handler to the dispatcher.
@@ -142,6 +363,126 @@ class Dispatcher:
         """
         self._handle_errors.append(exception_handler)
 
+    def add_observer(self, observer: DispatcherObserver):
+        """Adds an observer to get notified about what the dispatcher does.
+
+        Args:
+            observer (`DispatcherObserver`): The observer to add.
+        """
+        self._observers.append(observer)
+        return observer
+
+    def remove_observer(self, observer: DispatcherObserver):
+        """Removes an observer.
+
+        Args:
+            observer (`DispatcherObserver`): The observer to remove.
+        """
+        if observer in self._observers:
+            self._observers.remove(observer)
+
+    def add_stage(self, stage: UpdateStage, index: Optional[int] = None):
+        """Adds a stage that updates pass before they're routed to handlers.
+
+        Args:
+            stage (`UpdateStage`): The stage to add.
+            index (`Optional[int]`, optional): Position of the stage, after others if None. Defaults to None.
+        """
+        if index is None:
+            self._stages.append(stage)
+        else:
+            self._stages.insert(index, stage)
+        return stage
+
+    def remove_stage(self, stage: UpdateStage):
+        """Removes a stage, updates that it holds are still fed with `feed_after`.
+
+        Args:
+            stage (`UpdateStage`): The stage to remove.
+        """
+        if stage in self._stages:
+            self._stages.remove(stage)
+
+    def run_background(self, coroutine: Coroutine[Any, Any, Any]):
+        """Runs a coroutine in background, exceptions go to the exception handlers.
+
+        Args:
+            coroutine (`Coroutine`): The coroutine to run.
+        """
+
+        async def run():
+            try:
+                await coroutine
+            except Exception as e:
+                try:
+                    await self._try_handle_error(e)
+                except:
+                    pass
+
+        task = asyncio.create_task(run())
+        _track(task, _running_handlers.get(asyncio.current_task()))  # type: ignore
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        return task
+
+    @property
+    def thread_pool(self) -> Executor:
+        """Thread pool for blocking work, created on first use."""
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(thread_name_prefix="telegrambots")
+        return self._thread_pool
+
+    @property
+    def process_pool(self) -> Executor:
+        """Process pool for CPU bound work, created on first use."""
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor()
+        return self._process_pool
+
+    def set_executors(
+        self,
+        thread_pool: Optional[Executor] = None,
+        process_pool: Optional[Executor] = None,
+    ):
+        """Replaces default executors, dispatcher shuts them down when it's done.
+
+        Args:
+            thread_pool (`Optional[Executor]`, optional): Executor for `offload` and `cpu_bound`.
+            process_pool (`Optional[Executor]`, optional): Executor for `offload` and `cpu_bound` with `process=True`.
+        """
+        if thread_pool is not None:
+            self._thread_pool = thread_pool
+        if process_pool is not None:
+            self._process_pool = process_pool
+
+    async def run_in_executor(
+        self, function: Callable[..., TKey], *args: Any, process: bool = False
+    ) -> TKey:
+        """Runs a blocking function in the thread or process pool, and waits for the result.
+
+        Args:
+            function (`Callable[..., TKey]`): The function, for processes it should be picklable.
+            *args (`Any`): Arguments of the function.
+            process (`bool`, optional): Use the process pool instead of the thread pool. Defaults to False.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self.process_pool if process else self.thread_pool, function, *args
+        )
+
+    def shutdown_executors(self, wait: bool = True):
+        """Shuts down thread and process pools, if they're created."""
+        for executor in (self._thread_pool, self._process_pool):
+            if executor is not None:
+                executor.shutdown(wait=wait, cancel_futures=True)
+        self._thread_pool = None
+        self._process_pool = None
+
+    async def join(self):
+        """Waits for updates that the processor is still processing, and background jobs."""
+        await self._processor.join()
+        while self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+
     def add_default_exception_handler(self):
         """Adds the default exception handler to the dispatcher."""
         self.add_exception_handler(default_exception_handler)
@@ -170,34 +511,86 @@ class Dispatcher:
         """Adds a handler for continuously updates."""
 
         if isinstance(continuously_handler, (tuple, list)):
-            self._continuously_handlers.append(continuously_handler)
-            dispatcher_logger.info(
-                f"Added a batch of continuously handlers {', '.join(f'{x.update_type.__name__}:{x.target_tag}' for x in continuously_handler)}"
-            )
+            self._continuations.add(continuously_handler)
+            if hot_path_logger.should_log():
+                hot_path_logger.log(
+                    "Added a batch of continuously handlers %s",
+                    ", ".join(
+                        f"{x.update_type.__name__}:{x.target_tag}"
+                        for x in continuously_handler
+                    ),
+                )
         else:
-            dispatcher_logger.info(
-                f"Added a continuously handler: {continuously_handler.update_type.__name__}:{continuously_handler.target_tag}"
-            )
-            self._continuously_handlers.append((continuously_handler,))
+            if hot_path_logger.should_log():
+                hot_path_logger.log(
+                    "Added a continuously handler: %s:%s",
+                    continuously_handler.update_type.__name__,
+                    continuously_handler.target_tag,
+                )
+            self._continuations.add((continuously_handler,))
 
     async def _unlimited(self, *allowed_updates: str):
-        async with self.bot:
-            async for update in self.bot.stream_updates(list(allowed_updates)):
-                await self.feed_update(update)
+        try:
+            async with self.bot:
+                try:
+                    async for updates in self.bot.stream_update_batches(
+                        list(allowed_updates) if allowed_updates else self.allowed_updates
+                    ):
+                        await self.feed_updates(updates)
+                finally:
+                    await self._close_stages()
+        finally:
+            await self._processor.close()
+            self._prerouted.clear()  # -> of updates that the processor dropped.
+            if self._sessions is not None:
+                try:
+                    await self._sessions.close()
+                except Exception:
+                    dispatcher_logger.exception("Failed to write sessions on shutdown.")
+            self.shutdown_executors(wait=False)
+
+    async def _close_stages(self):
+        for stage in list(self._stages):
+            try:
+                await stage.close(self)
+            except Exception:
+                dispatcher_logger.exception("Failed to close stage %s.", stage)
+        await self.join()  # -> what stages fed, while the bot is still open.
 
     async def _process_update(self, update: Update[Any]):
+        prerouted = self._prerouted.pop(id(update), None)
+        if self._observers:
+            update._set_metadata(DISPATCHED_AT, time.time())  # type: ignore
+            for observer in self._observers:
+                observer.on_dispatched(update)
+
         update_type = update.update_type
         if update_type is None:
             await self._try_handle_error(ValueError(f"Unknown update type: {update}"))
             return
 
-        for batch in self._continuously_handlers:
+        if self._sessions is not None and self._sessions.preloads:
+            try:
+                # -> read off the loop, so `context.session` doesn't block it.
+                await self._sessions.preload(update)
+            except Exception:
+                dispatcher_logger.exception("Failed to preload sessions.")
+
+        for batch_id, batch in self._continuations.candidates(update, update_type):
             for c in sorted(batch, key=lambda x: x.priority, reverse=True):
                 if c.update_type == update_type:
                     if c.check_keys(update):
                         handler = self._handlers[update_type][c.target_tag]
 
+                        started = time.perf_counter()
                         result = handler.should_process(update)
+                        for observer in self._observers:
+                            observer.on_filtered(
+                                handler,
+                                update,
+                                time.perf_counter() - started,
+                                result.result,
+                            )
                         if not result.result:
                             continue
 
@@ -205,9 +598,16 @@ class Dispatcher:
                             if c.start_tag not in handler.continue_after:
                                 continue
 
-                        dispatcher_logger.info(
-                            f"Processing continuously handler {c.update_type.__name__}:{c.target_tag}"
-                        )
+                        # -> claim before handling, so parallel updates can't take it too.
+                        if not self._continuations.claim(batch_id):
+                            break
+
+                        if hot_path_logger.should_log():
+                            hot_path_logger.log(
+                                "Processing continuously handler %s:%s",
+                                c.update_type.__name__,
+                                c.target_tag,
+                            )
                         c.kwargs.update(continue_with_key=c.keys)
                         await self._do_handling(
                             handler,
@@ -216,31 +616,73 @@ class Dispatcher:
                             *c.args,
                             **c.kwargs,
                         )
-                        self._continuously_handlers.remove(batch)
                         return  # Don't process the update anymore
 
-        if update_type not in self._handlers:
+        for machine in self._state_machines:
+            key = machine.key_of(update)
+            if key is None:
+                continue
+            # -> if the key is held, it's state may move before this update gets it.
+            step = None if machine.is_held(key) else machine.step(update, update_type)
+            if step is None and not machine.is_held(key):
+                continue
+
+            async with machine.hold(key):
+                if step is None:
+                    step = machine.step(update, update_type)
+                if step is None:
+                    continue
+                handler, result = step
+                handling_result = await self._do_handling(
+                    handler, update, result.metadata
+                )
+            if handling_result is False:
+                return
+
+        router = self._get_router(update_type)
+        if router is None:
             return
 
-        for _, handler in sorted(
-            (_, h)
-            for _, h in sorted(
-                self._handlers[update_type].items(),
-                key=lambda x: x[1].priority,
-                reverse=True,
+        if prerouted is not None and prerouted[0] is update and prerouted[1] is router:
+            routes = prerouted[2]
+        else:
+            routes = router.route(update, self._filtered_callback())
+
+        for handler, result in routes:
+            handling_result = await self._do_handling(handler, update, result.metadata)
+            if handling_result is False:
+                break
+
+    def _get_router(self, update_type: type[Any]) -> Optional[HandlerRouter]:
+        router = self._routers.get(update_type)
+        if router is None:
+            if update_type not in self._handlers:
+                return None
+            router = HandlerRouter(
+                sorted(
+                    (
+                        h
+                        for h in self._handlers[update_type].values()
+                        if not h.continue_after
+                    ),
+                    key=lambda x: x.priority,
+                    reverse=True,
+                )
             )
-            if not h.continue_after
+            self._routers[update_type] = router
+        return router
+
+    def _filtered_callback(self):
+        if not self._observers:
+            return None
+
+        def on_filtered(
+            handler: HandlerTemplate, update: Update[Any], elapsed: float, matched: bool
         ):
-            result = handler.should_process(update)
-            if result.result:
-                handling_result = await self._do_handling(
-                    handler, update, result.metadata
-                )
-                if handling_result is not None:
-                    if handling_result:
-                        continue
-                    else:
-                        break
+            for observer in self._observers:
+                observer.on_filtered(handler, update, elapsed, matched)
+
+        return on_filtered
 
     async def _do_handling(
         self,
@@ -249,26 +691,156 @@ class Dispatcher:
         filter_data: Mapping[str, Any],
         *args: Any,
         **kwargs: Any,
-    ):
+    ) -> Optional[bool]:
+        if self._middlewares:
+            chain = self._chain_of(handler)
+            if chain is not None:
+                started = time.perf_counter()
+                try:
+                    propagation = await chain(
+                        Invocation(handler, update, filter_data, args, kwargs)
+                    )
+                    return propagation if isinstance(propagation, bool) else None
+                except ContinuePropagation:
+                    return True
+                except BreakPropagation:
+                    return False
+                except Exception as e:
+                    # -> a middleware raised, handler exceptions are reported by `_handle`.
+                    await self._report_handled(
+                        handler, update, time.perf_counter() - started, None, e
+                    )
+                    return None
+
+        return await self._handle_limited(
+            handler, update, filter_data, *args, **kwargs
+        )
+
+    def _chain_of(self, handler: HandlerTemplate) -> Optional[CallNext]:
+        if handler in self._chains:
+            return self._chains[handler]
+
+        middlewares = [x.middleware for x in self._middlewares if x.applies_to(handler)]
+        chain = compose(middlewares, self._invoke) if middlewares else None
+        self._chains[handler] = chain
+        return chain
+
+    async def _invoke(self, invocation: Invocation) -> Optional[bool]:
+        return await self._handle_limited(
+            invocation.handler,
+            invocation.update,
+            invocation.filter_data,
+            *invocation.args,
+            **invocation.data,
+        )
+
+    async def _handle_limited(
+        self,
+        handler: HandlerTemplate,
+        update: Update[Any],
+        filter_data: Mapping[str, Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Optional[bool]:
+        limit = handler.max_concurrency
+        if limit is None:
+            return await self._handle(handler, update, filter_data, *args, **kwargs)
+
+        if limit.full and limit.overflow != "wait":
+            limit.overflowed += 1
+            for observer in self._observers:
+                observer.on_overflow(handler, update, limit.overflow)
+            if limit.overflow == "reject":
+                self.run_background(limit.reject(self, update))
+            return None if limit.propagate else False
+
+        async with limit:
+            return await self._handle(handler, update, filter_data, *args, **kwargs)
+
+    async def _handle(
+        self,
+        handler: HandlerTemplate,
+        update: Update[Any],
+        filter_data: Mapping[str, Any],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Optional[bool]:
         kwargs |= self._shared_data
+        started = time.perf_counter()
+        propagation: Optional[bool] = None
+        exception: Optional[Exception] = None
+        timeout = handler.timeout
+        if timeout is None:
+            timeout = self._handler_timeout
+        task: "asyncio.Task[Any]" = asyncio.current_task()  # type: ignore
+        outer = _running_handlers.get(task)
+        _running_handlers[task] = handler
         try:
-            await handler.process(
-                update,
-                filter_data,
-                *args,
-                **kwargs,
-            )
+            # -> handlers may return propagation instead of raising.
+            if timeout is None:
+                propagation = await handler.process(
+                    update,
+                    filter_data,
+                    *args,
+                    **kwargs,
+                )
+            else:
+                propagation = await self._process_with_timeout(
+                    handler, timeout, update, filter_data, *args, **kwargs
+                )
+            if not isinstance(propagation, bool):
+                propagation = None  # -> e.g. a sent message that is returned by accident.
         except ContinuePropagation:
-            return True  # -> continue to next handler
+            propagation = True  # -> continue to next handler
         except BreakPropagation:
-            return False  # -> break from loop
+            propagation = False  # -> break from loop
         except Exception as e:
+            exception = e
+        finally:
+            if outer is None:
+                _running_handlers.pop(task, None)
+            else:
+                _running_handlers[task] = outer  # -> e.g. `process_with` inside a handler.
+        await self._report_handled(
+            handler, update, time.perf_counter() - started, propagation, exception
+        )
+        return propagation
+
+    async def _report_handled(
+        self,
+        handler: HandlerTemplate,
+        update: Update[Any],
+        elapsed: float,
+        propagation: Optional[bool],
+        exception: Optional[Exception],
+    ):
+        if exception is not None:
             # -> handle error
             try:
-                await self._try_handle_error(e)
+                await self._try_handle_error(exception)
             except:
                 pass
-        return None
+
+        for observer in self._observers:
+            observer.on_handled(handler, update, elapsed, propagation, exception)
+
+    @staticmethod
+    async def _process_with_timeout(
+        handler: HandlerTemplate, timeout: float, *args: Any, **kwargs: Any
+    ) -> Optional[bool]:
+        task = asyncio.ensure_future(handler.process(*args, **kwargs))
+        _track(task, handler)
+        try:
+            done, _ = await asyncio.wait((task,), timeout=timeout)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+
+        if not done:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            raise HandlerTimeout(handler.tag, handler.update_type, timeout)
+        return task.result()  # -> raises what handler raised.
 
     async def _try_handle_error(self, e: Exception):
         for handler in self._handle_errors:
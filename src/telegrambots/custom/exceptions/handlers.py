@@ -6,3 +6,13 @@ class HandlerRegistered(Exception):
         super().__init__(
             f"Handler with tag {tag} is already registered for update type {update_type}."
         )
+
+
+class HandlerTimeout(TimeoutError):
+    def __init__(self, tag: str, update_type: type[Any], timeout: float) -> None:
+        super().__init__(
+            f"Handler {update_type.__name__}:{tag} didn't finish in {timeout} seconds."
+        )
+        self.tag = tag
+        self.update_type = update_type
+        self.timeout = timeout
@@ -44,6 +44,12 @@ class ContextExtensions(ABC):
 class PropagationExtension(ContextExtensions):
     def __init__(self, context: "Context[Any]") -> None:
         super().__init__(context)
+        self._marked: Optional[bool] = None
+
+    @property
+    def marked(self) -> Optional[bool]:
+        """Propagation that is marked with `mark_stop` or `mark_resume`, None if nothing is marked."""
+        return self._marked
 
     def stop(self) -> NoReturn:
         """Stops the propagation of the current context."""
@@ -53,10 +59,21 @@ class PropagationExtension(ContextExtensions):
         """Continues the propagation of the current context."""
         raise ContinuePropagation()
 
+    def mark_stop(self) -> None:
+        """Stops the propagation after the handler returns, like `stop` but without raising."""
+        self._marked = False
+
+    def mark_resume(self) -> None:
+        """Continues the propagation after the handler returns, like `resume` but without raising."""
+        self._marked = True
+
 
 class ContinueWithThisExtensions(ContextExtensions):
-    def __init__(self, context: "Context[Any]") -> None:
+    def __init__(
+        self, context: "Context[Any]", continue_with: "ContinueWithExtensions"
+    ) -> None:
         super().__init__(context)
+        self._continue_with = continue_with
 
     def callback_query(
         self,
@@ -81,7 +98,7 @@ class ContinueWithThisExtensions(ContextExtensions):
                     [self._context.handler_tag] + (other_continue_with or []),
                     allow_continue_after_self,
                 )
-            self._context.continue_with.callback_query(
+            self._continue_with.callback_query(
                 _tag,
                 keys,
                 0,
@@ -115,7 +132,7 @@ class ContinueWithThisExtensions(ContextExtensions):
                     [self._context.handler_tag] + (other_continue_with or []),
                     allow_continue_after_self,
                 )
-            self._context.continue_with.callback_query_from(
+            self._continue_with.callback_query_from(
                 _tag,
                 user_id,
                 0,
@@ -150,7 +167,7 @@ class ContinueWithThisExtensions(ContextExtensions):
                     [self._context.handler_tag] + (other_continue_with or []),
                     allow_continue_after_self,
                 )
-            self._context.continue_with.callback_query_same_message_from(
+            self._continue_with.callback_query_same_message_from(
                 _tag,
                 message_id,
                 user_id,
@@ -185,7 +202,7 @@ class ContinueWithThisExtensions(ContextExtensions):
                     [self._context.handler_tag] + (other_continue_with or []),
                     allow_continue_after_self,
                 )
-            self._context.continue_with.callback_query_same_message(
+            self._continue_with.callback_query_same_message(
                 _tag,
                 message_id,
                 0,
@@ -219,7 +236,7 @@ class ContinueWithThisExtensions(ContextExtensions):
                     [self._context.handler_tag] + (other_continue_with or []),
                     allow_continue_after_self,
                 )
-            self._context.continue_with.message(
+            self._continue_with.message(
                 _tag,
                 keys,
                 0,
@@ -253,7 +270,7 @@ class ContinueWithThisExtensions(ContextExtensions):
                     [self._context.handler_tag] + (other_continue_with or []),
                     allow_continue_after_self,
                 )
-            self._context.continue_with.message_from(
+            self._continue_with.message_from(
                 _tag,
                 user_id,
                 0,
@@ -286,7 +303,7 @@ class ContinueWithThisExtensions(ContextExtensions):
                     [self._context.handler_tag] + (other_continue_with or []),
                     allow_continue_after_self,
                 )
-            self._context.continue_with.message(
+            self._continue_with.message(
                 _tag,
                 [MessageSenderId(user_id)],
                 0,
@@ -299,18 +316,35 @@ class ContinueWithThisExtensions(ContextExtensions):
 
 
 class ContinueWithExtensions(ContextExtensions):
-    def __init__(self, context: "Context[Any]") -> None:
+    def __init__(self, context: "Context[Any]", raise_stop: bool = True) -> None:
         super().__init__(context)
+        self._raise_stop = raise_stop
 
         # extensions
         self.__this: Optional[ContinueWithThisExtensions] = None
+        self.__without_raise: Optional[ContinueWithExtensions] = None
+
+    @final
+    @property
+    def without_raise(self) -> "ContinueWithExtensions":
+        """Same methods, but propagation is marked to stop after the handler returns, instead of raising."""
+        if not self._raise_stop:
+            return self
+        if self.__without_raise is None:
+            self.__without_raise = ContinueWithExtensions(self._context, False)
+        return self.__without_raise
+
+    def _stop(self):
+        if self._raise_stop:
+            self._context.propagation.stop()
+        self._context.propagation.mark_stop()
 
     @final
     @property
     def this(self) -> ContinueWithThisExtensions:
         """Extension methods that allow you to add, register and continue with a handler, directly inside another."""
         if self.__this is None:
-            self.__this = ContinueWithThisExtensions(self._context)
+            self.__this = ContinueWithThisExtensions(self._context, self)
         return self.__this
 
     def any(
@@ -348,7 +382,7 @@ class ContinueWithExtensions(ContextExtensions):
                 **kwargs,
             )
         )
-        self._context.propagation.stop()
+        self._stop()
 
     def many(
         self, *continue_with_info: ContinueWithInfo[Any], include_ctx_data: bool = True
@@ -372,7 +406,7 @@ class ContinueWithExtensions(ContextExtensions):
                 for info in continue_with_info
             )
         )
-        self._context.propagation.stop()
+        self._stop()
 
     def message(
         self,
@@ -1,6 +1,5 @@
 import importlib
 import inspect
-import logging
 import os
 from abc import ABC
 from pathlib import Path
@@ -14,18 +13,12 @@ from ..filters import Filter
 from ..general import TUpdate
 from ..handlers import CallbackQueryHandler, MessageHandler
 from ..handlers._handlers.handler_template import AbstractHandler, Handler
+from ..logs import dispatcher_logger
+from ..handlers._handlers.concurrency import ConcurrencyLimit
 
 if TYPE_CHECKING:
     from .. import Dispatcher
 
-logging.basicConfig(
-    format="%(asctime)s %(message)s",
-    datefmt="%m/%d/%Y %I:%M:%S %p",
-    level=logging.INFO,
-)
-dispatcher_logger = logging.getLogger("telegrambots.dispatcher")
-
-
 class DispatcherExtensions(ABC):
     def __init__(self, dp: "Dispatcher") -> None:
         self.__dp = dp
@@ -48,6 +41,8 @@ class AddHandlerViaDecoratorExtension(DispatcherExtensions):
         continue_after: Optional[list[str]] = None,
         allow_continue_after_self: bool = False,
         priority: int = 0,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int | ConcurrencyLimit] = None,
     ):
         """Registers a handler for updates.
 
@@ -57,6 +52,12 @@ class AddHandlerViaDecoratorExtension(DispatcherExtensions):
             tag (`Optional[str]`, optional): A tag for the handler. Should be unique. Defaults to None.
             continue_after (`Optional[str]`, optional): The tag of the handler to continue after. Defaults to None.
             allow_continue_after_self (`bool`, optional): Same as current adding handler tag to continue_after.
+            priority (`int`, optional): Handlers with higher priority are checked first. Defaults to 0.
+            timeout (`Optional[float]`, optional): Seconds the handler can run before it's cancelled.
+                Defaults to None, which uses the dispatcher's `handler_timeout`.
+            max_concurrency (`Optional[int | ConcurrencyLimit]`, optional): Maximum number of updates that
+                the handler processes at the same time. An int waits for a free slot, use `ConcurrencyLimit`
+                to reject or drop updates instead. Defaults to None ( no limit ).
         """
 
         def decorator(
@@ -73,6 +74,8 @@ class AddHandlerViaDecoratorExtension(DispatcherExtensions):
                     continue_after,
                     allow_continue_after_self,
                     priority,
+                    timeout,
+                    max_concurrency,
                 ),
             )
 
@@ -85,6 +88,8 @@ class AddHandlerViaDecoratorExtension(DispatcherExtensions):
         continue_after: Optional[list[str]] = None,
         allow_continue_after_self: bool = False,
         priority: int = 0,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int | ConcurrencyLimit] = None,
     ):
         """Registers a handler for messages.
 
@@ -93,6 +98,12 @@ class AddHandlerViaDecoratorExtension(DispatcherExtensions):
             tag (`str`): A tag for the handler. Should be unique.
             continue_after (`Optional[str]`, optional): The tag of the handler to continue after. Defaults to None.
             allow_continue_after_self (`bool`, optional): Same as current adding handler tag to continue_after.
+            priority (`int`, optional): Handlers with higher priority are checked first. Defaults to 0.
+            timeout (`Optional[float]`, optional): Seconds the handler can run before it's cancelled.
+                Defaults to None, which uses the dispatcher's `handler_timeout`.
+            max_concurrency (`Optional[int | ConcurrencyLimit]`, optional): Maximum number of updates that
+                the handler processes at the same time. An int waits for a free slot, use `ConcurrencyLimit`
+                to reject or drop updates instead. Defaults to None ( no limit ).
         """
 
         def decorator(_function: Callable[[MessageContext], Coroutine[Any, Any, None]]):
@@ -103,6 +114,8 @@ class AddHandlerViaDecoratorExtension(DispatcherExtensions):
                 continue_after,
                 allow_continue_after_self,
                 priority,
+                timeout,
+                max_concurrency,
             )
 
         return decorator
@@ -114,6 +127,8 @@ class AddHandlerViaDecoratorExtension(DispatcherExtensions):
         continue_after: Optional[list[str]] = None,
         allow_continue_after_self: bool = False,
         priority: int = 0,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int | ConcurrencyLimit] = None,
     ):
         """Registers a handler for callback queries.
 
@@ -122,6 +137,12 @@ class AddHandlerViaDecoratorExtension(DispatcherExtensions):
             tag (`str`): A tag for the handler. Should be unique.
             continue_after (`Optional[str]`, optional): The tag of the handler to continue after. Defaults to None.
             allow_continue_after_self (`bool`, optional): Same as current adding handler tag to continue_after.
+            priority (`int`, optional): Handlers with higher priority are checked first. Defaults to 0.
+            timeout (`Optional[float]`, optional): Seconds the handler can run before it's cancelled.
+                Defaults to None, which uses the dispatcher's `handler_timeout`.
+            max_concurrency (`Optional[int | ConcurrencyLimit]`, optional): Maximum number of updates that
+                the handler processes at the same time. An int waits for a free slot, use `ConcurrencyLimit`
+                to reject or drop updates instead. Defaults to None ( no limit ).
         """
 
         def decorator(
@@ -134,6 +155,8 @@ class AddHandlerViaDecoratorExtension(DispatcherExtensions):
                 continue_after,
                 allow_continue_after_self,
                 priority,
+                timeout,
+                max_concurrency,
             )
 
         return decorator
@@ -162,6 +185,8 @@ class AddHandlersExtensions(DispatcherExtensions):
         continue_after: Optional[list[str]] = None,
         allow_continue_after_self: bool = False,
         priority: int = 0,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int | ConcurrencyLimit] = None,
     ):
         """Registers a handler for callback queries.
 
@@ -171,6 +196,12 @@ class AddHandlersExtensions(DispatcherExtensions):
             filter (`Filter[CallbackQuery]`, optional): A filter that checks if the callback query passes the filter.
             continue_after (`Optional[str]`, optional): The tag of the handler to continue after. Defaults to None.
             allow_continue_after_self (`bool`, optional): Same as current adding handler tag to continue_after.
+            priority (`int`, optional): Handlers with higher priority are checked first. Defaults to 0.
+            timeout (`Optional[float]`, optional): Seconds the handler can run before it's cancelled.
+                Defaults to None, which uses the dispatcher's `handler_timeout`.
+            max_concurrency (`Optional[int | ConcurrencyLimit]`, optional): Maximum number of updates that
+                the handler processes at the same time. An int waits for a free slot, use `ConcurrencyLimit`
+                to reject or drop updates instead. Defaults to None ( no limit ).
         """
 
         self._dp.add_handler(
@@ -182,6 +213,8 @@ class AddHandlersExtensions(DispatcherExtensions):
                 continue_after,
                 allow_continue_after_self,
                 priority,
+                timeout,
+                max_concurrency,
             )
         )
 
@@ -193,6 +226,8 @@ class AddHandlersExtensions(DispatcherExtensions):
         continue_after: Optional[list[str]] = None,
         allow_continue_after_self: bool = False,
         priority: int = 0,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int | ConcurrencyLimit] = None,
     ):
         """Registers a handler for messages.
 
@@ -202,6 +237,12 @@ class AddHandlersExtensions(DispatcherExtensions):
             filter (`Filter[Message]`, optional): A filter that checks if the message passes the filter.
             continue_after (`Optional[str]`, optional): The tag of the handler to continue after. Defaults to None.
             allow_continue_after_self (`bool`, optional): Same as current adding handler tag to continue_after.
+            priority (`int`, optional): Handlers with higher priority are checked first. Defaults to 0.
+            timeout (`Optional[float]`, optional): Seconds the handler can run before it's cancelled.
+                Defaults to None, which uses the dispatcher's `handler_timeout`.
+            max_concurrency (`Optional[int | ConcurrencyLimit]`, optional): Maximum number of updates that
+                the handler processes at the same time. An int waits for a free slot, use `ConcurrencyLimit`
+                to reject or drop updates instead. Defaults to None ( no limit ).
         """
 
         self._dp.add_handler(
@@ -213,6 +254,8 @@ class AddHandlersExtensions(DispatcherExtensions):
                 continue_after,
                 allow_continue_after_self,
                 priority,
+                timeout,
+                max_concurrency,
             )
         )
 
@@ -269,7 +312,7 @@ class AddHandlersExtensions(DispatcherExtensions):
                             instance.set_dp(self._dp)
                             self._dp.add_handler(instance)
             except ImportError as e:
-                dispatcher_logger.error(f"Failed to import module {module_name}: {e}")
+                dispatcher_logger.error("Failed to import module %s: %s", module_name, e)
                 continue
 
 
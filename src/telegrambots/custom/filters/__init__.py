@@ -1,3 +1,12 @@
-from ._filters.filter_template import Filter, SealedFilter
+from ._filters.filter_template import Filter, SealedFilter, FieldFilter
+from ._filters.multi_pattern import PatternSet, PatternMatch
+from ..general import ContainedResult
 
-__all__ = ["Filter", "SealedFilter"]
+__all__ = [
+    "Filter",
+    "SealedFilter",
+    "FieldFilter",
+    "PatternSet",
+    "PatternMatch",
+    "ContainedResult",
+]
@@ -1,10 +1,34 @@
+import operator
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Generic, Mapping, final
+from types import MappingProxyType
+from typing import (
+    Any,
+    Callable,
+    Generic,
+    Hashable,
+    Mapping,
+    Optional,
+    Sequence,
+    final,
+)
 
-from ...general import Checkable, TUpdate
+from ...general import Checkable, ContainedResult, TUpdate
+
+
+NO_METADATA: Mapping[str, Any] = MappingProxyType({})
+PASSED = ContainedResult(True, NO_METADATA)
+FAILED = ContainedResult(False, NO_METADATA)
 
 
 class Filter(Generic[TUpdate], Checkable[TUpdate], Mapping[str, Any], ABC):
+    """Base class for filters.
+
+    Implement `__check__` for a simple yes or no, or `__evaluate__` if the filter
+    has some metadata to pass to the handler. Metadata is returned per evaluation,
+    so a filter instance holds no state about updates and it's safe to share it
+    between handlers and concurrently processed updates.
+    """
+
     def __init__(self) -> None:
         super().__init__()
         self._metadata: dict[str, Any] = {}
@@ -19,13 +43,67 @@ class Filter(Generic[TUpdate], Checkable[TUpdate], Mapping[str, Any], ABC):
         return len(self._metadata)
 
     def _set_metadata(self, name: str, value: Any):
+        """Legacy way to set metadata from inside `__check__`.
+
+        Prefer returning a `ContainedResult` from `__evaluate__`.
+        """
         self._metadata[name] = value
 
+    def __check__(self, update: TUpdate) -> bool:
+        if type(self).__evaluate__ is Filter.__evaluate__:
+            raise NotImplementedError(
+                f"{type(self).__name__} should implement __check__ or __evaluate__."
+            )
+        return self.__evaluate__(update).result
+
+    def __evaluate__(self, update: TUpdate) -> ContainedResult:
+        if self._metadata:
+            self._metadata = {}
+        if not self.__check__(update):
+            return FAILED
+        if self._metadata:
+            return ContainedResult(True, dict(self._metadata))
+        return PASSED
+
+    def __node_key__(self) -> Hashable:
+        """A key that is equal for filters that always give the same result.
+
+        Used to share evaluation of equal filters between handlers.
+        Filters are only equal to themselves by default.
+        """
+        return ("filter", id(self))
+
     @final
     def check(self, update: TUpdate) -> bool:
         if update is None:
             return False
-        return self.__check__(update)
+        return self.__evaluate__(update).result
+
+    def __evaluate_many__(self, updates: Sequence[TUpdate]) -> list[ContainedResult]:
+        evaluate = self.__evaluate__
+        return [evaluate(update) for update in updates]
+
+    @final
+    def evaluate(self, update: TUpdate) -> ContainedResult:
+        """Checks the update and returns the result along with the metadata of this evaluation."""
+        if update is None:
+            return FAILED
+        return self.__evaluate__(update)
+
+    @final
+    def evaluate_many(
+        self, updates: Sequence[Optional[TUpdate]]
+    ) -> list[ContainedResult]:
+        """Evaluates a batch of updates at once, results are in the same order as updates."""
+        if any(update is None for update in updates):
+            results = [FAILED] * len(updates)
+            present = [i for i, update in enumerate(updates) if update is not None]
+            for i, result in zip(
+                present, self.__evaluate_many__([updates[i] for i in present])  # type: ignore
+            ):
+                results[i] = result
+            return results
+        return self.__evaluate_many__(updates)  # type: ignore
 
     @final
     def __and__(self, other: "Filter[TUpdate]"):
@@ -51,48 +129,92 @@ class Filter(Generic[TUpdate], Checkable[TUpdate], Mapping[str, Any], ABC):
 
 
 class SealedFilter(Filter[TUpdate]):
-    def __init__(self, filter: Callable[[TUpdate], bool]):
+    def __init__(
+        self, filter: Callable[[TUpdate], bool], key: Optional[Hashable] = None
+    ):
         super().__init__()
         self._filter = filter
+        self._key = key
+
+    def __node_key__(self) -> Hashable:
+        if self._key is None:
+            return super().__node_key__()
+        return ("sealed", self._key)
 
     @final
     def __check__(self, update: TUpdate) -> bool:
         return self._filter(update)
 
+    @final
+    def __evaluate__(self, update: TUpdate) -> ContainedResult:
+        return PASSED if self._filter(update) else FAILED
 
-class JoinedFilter(Filter[TUpdate], ABC):
-    def __init__(self, *_filters: Filter[TUpdate]) -> None:
+
+class FieldFilter(Filter[TUpdate]):
+    def __init__(self, path: str, value: Any):
+        """Allows only updates which field ( at `path`, like `"chat.type"` ) equals to the value.
+
+        It's faster than a sealed filter, specially on batches.
+        """
         super().__init__()
-        self._filters = _filters
-        self._checked = False
+        self._path = path
+        self._value = value
+        self._getter = operator.attrgetter(path)
 
-    def __getitem__(self, name: str):
-        self._ensure_metadata()
-        return super().__getitem__(name)
+    def _get(self, update: TUpdate) -> Any:
+        try:
+            return self._getter(update)
+        except AttributeError:
+            return None
 
-    def __iter__(self):
-        self._ensure_metadata()
-        return super().__iter__()
+    @final
+    def __check__(self, update: TUpdate) -> bool:
+        return self._get(update) == self._value
 
-    def __len__(self) -> int:
-        self._ensure_metadata()
-        return super().__len__()
+    @final
+    def __evaluate__(self, update: TUpdate) -> ContainedResult:
+        return PASSED if self._get(update) == self._value else FAILED
+
+    @final
+    def __evaluate_many__(self, updates: Sequence[TUpdate]) -> list[ContainedResult]:
+        value = self._value
+        try:
+            values = list(map(self._getter, updates))
+        except AttributeError:
+            values = [self._get(update) for update in updates]
+        return [PASSED if v == value else FAILED for v in values]
+
+    def __node_key__(self) -> Hashable:
+        return ("field", self._path, self._value)
+
+
+class JoinedFilter(Filter[TUpdate], ABC):
+    def __init__(self, *_filters: Filter[TUpdate]) -> None:
+        super().__init__()
+        self._filters = _filters
 
     @abstractmethod
-    def __wrapping__(self, update: TUpdate) -> bool:
+    def __wrapping__(self, update: TUpdate) -> ContainedResult:
         ...
 
     @final
     def __check__(self, update: TUpdate) -> bool:
-        result = self.__wrapping__(update)
-        self._ensure_metadata()
-        self._checked = True
-        return result
+        return self.__wrapping__(update).result
 
-    def _ensure_metadata(self):
-        if not self._checked:
-            for subfilters in self._filters:
-                self._metadata |= subfilters
+    @final
+    def __evaluate__(self, update: TUpdate) -> ContainedResult:
+        return self.__wrapping__(update)
+
+    @property
+    def filters(self) -> tuple[Filter[TUpdate], ...]:
+        """Filters that are joined together."""
+        return self._filters
+
+    def __node_key__(self) -> Hashable:
+        return (
+            type(self).__name__,
+            tuple(filter.__node_key__() for filter in self._filters),
+        )
 
 
 class AndFilter(JoinedFilter[TUpdate]):
@@ -100,11 +222,38 @@ class AndFilter(JoinedFilter[TUpdate]):
         super().__init__(*_filters)
 
     @final
-    def __wrapping__(self, update: TUpdate) -> bool:
+    def __wrapping__(self, update: TUpdate) -> ContainedResult:
+        metadata: dict[str, Any] = {}
         for filter in self._filters:
-            if not filter.check(update):
-                return False
-        return True
+            result = filter.evaluate(update)
+            if not result.result:
+                return FAILED
+            if result.metadata:
+                metadata |= result.metadata
+        return ContainedResult(True, metadata) if metadata else PASSED
+
+    @final
+    def __evaluate_many__(self, updates: Sequence[TUpdate]) -> list[ContainedResult]:
+        results: list[ContainedResult] = [PASSED] * len(updates)
+        metadata: dict[int, dict[str, Any]] = {}
+        pending = list(range(len(updates)))
+        for filter in self._filters:
+            if not pending:
+                break
+            checked = filter.evaluate_many([updates[i] for i in pending])
+            survived: list[int] = []
+            for i, result in zip(pending, checked):
+                if not result.result:
+                    results[i] = FAILED
+                    continue
+                if result.metadata:
+                    metadata.setdefault(i, {}).update(result.metadata)
+                survived.append(i)
+            pending = survived
+        for i in pending:
+            if i in metadata:
+                results[i] = ContainedResult(True, metadata[i])
+        return results
 
 
 class ReverseFilter(JoinedFilter[TUpdate]):
@@ -112,11 +261,28 @@ class ReverseFilter(JoinedFilter[TUpdate]):
         super().__init__(*_filters)
 
     @final
-    def __wrapping__(self, update: TUpdate) -> bool:
+    def __wrapping__(self, update: TUpdate) -> ContainedResult:
         for filter in self._filters:
             if filter.check(update):
-                return False
-        return True
+                return FAILED
+        return PASSED
+
+    @final
+    def __evaluate_many__(self, updates: Sequence[TUpdate]) -> list[ContainedResult]:
+        results: list[ContainedResult] = [PASSED] * len(updates)
+        pending = list(range(len(updates)))
+        for filter in self._filters:
+            if not pending:
+                break
+            checked = filter.evaluate_many([updates[i] for i in pending])
+            remained: list[int] = []
+            for i, result in zip(pending, checked):
+                if result.result:
+                    results[i] = FAILED
+                else:
+                    remained.append(i)
+            pending = remained
+        return results
 
 
 class OrFilter(JoinedFilter[TUpdate]):
@@ -124,11 +290,29 @@ class OrFilter(JoinedFilter[TUpdate]):
         super().__init__(*_filters)
 
     @final
-    def __wrapping__(self, update: TUpdate) -> bool:
+    def __wrapping__(self, update: TUpdate) -> ContainedResult:
         for filter in self._filters:
-            if filter.check(update):
-                return True
-        return False
+            result = filter.evaluate(update)
+            if result.result:
+                return result
+        return FAILED
+
+    @final
+    def __evaluate_many__(self, updates: Sequence[TUpdate]) -> list[ContainedResult]:
+        results: list[ContainedResult] = [FAILED] * len(updates)
+        pending = list(range(len(updates)))
+        for filter in self._filters:
+            if not pending:
+                break
+            checked = filter.evaluate_many([updates[i] for i in pending])
+            remained: list[int] = []
+            for i, result in zip(pending, checked):
+                if result.result:
+                    results[i] = result
+                else:
+                    remained.append(i)
+            pending = remained
+        return results
 
 
 class XorFilter(JoinedFilter[TUpdate]):
@@ -136,22 +320,42 @@ class XorFilter(JoinedFilter[TUpdate]):
         super().__init__(*_filters)
 
     @final
-    def __wrapping__(self, update: TUpdate) -> bool:
+    def __wrapping__(self, update: TUpdate) -> ContainedResult:
+        passed = FAILED
         count = 0
         for filter in self._filters:
-            if filter.check(update):
+            result = filter.evaluate(update)
+            if result.result:
+                passed = result
                 count += 1
-        return count == 1
+        return passed if count == 1 else FAILED
 
 
-def filter_factory(_check: Callable[[TUpdate], bool]) -> Filter[TUpdate]:
+def filter_factory(
+    _check: Callable[[TUpdate], bool], key: Optional[Hashable] = None
+) -> Filter[TUpdate]:
     """
     Factory function to create a filter.
 
     Args:
         _check (`Callable[[TUpdate], bool]`): A function that takes an item and returns a boolean.
+        key (`Hashable`, optional): Filters with the same key are considered equal and evaluated only once per update.
 
     Returns:
         `Filter`: A filter that checks if a message passes the filter.
     """
-    return SealedFilter(_check)
+    return SealedFilter(_check, key)
+
+
+def field_filter_factory(path: str, value: Any) -> Filter[Any]:
+    """
+    Factory function to create a filter that compares a field of update with a value.
+
+    Args:
+        path (`str`): Dotted path of the field, like `"chat.type"`.
+        value (`Any`): The value to compare with.
+
+    Returns:
+        `Filter`: A filter that checks if the field equals to the value.
+    """
+    return FieldFilter(path, value)
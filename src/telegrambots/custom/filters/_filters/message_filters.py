@@ -1,19 +1,22 @@
-from typing import Callable
+from typing import Callable, Hashable, Optional
 
 from telegrambots.wrapper.types.objects import Message
 
 from .filter_template import Filter, filter_factory
 
 
-def message_filter_factory(_check: Callable[[Message], bool]) -> Filter[Message]:
+def message_filter_factory(
+    _check: Callable[[Message], bool], key: Optional[Hashable] = None
+) -> Filter[Message]:
     """
     Factory function to create a message filter.
 
     Args:
         _check (`Callable[[Message], bool]`): A function that takes a message and returns a boolean.
+        key (`Hashable`, optional): Filters with the same key are considered equal and evaluated only once per update.
 
     Returns:
         `Filter`: A filter that checks if a message passes the filter.
     """
 
-    return filter_factory(_check)
+    return filter_factory(_check, key)
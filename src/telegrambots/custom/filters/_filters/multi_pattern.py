@@ -0,0 +1,297 @@
+import re
+from collections import deque
+from typing import Any, Callable, Generic, Hashable, Iterable, Mapping, Optional
+
+from ...general import ContainedResult, TUpdate
+from .filter_template import FAILED, Filter
+
+
+class _AutomatonNode:
+    __slots__ = ("goto", "fail", "outputs")
+
+    def __init__(self) -> None:
+        self.goto: dict[str, "_AutomatonNode"] = {}
+        self.fail: Optional["_AutomatonNode"] = None
+        self.outputs: list[tuple[Hashable, int]] = []
+
+
+class PatternMatch:
+    """A single occurrence of a pattern inside scanned text.
+
+    It can be pickled ( e.g. in a `ContextSnapshot` ), then `match` is None but `groups()`
+    and `groupdict()` are kept.
+    """
+
+    __slots__ = ("pattern_id", "start", "end", "match", "_groups", "_groupdict")
+
+    def __init__(
+        self,
+        pattern_id: Hashable,
+        start: int,
+        end: int,
+        match: Optional[re.Match[str]] = None,
+    ) -> None:
+        self.pattern_id = pattern_id
+        self.start = start
+        self.end = end
+        self.match = match
+        self._groups: tuple[Optional[str], ...] = ()
+        self._groupdict: dict[str, Optional[str]] = {}
+
+    def groups(self) -> tuple[Optional[str], ...]:
+        """Groups of the regular expression, empty for keywords."""
+        if self.match is not None:
+            return self.match.groups()
+        return self._groups
+
+    def groupdict(self) -> dict[str, Optional[str]]:
+        """Named groups of the regular expression, empty for keywords."""
+        if self.match is not None:
+            return self.match.groupdict()
+        return self._groupdict
+
+    def __getstate__(self):
+        # -> `re.Match` can't be pickled.
+        return self.pattern_id, self.start, self.end, self.groups(), self.groupdict()
+
+    def __setstate__(self, state: tuple[Any, ...]):
+        self.pattern_id, self.start, self.end, self._groups, self._groupdict = state
+        self.match = None
+
+    def __repr__(self) -> str:
+        return f"PatternMatch({self.pattern_id!r}, {self.start}, {self.end})"
+
+
+class PatternSet:
+    """A set of keywords and regular expressions that are scanned at once.
+
+    Keywords are compiled into a single Aho-Corasick automaton and every
+    occurrence ( overlapping ones too ) is reported. Regular expressions keep
+    their own flags and are searched one by one, which is faster than one big
+    alternation in `re` ( each search skips ahead by it's literal prefix ).
+
+    Results of the last scanned text are cached, for filters that share the set.
+
+    The set can be changed at runtime, compiling is deferred until the next scan,
+    so a bunch of changes costs a single rebuild.
+    """
+
+    def __init__(
+        self,
+        keywords: Optional[Mapping[Hashable, str | Iterable[str]]] = None,
+        patterns: Optional[Mapping[Hashable, str | re.Pattern[str]]] = None,
+        *,
+        ignore_case: bool = True,
+    ) -> None:
+        """Creates a new pattern set.
+
+        Args:
+            keywords (`Mapping[Hashable, str | Iterable[str]]`, optional): Keywords mapped by their pattern id.
+            patterns (`Mapping[Hashable, str | re.Pattern[str]]`, optional): Regular expressions mapped by their pattern id.
+            ignore_case (`bool`, optional): Match case-insensitively. Defaults to True.
+        """
+        self._ignore_case = ignore_case
+        self._keywords: dict[Hashable, set[str]] = {}
+        self._patterns: dict[Hashable, re.Pattern[str]] = {}
+
+        self._root: Optional[_AutomatonNode] = None
+        self._dirty = True
+
+        self._last_text: Optional[str] = None
+        self._last_result: dict[Hashable, list[PatternMatch]] = {}
+
+        for pattern_id, words in (keywords or {}).items():
+            self.add_keywords(pattern_id, words)
+
+        for pattern_id, pattern in (patterns or {}).items():
+            self.add_pattern(pattern_id, pattern)
+
+    def __contains__(self, pattern_id: Hashable) -> bool:
+        return pattern_id in self._keywords or pattern_id in self._patterns
+
+    def __len__(self) -> int:
+        return len(self._keywords.keys() | self._patterns.keys())
+
+    @property
+    def pattern_ids(self) -> frozenset[Hashable]:
+        """All registered pattern ids."""
+        return frozenset(self._keywords.keys() | self._patterns.keys())
+
+    def add_keywords(self, pattern_id: Hashable, keywords: str | Iterable[str]):
+        """Adds one or more keywords under a pattern id.
+
+        Args:
+            pattern_id (`Hashable`): The id that is reported when any of keywords matches.
+            keywords (`str | Iterable[str]`): The keyword(s) to add.
+        """
+        if isinstance(keywords, str):
+            keywords = [keywords]
+
+        words = self._keywords.setdefault(pattern_id, set())
+        for keyword in keywords:
+            if not keyword:
+                raise ValueError("Keyword cannot be empty.")
+            words.add(self._normalize(keyword))
+        self._invalidate()
+        return self
+
+    def add_pattern(self, pattern_id: Hashable, pattern: str | re.Pattern[str]):
+        """Adds a regular expression under a pattern id.
+
+        Args:
+            pattern_id (`Hashable`): The id that is reported when the pattern matches.
+            pattern (`str | re.Pattern[str]`): The regular expression, flags of compiled ones are kept.
+        """
+        if isinstance(pattern, re.Pattern):
+            source, flags = pattern.pattern, pattern.flags
+        else:
+            source, flags = pattern, 0
+        if self._ignore_case:
+            flags |= re.IGNORECASE
+        # -> fail early on invalid patterns.
+        self._patterns[pattern_id] = re.compile(source, flags)
+        self._invalidate()
+        return self
+
+    def remove(self, pattern_id: Hashable):
+        """Removes every keyword and pattern registered under a pattern id.
+
+        Args:
+            pattern_id (`Hashable`): The id to remove.
+        """
+        self._keywords.pop(pattern_id, None)
+        self._patterns.pop(pattern_id, None)
+        self._invalidate()
+        return self
+
+    def scan(self, text: str) -> dict[Hashable, list[PatternMatch]]:
+        """Scans the text once and returns all matches grouped by pattern id.
+
+        Offsets are of the given text. The returned dict is new for each call, it can be changed.
+
+        Args:
+            text (`str`): The text to scan.
+        """
+        if text is not self._last_text or self._dirty:
+            self._last_result = self._scan(text)
+            self._last_text = text
+        return {k: list(v) for k, v in self._last_result.items()}
+
+    def _scan(self, text: str) -> dict[Hashable, list[PatternMatch]]:
+        if self._dirty:
+            self._compile()
+
+        result: dict[Hashable, list[PatternMatch]] = {}
+
+        if self._root is not None:
+            normalized = self._normalize(text)
+            # -> lowering may change the length ( e.g. "İ" ), map offsets back to the text.
+            origins = None if len(normalized) == len(text) else self._origins(text)
+            node = self._root
+            for index, char in enumerate(normalized):
+                while char not in node.goto and node is not self._root:
+                    node = node.fail  # type: ignore
+                node = node.goto.get(char, self._root)
+                for pattern_id, length in node.outputs:
+                    start = index - length + 1
+                    if origins is None:
+                        found = PatternMatch(pattern_id, start, index + 1)
+                    else:
+                        found = PatternMatch(
+                            pattern_id, origins[start], origins[index] + 1
+                        )
+                    result.setdefault(pattern_id, []).append(found)
+
+        for pattern_id, pattern in self._patterns.items():
+            for match in pattern.finditer(text):
+                result.setdefault(pattern_id, []).append(
+                    PatternMatch(pattern_id, match.start(), match.end(), match)
+                )
+        return result
+
+    def _origins(self, text: str) -> list[int]:
+        """Index of the character in the text, for each character of the normalized text."""
+        origins: list[int] = []
+        for index, char in enumerate(text):
+            origins.extend([index] * len(self._normalize(char)))
+        return origins
+
+    def matching_ids(self, text: str) -> frozenset[Hashable]:
+        """Returns ids of all patterns that match the text.
+
+        Args:
+            text (`str`): The text to scan.
+        """
+        return frozenset(self.scan(text))
+
+    def _normalize(self, text: str) -> str:
+        return text.lower() if self._ignore_case else text
+
+    def _invalidate(self):
+        self._dirty = True
+        self._last_text = None
+        self._last_result = {}
+
+    def _compile(self):
+        self._root = None
+        if self._keywords:
+            root = _AutomatonNode()
+            for pattern_id, words in self._keywords.items():
+                for word in words:
+                    node = root
+                    for char in word:
+                        node = node.goto.setdefault(char, _AutomatonNode())
+                    node.outputs.append((pattern_id, len(word)))
+
+            queue: deque[_AutomatonNode] = deque()
+            for child in root.goto.values():
+                child.fail = root
+                queue.append(child)
+
+            while queue:
+                node = queue.popleft()
+                for char, child in node.goto.items():
+                    fail = node.fail
+                    while fail is not None and char not in fail.goto:
+                        fail = fail.fail
+                    child.fail = fail.goto[char] if fail is not None else root
+                    child.outputs.extend(child.fail.outputs)
+                    queue.append(child)
+            self._root = root
+
+        self._dirty = False
+
+
+class PatternSetFilter(Generic[TUpdate], Filter[TUpdate]):
+    def __init__(
+        self,
+        pattern_set: PatternSet,
+        get_text: Callable[[TUpdate], Optional[str]],
+        *pattern_ids: Hashable,
+    ) -> None:
+        """Allows only updates which text matches any of the given pattern ids.
+
+        Matches are available as `pattern_matches` in handler's context.
+
+        Args:
+            pattern_set (`PatternSet`): The set of patterns to scan with. Can be shared between filters.
+            get_text (`Callable[[TUpdate], Optional[str]]`): A function that returns the text to scan.
+            *pattern_ids (`Hashable`): Pattern ids to look for, any pattern if nothing is given.
+        """
+        super().__init__()
+        self._pattern_set = pattern_set
+        self._get_text = get_text
+        self._pattern_ids = frozenset(pattern_ids)
+
+    def __evaluate__(self, update: TUpdate) -> ContainedResult:
+        text = self._get_text(update)
+        if text is None:
+            return FAILED
+
+        matches: dict[Any, list[PatternMatch]] = self._pattern_set.scan(text)
+        if self._pattern_ids:
+            matches = {k: v for k, v in matches.items() if k in self._pattern_ids}
+
+        if matches:
+            return ContainedResult(True, {"pattern_matches": matches})
+        return FAILED
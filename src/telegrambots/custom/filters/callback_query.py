@@ -1,23 +1,25 @@
-from typing import Callable, overload
+from typing import Callable, Hashable, Optional, overload
 from ._filters.filter_template import Filter, filter_factory
+from ._filters.multi_pattern import PatternSet, PatternSetFilter
 import re
 from telegrambots.wrapper.types.objects import CallbackQuery
 
 
 def callback_query_filter_factory(
-    _check: Callable[[CallbackQuery], bool]
+    _check: Callable[[CallbackQuery], bool], key: Optional[Hashable] = None
 ) -> Filter[CallbackQuery]:
     """
     Factory function to create a callback_query filter.
 
     Args:
         _check (`Callable[[CallbackQuery], bool]`): A function that takes a callback_query and returns a boolean.
+        key (`Hashable`, optional): Filters with the same key are considered equal and evaluated only once per update.
 
     Returns:
         `Filter`: A filter that checks if a callback_query passes the filter.
     """
 
-    return filter_factory(_check)
+    return filter_factory(_check, key)
 
 
 @overload
@@ -56,9 +58,24 @@ def regex(pattern: str | re.Pattern[str]):
 
     return callback_query_filter_factory(
         lambda callback: callback.data is not None
-        and ap.match(callback.data) is not None
+        and ap.match(callback.data) is not None,
+        ("regex", ap.pattern, ap.flags),
     )
 
 
-any_callback = callback_query_filter_factory(lambda _: True)
+any_callback = callback_query_filter_factory(lambda _: True, "any")
 """ Allows any callback_query. """
+
+
+def patterns(pattern_set: PatternSet, *pattern_ids: Hashable) -> Filter[CallbackQuery]:
+    """
+    Allows only callback queries which data matches any of the given pattern ids.
+
+    Args:
+        pattern_set (`PatternSet`): The set of keywords and patterns to scan with.
+        *pattern_ids (`Hashable`): Pattern ids to look for, any pattern if nothing is given.
+
+    Returns:
+        `Filter`: A filter that allows only callback queries that match any of the given pattern ids.
+    """
+    return PatternSetFilter(pattern_set, lambda callback: callback.data, *pattern_ids)
@@ -1,16 +1,21 @@
 import re
-from typing import Literal, overload
+from typing import Hashable, Literal, overload
 
 from ..filters import Filter
+from ..general import ContainedResult
 from telegrambots.wrapper.types.objects import Message
 
+from ._filters.filter_template import FAILED, field_filter_factory
 from ._filters.message_filters import message_filter_factory
+from ._filters.multi_pattern import PatternSet, PatternSetFilter
 
 
-any_message = message_filter_factory(lambda _: True)
+any_message = message_filter_factory(lambda _: True, "any")
 
 
-text_message = message_filter_factory(lambda message: message.text is not None)
+text_message = message_filter_factory(
+    lambda message: message.text is not None, "text"
+)
 """ Allows only text messages. """
 
 
@@ -24,7 +29,7 @@ def chat_type(chat_type: Literal["private", "group", "supergroup", "channel"]):
     Returns:
         `Filter`: A filter that allows only messages from a certain chat type.
     """
-    return message_filter_factory(lambda message: message.chat.type == chat_type)
+    return field_filter_factory("chat.type", chat_type)
 
 
 private = chat_type("private")
@@ -65,10 +70,28 @@ class Regex(Filter[Message]):
             self._ap = pattern
         super().__init__()
 
-    def __check__(self, message: Message) -> bool:
+    def __evaluate__(self, message: Message) -> ContainedResult:
         if message.text is not None:
             matches = self._ap.match(message.text)
             if matches is not None:
-                self._set_metadata("matches", matches)
-                return True
-        return False
+                return ContainedResult(True, {"matches": matches})
+        return FAILED
+
+    def __node_key__(self) -> Hashable:
+        return ("regex", self._ap.pattern, self._ap.flags)
+
+
+def patterns(pattern_set: PatternSet, *pattern_ids: Hashable) -> Filter[Message]:
+    """
+    Allows only messages which text matches any of the given pattern ids.
+
+    The text is scanned once per message, no matter how many filters share the same set.
+
+    Args:
+        pattern_set (`PatternSet`): The set of keywords and patterns to scan with.
+        *pattern_ids (`Hashable`): Pattern ids to look for, any pattern if nothing is given.
+
+    Returns:
+        `Filter`: A filter that allows only messages that match any of the given pattern ids.
+    """
+    return PatternSetFilter(pattern_set, lambda message: message.text, *pattern_ids)
@@ -6,6 +6,20 @@ from telegrambots.wrapper.types.objects.update import Update, TUpdate
 
 TKey = TypeVar("TKey")
 
+RECEIVED_AT = "received_at"
+"""Update metadata key: unix time the update was received from Telegram."""
+DISPATCHED_AT = "dispatched_at"
+"""Update metadata key: unix time the dispatcher started processing the update."""
+PRIORITY = "priority"
+"""Update metadata key: priority of the update, higher is sooner. 0 if not set."""
+
+
+def stamp(update: Update[Any], key: str, value: float) -> float:
+    """Sets a timestamp metadata on the update, if it's not set already."""
+    if update.has_metadata(key):
+        return update.get_metadata(key, value)
+    return update._set_metadata(key, value)  # type: ignore
+
 
 class Exctractable(Generic[TUpdate], ABC):
     @abstractmethod
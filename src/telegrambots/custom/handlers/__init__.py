@@ -5,6 +5,14 @@ from .exceptions.exception_handler import (
     ExceptionHandler,
     default_exception_handler,
 )
+from ._handlers.concurrency import ConcurrencyLimit, Overflow
+from ._handlers.state_machine import (
+    TRANSITION,
+    StateMachine,
+    StateMachineHandler,
+    Transition,
+    sender_key,
+)
 from ._handlers import abstracts
 
 __all__ = [
@@ -15,4 +23,11 @@ __all__ = [
     "AbstractExceptionHandler",
     "ExceptionHandler",
     "default_exception_handler",
+    "ConcurrencyLimit",
+    "Overflow",
+    "TRANSITION",
+    "StateMachine",
+    "StateMachineHandler",
+    "Transition",
+    "sender_key",
 ]
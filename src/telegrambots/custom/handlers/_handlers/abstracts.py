@@ -5,6 +5,7 @@ from telegrambots.wrapper.types.objects import CallbackQuery, Message
 
 from ...contexts import CallbackQueryContext, MessageContext
 from .handler_template import AbstractHandler
+from .concurrency import ConcurrencyLimit
 
 
 if TYPE_CHECKING:
@@ -21,6 +22,8 @@ class MessageHandler(AbstractHandler[MessageContext, Message], ABC):
         continue_after: Optional[list[str]] = None,
         allow_continue_after_self: bool = False,
         priority: int = 0,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int | ConcurrencyLimit] = None,
     ) -> None:
         super().__init__(
             tag,
@@ -30,6 +33,8 @@ class MessageHandler(AbstractHandler[MessageContext, Message], ABC):
             continue_after,
             allow_continue_after_self,
             priority,
+            timeout,
+            max_concurrency,
         )
 
     @final
@@ -53,6 +58,8 @@ class CallbackQueryHandler(AbstractHandler[CallbackQueryContext, CallbackQuery],
         continue_after: Optional[list[str]] = None,
         allow_continue_after_self: bool = False,
         priority: int = 0,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int | ConcurrencyLimit] = None,
     ) -> None:
         super().__init__(
             tag,
@@ -62,6 +69,8 @@ class CallbackQueryHandler(AbstractHandler[CallbackQueryContext, CallbackQuery],
             continue_after,
             allow_continue_after_self,
             priority,
+            timeout,
+            max_concurrency,
         )
 
     @final
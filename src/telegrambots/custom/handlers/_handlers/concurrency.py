@@ -0,0 +1,103 @@
+import asyncio
+from typing import TYPE_CHECKING, Any, Literal, Optional
+
+from telegrambots.wrapper.types.objects import CallbackQuery, Message
+
+if TYPE_CHECKING:
+    from telegrambots.wrapper.types.objects import Update
+
+    from ...dispatcher import Dispatcher
+
+
+Overflow = Literal["wait", "reject", "drop"]
+
+
+class ConcurrencyLimit:
+    """Caps how many updates a handler processes at the same time.
+
+    One limit can be shared between handlers, then they're capped together.
+
+    Overflow behaviors ( when the limit is reached ):
+        - `wait`: the update waits for a free slot.
+        - `reject`: the update is not processed, and the user gets `reply`
+            ( messages are replied, callback queries are answered ).
+        - `drop`: the update is not processed.
+
+    Rejected and dropped updates stop propagation by default, so they don't fall
+    through to later handlers. Pass `propagate=True` to let them continue.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        overflow: Overflow = "wait",
+        reply: str = "Too many requests, please try again later.",
+        propagate: bool = False,
+    ) -> None:
+        """Creates a concurrency limit.
+
+        Args:
+            max_concurrency (`int`): Maximum number of updates being processed at the same time.
+            overflow (`Overflow`, optional): What to do when the limit is reached. Defaults to "wait".
+            reply (`str`, optional): Text that rejected users get.
+            propagate (`bool`, optional): If rejected or dropped updates should continue
+                to later handlers. Defaults to False.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency should be at least 1.")
+        if overflow not in ("wait", "reject", "drop"):
+            raise ValueError(f"Unknown overflow behavior: {overflow}")
+
+        self.max_concurrency = max_concurrency
+        self.overflow = overflow
+        self.reply = reply
+        self.propagate = propagate
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.running = 0
+        self.overflowed = 0
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # -> created on first use, so it binds to the running loop, not the one at registration.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    @property
+    def full(self) -> bool:
+        return self.semaphore.locked()
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        self.running += 1
+        return self
+
+    async def __aexit__(self, *_: Any):
+        self.running -= 1
+        self.semaphore.release()
+
+    async def reject(self, dp: "Dispatcher", update: "Update[Any]"):
+        """Tells the user that their update is rejected.
+
+        Args:
+            dp (`Dispatcher`): The dispatcher.
+            update (`Update`): The rejected update.
+        """
+        actual = update.actual_update
+        if isinstance(actual, CallbackQuery):
+            await dp.bot.answer_callback_query(actual.id, self.reply)
+        elif isinstance(actual, Message):
+            await dp.bot.send_message(
+                actual.chat.id,
+                self.reply,
+                reply_to_message_id=actual.message_id,
+                allow_sending_without_reply=True,
+            )
+
+
+def as_concurrency_limit(
+    value: Optional["int | ConcurrencyLimit"],
+) -> Optional[ConcurrencyLimit]:
+    if value is None or isinstance(value, ConcurrencyLimit):
+        return value
+    return ConcurrencyLimit(value)
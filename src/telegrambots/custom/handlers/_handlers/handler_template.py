@@ -15,11 +15,11 @@ from ...contexts._contexts.context_template import Context
 from ...general import (
     Exctractable,
     TUpdate,
-    check,
     extract,
     ContainedResult,
     general_extractor,
 )
+from .concurrency import ConcurrencyLimit, as_concurrency_limit
 
 if TYPE_CHECKING:
     from telegrambots.wrapper.types.objects import Update
@@ -35,7 +35,9 @@ class HandlerTemplate(metaclass=ABCMeta):
         update: "Update[Any]",
         *args: Any,
         **kwargs: Any,
-    ) -> None:
+    ) -> Optional[bool]:
+        """Processes the update, returns propagation: `None` goes on,
+        `True` continues to next handler and `False` stops."""
         ...
 
     @abstractmethod
@@ -65,13 +67,21 @@ class HandlerTemplate(metaclass=ABCMeta):
     def priority(self) -> int:
         return 0
 
+    @property
+    def timeout(self) -> Optional[float]:
+        return None
+
+    @property
+    def max_concurrency(self) -> Optional[ConcurrencyLimit]:
+        return None
+
     async def process(
         self,
         update: "Update[Any]",
         filter_data: Mapping[str, Any],
         *args: Any,
         **kwargs: Any,
-    ) -> None:
+    ) -> Optional[bool]:
         kwargs.update(**filter_data)
         return await self.__process__(
             update,
@@ -91,6 +101,8 @@ class GenericHandler(Generic[TUpdate], Exctractable[TUpdate], ABC, HandlerTempla
         continue_after: Optional[list[str]] = None,
         allow_continue_after_self: bool = False,
         priority: int = 0,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int | ConcurrencyLimit] = None,
     ) -> None:
         super().__init__()
         self.__dp = dp
@@ -98,6 +110,8 @@ class GenericHandler(Generic[TUpdate], Exctractable[TUpdate], ABC, HandlerTempla
         self.__filter = filter
         self.__update_type = update_type
         self.__priority = priority
+        self.__timeout = timeout
+        self.__max_concurrency = as_concurrency_limit(max_concurrency)
 
         if not self.__tag:
             raise ValueError("Tag cannot be None or Empty.")
@@ -124,21 +138,25 @@ class GenericHandler(Generic[TUpdate], Exctractable[TUpdate], ABC, HandlerTempla
         update: "Update[TUpdate]",
         *args: Any,
         **kwargs: Any,
-    ) -> None:
+    ) -> Optional[bool]:
         ...
 
     @final
     def should_process(self, update: "Update[TUpdate]") -> ContainedResult:
         if self.__filter is None:
             return ContainedResult(True, {})
-        checked = check(self.__filter, extract(self, update))
-        return ContainedResult(checked, self.__filter)
+        return self.__filter.evaluate(extract(self, update))
 
     @final
     @property
     def tag(self) -> str:
         return self.__tag
 
+    @final
+    @property
+    def filter(self) -> Optional["Filter[TUpdate]"]:
+        return self.__filter
+
     @final
     @property
     def continue_after(self) -> Optional[list[str]]:
@@ -154,6 +172,16 @@ class GenericHandler(Generic[TUpdate], Exctractable[TUpdate], ABC, HandlerTempla
     def priority(self) -> int:
         return self.__priority
 
+    @final
+    @property
+    def timeout(self) -> Optional[float]:
+        return self.__timeout
+
+    @final
+    @property
+    def max_concurrency(self) -> Optional[ConcurrencyLimit]:
+        return self.__max_concurrency
+
     @final
     @property
     def dp(self) -> "Dispatcher":
@@ -179,6 +207,8 @@ class AbstractHandler(Generic[TContext, TUpdate], GenericHandler[TUpdate], ABC):
         continue_after: Optional[list[str]] = None,
         allow_continue_after_self: bool = False,
         priority: int = 0,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int | ConcurrencyLimit] = None,
     ) -> None:
         super().__init__(
             tag,
@@ -188,6 +218,8 @@ class AbstractHandler(Generic[TContext, TUpdate], GenericHandler[TUpdate], ABC):
             continue_after,
             allow_continue_after_self,
             priority,
+            timeout,
+            max_concurrency,
         )
 
     @final
@@ -196,11 +228,16 @@ class AbstractHandler(Generic[TContext, TUpdate], GenericHandler[TUpdate], ABC):
         update: "Update[TUpdate]",
         *args: Any,
         **kwargs: Any,
-    ):
-        return await self._process(self._build_context(update, *args, **kwargs))
+    ) -> Optional[bool]:
+        context = self._build_context(update, *args, **kwargs)
+        propagation = await self._process(context)
+        if isinstance(propagation, bool):
+            return propagation
+        return context.marked_propagation
 
     @abstractmethod
-    async def _process(self, context: TContext) -> None:
+    async def _process(self, context: TContext) -> Optional[bool]:
+        """Processes the context. Returns propagation, or None ( see `HandlerTemplate.__process__` )."""
         ...
 
     @abstractmethod
@@ -219,11 +256,13 @@ class SealedHandler(Generic[TContext, TUpdate], AbstractHandler[TContext, TUpdat
         dp: "Dispatcher",
         tag: str,
         update_type: type[TUpdate],
-        processor: Callable[[TContext], Awaitable[None]],
+        processor: Callable[[TContext], Awaitable[Optional[bool]]],
         filter: Optional["Filter[TUpdate]"] = None,
         continue_after: Optional[list[str]] = None,
         allow_continue_after_self: bool = False,
         priority: int = 0,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int | ConcurrencyLimit] = None,
     ) -> None:
         super().__init__(
             tag,
@@ -233,6 +272,8 @@ class SealedHandler(Generic[TContext, TUpdate], AbstractHandler[TContext, TUpdat
             continue_after,
             allow_continue_after_self,
             priority,
+            timeout,
+            max_concurrency,
         )
 
         if dp is None:
@@ -241,8 +282,8 @@ class SealedHandler(Generic[TContext, TUpdate], AbstractHandler[TContext, TUpdat
         self._processor = processor
 
     @final
-    async def _process(self, context: TContext) -> None:
-        await self._processor(context)
+    async def _process(self, context: TContext) -> Optional[bool]:
+        return await self._processor(context)
 
     @abstractmethod
     def _build_context(
@@ -265,6 +306,8 @@ class Handler(Generic[TUpdate], SealedHandler[Context[TUpdate], TUpdate]):
         continue_after: Optional[list[str]] = None,
         allow_continue_after_self: bool = False,
         priority: int = 0,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int | ConcurrencyLimit] = None,
     ) -> None:
         super().__init__(
             dp,
@@ -275,6 +318,8 @@ class Handler(Generic[TUpdate], SealedHandler[Context[TUpdate], TUpdate]):
             continue_after,
             allow_continue_after_self,
             priority,
+            timeout,
+            max_concurrency,
         )
 
     @final
@@ -0,0 +1,385 @@
+from time import perf_counter
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Generator,
+    Hashable,
+    Iterable,
+    Optional,
+    Sequence,
+)
+
+from ...filters._filters.filter_template import (
+    FAILED,
+    PASSED,
+    AndFilter,
+    Filter,
+    OrFilter,
+    ReverseFilter,
+    XorFilter,
+)
+from ...general import ContainedResult
+from .handler_template import GenericHandler, HandlerTemplate
+
+if TYPE_CHECKING:
+    from telegrambots.wrapper.types.objects import Update
+
+
+_Node = Callable[[Any, list[Optional[ContainedResult]]], ContainedResult]
+_Results = list[Optional[ContainedResult]]
+_BatchNode = Callable[
+    [Sequence[Any], list[int], _Results, list[Optional[_Results]]], None
+]
+_JOINED = (AndFilter, OrFilter, XorFilter, ReverseFilter)
+_OnFiltered = Callable[[HandlerTemplate, "Update[Any]", float, bool], None]
+
+
+class HandlerRouter:
+    """Routes updates of a single type to the handlers that should process them.
+
+    Filters of all handlers are merged into one decision graph. Equal sub-filters
+    ( same `__node_key__` ) become a single node, and each node is evaluated at most
+    once per update. So routing costs as much as the number of distinct predicates,
+    not the number of handlers.
+    """
+
+    def __init__(self, handlers: Iterable[HandlerTemplate]) -> None:
+        """Builds the decision graph.
+
+        Args:
+            handlers (`Iterable[HandlerTemplate]`): Handlers ordered by the order they should be processed.
+        """
+        self._nodes: list[_Node] = []
+        self._batch_nodes: list[_BatchNode] = []
+        self._interned: dict[Hashable, int] = {}
+        self._entries: list[tuple[HandlerTemplate, Optional[int]]] = []
+
+        for handler in handlers:
+            if isinstance(handler, GenericHandler):
+                filter: Optional[Filter[Any]] = handler.filter
+                self._entries.append(
+                    (handler, None if filter is None else self._intern(filter))
+                )
+            else:
+                # -> we know nothing about it's filters.
+                self._entries.append((handler, -1))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nodes_count(self) -> int:
+        """Number of distinct nodes in the decision graph."""
+        return len(self._nodes)
+
+    def route(
+        self, update: "Update[Any]", on_filtered: Optional[_OnFiltered] = None
+    ) -> Generator[tuple[HandlerTemplate, ContainedResult], None, None]:
+        """Yields handlers that should process the update, in order.
+
+        Filters are evaluated lazily, so nothing is checked for handlers
+        that are never reached ( when propagation stops ).
+
+        Args:
+            update (`Update`): The update to route.
+            on_filtered (`Callable[[HandlerTemplate, Update, float, bool], None]`, optional):
+                Called with time spent on filters of each handler and the outcome.
+        """
+        if on_filtered is not None:
+            yield from self._route_timed(update, on_filtered)
+            return
+
+        actual = update.actual_update
+        memo: list[Optional[ContainedResult]] = [None] * len(self._nodes)
+
+        for handler, index in self._entries:
+            if index is None:
+                yield handler, PASSED
+            elif index == -1:
+                result = handler.should_process(update)
+                if result.result:
+                    yield handler, result
+            else:
+                result = self._evaluate(index, actual, memo)
+                if result.result:
+                    yield handler, result
+
+    def route_many(
+        self,
+        updates: Sequence["Update[Any]"],
+        on_filtered: Optional[_OnFiltered] = None,
+    ) -> list[list[tuple[HandlerTemplate, ContainedResult]]]:
+        """Routes a batch of updates at once.
+
+        Each node of the graph is evaluated over the whole batch ( only for updates that
+        still need it ), which lets filters use their batch fast paths.
+        Unlike `route`, filters of all handlers are evaluated eagerly.
+
+        Args:
+            updates (`Sequence[Update]`): The updates to route.
+            on_filtered (`Callable[[HandlerTemplate, Update, float, bool], None]`, optional):
+                Called for each handler and update, time of the batch is split evenly between updates.
+
+        Returns:
+            `list[list[tuple[HandlerTemplate, ContainedResult]]]`: Matched handlers of each update, in order.
+        """
+        actuals = [update.actual_update for update in updates]
+        everyone = list(range(len(actuals)))
+        memo: list[Optional[_Results]] = [None] * len(self._nodes)
+        routes: list[list[tuple[HandlerTemplate, ContainedResult]]] = [
+            [] for _ in actuals
+        ]
+
+        for handler, index in self._entries:
+            started = perf_counter()
+            if index is None:
+                results: _Results = [PASSED] * len(updates)
+            elif index == -1:
+                results = [handler.should_process(update) for update in updates]
+            else:
+                results = self._evaluate_many(index, actuals, everyone, memo)
+
+            if on_filtered is not None and updates:
+                elapsed = (perf_counter() - started) / len(updates)
+                for update, result in zip(updates, results):
+                    on_filtered(handler, update, elapsed, result.result)  # type: ignore
+
+            for result, route in zip(results, routes):
+                if result.result:  # type: ignore
+                    route.append((handler, result))  # type: ignore
+        return routes
+
+    def _route_timed(
+        self, update: "Update[Any]", on_filtered: _OnFiltered
+    ) -> Generator[tuple[HandlerTemplate, ContainedResult], None, None]:
+        actual = update.actual_update
+        memo: list[Optional[ContainedResult]] = [None] * len(self._nodes)
+
+        for handler, index in self._entries:
+            started = perf_counter()
+            if index is None:
+                result = PASSED
+            elif index == -1:
+                result = handler.should_process(update)
+            else:
+                result = self._evaluate(index, actual, memo)
+            on_filtered(handler, update, perf_counter() - started, result.result)
+            if result.result:
+                yield handler, result
+
+    def _evaluate_many(
+        self,
+        index: int,
+        actuals: Sequence[Any],
+        indices: list[int],
+        memo: list[Optional[_Results]],
+    ) -> _Results:
+        results = memo[index]
+        if results is None:
+            results = memo[index] = [None] * len(actuals)
+        missing = [i for i in indices if results[i] is None]
+        if missing:
+            self._batch_nodes[index](actuals, missing, results, memo)
+        return results
+
+    def _evaluate(
+        self, index: int, actual: Any, memo: list[Optional[ContainedResult]]
+    ) -> ContainedResult:
+        result = memo[index]
+        if result is None:
+            if actual is None:
+                result = FAILED
+            else:
+                result = self._nodes[index](actual, memo)
+            memo[index] = result
+        return result
+
+    def _intern(self, filter: Filter[Any]) -> int:
+        key = filter.__node_key__()
+        index = self._interned.get(key)
+        if index is not None:
+            return index
+
+        children: list[int] = []
+        if type(filter) in _JOINED:
+            children = [self._intern(f) for f in filter.filters]  # type: ignore
+
+        node = self._compile(filter, children)
+        batch_node = self._compile_batch(filter, children)
+        index = len(self._nodes)
+        self._nodes.append(node)
+        self._batch_nodes.append(batch_node)
+        self._interned[key] = index
+        return index
+
+    def _compile(self, filter: Filter[Any], children: list[int]) -> _Node:
+        evaluate = self._evaluate
+        filter_type = type(filter)
+
+        if filter_type is AndFilter:
+
+            def and_node(actual: Any, memo: list[Optional[ContainedResult]]):
+                metadata: dict[str, Any] = {}
+                for child in children:
+                    result = evaluate(child, actual, memo)
+                    if not result.result:
+                        return FAILED
+                    if result.metadata:
+                        metadata |= result.metadata
+                return ContainedResult(True, metadata) if metadata else PASSED
+
+            return and_node
+
+        if filter_type is OrFilter:
+
+            def or_node(actual: Any, memo: list[Optional[ContainedResult]]):
+                for child in children:
+                    result = evaluate(child, actual, memo)
+                    if result.result:
+                        return result
+                return FAILED
+
+            return or_node
+
+        if filter_type is XorFilter:
+
+            def xor_node(actual: Any, memo: list[Optional[ContainedResult]]):
+                passed = FAILED
+                count = 0
+                for child in children:
+                    result = evaluate(child, actual, memo)
+                    if result.result:
+                        passed = result
+                        count += 1
+                return passed if count == 1 else FAILED
+
+            return xor_node
+
+        if filter_type is ReverseFilter:
+
+            def reverse_node(actual: Any, memo: list[Optional[ContainedResult]]):
+                for child in children:
+                    if evaluate(child, actual, memo).result:
+                        return FAILED
+                return PASSED
+
+            return reverse_node
+
+        def atom_node(actual: Any, memo: list[Optional[ContainedResult]]):
+            return filter.evaluate(actual)
+
+        return atom_node
+
+    def _compile_batch(self, filter: Filter[Any], children: list[int]) -> _BatchNode:
+        evaluate = self._evaluate_many
+        filter_type = type(filter)
+
+        if filter_type is AndFilter:
+
+            def and_node(
+                actuals: Sequence[Any],
+                indices: list[int],
+                results: _Results,
+                memo: list[Optional[_Results]],
+            ):
+                pending = indices
+                for child in children:
+                    checked = evaluate(child, actuals, pending, memo)
+                    survived: list[int] = []
+                    for i in pending:
+                        if checked[i].result:  # type: ignore
+                            survived.append(i)
+                        else:
+                            results[i] = FAILED
+                    pending = survived
+                    if not pending:
+                        return
+
+                for i in pending:
+                    metadata: dict[str, Any] = {}
+                    for child in children:
+                        child_metadata = memo[child][i].metadata  # type: ignore
+                        if child_metadata:
+                            metadata |= child_metadata
+                    results[i] = ContainedResult(True, metadata) if metadata else PASSED
+
+            return and_node
+
+        if filter_type is OrFilter:
+
+            def or_node(
+                actuals: Sequence[Any],
+                indices: list[int],
+                results: _Results,
+                memo: list[Optional[_Results]],
+            ):
+                pending = indices
+                for child in children:
+                    checked = evaluate(child, actuals, pending, memo)
+                    remained: list[int] = []
+                    for i in pending:
+                        if checked[i].result:  # type: ignore
+                            results[i] = checked[i]
+                        else:
+                            remained.append(i)
+                    pending = remained
+                    if not pending:
+                        return
+
+                for i in pending:
+                    results[i] = FAILED
+
+            return or_node
+
+        if filter_type is XorFilter:
+
+            def xor_node(
+                actuals: Sequence[Any],
+                indices: list[int],
+                results: _Results,
+                memo: list[Optional[_Results]],
+            ):
+                checked = [evaluate(child, actuals, indices, memo) for child in children]
+                for i in indices:
+                    passed = [c[i] for c in checked if c[i].result]  # type: ignore
+                    results[i] = passed[0] if len(passed) == 1 else FAILED
+
+            return xor_node
+
+        if filter_type is ReverseFilter:
+
+            def reverse_node(
+                actuals: Sequence[Any],
+                indices: list[int],
+                results: _Results,
+                memo: list[Optional[_Results]],
+            ):
+                pending = indices
+                for child in children:
+                    checked = evaluate(child, actuals, pending, memo)
+                    remained: list[int] = []
+                    for i in pending:
+                        if checked[i].result:  # type: ignore
+                            results[i] = FAILED
+                        else:
+                            remained.append(i)
+                    pending = remained
+
+                for i in pending:
+                    results[i] = PASSED
+
+            return reverse_node
+
+        def atom_node(
+            actuals: Sequence[Any],
+            indices: list[int],
+            results: _Results,
+            memo: list[Optional[_Results]],
+        ):
+            for i, result in zip(
+                indices, filter.evaluate_many([actuals[i] for i in indices])
+            ):
+                results[i] = result
+
+        return atom_node
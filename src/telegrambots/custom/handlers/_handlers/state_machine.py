@@ -0,0 +1,374 @@
+import asyncio
+import contextlib
+import dataclasses
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Generic,
+    Hashable,
+    Optional,
+    TYPE_CHECKING,
+)
+
+from telegrambots.wrapper.types.objects import CallbackQuery, Message, Update
+
+from ...contexts import CallbackQueryContext, Context, MessageContext
+from ...exceptions.propagations import BreakPropagation, ContinuePropagation
+from ...general import ContainedResult, TUpdate
+from .concurrency import ConcurrencyLimit, as_concurrency_limit
+from .handler_template import HandlerTemplate
+
+if TYPE_CHECKING:
+    from ...filters._filters.filter_template import Filter
+    from ...dispatcher import Dispatcher
+
+
+TRANSITION = "transition"
+"""Key of the transition that is taken, in context's data."""
+
+_NEXT_STATE = "__next_state__"
+
+
+def sender_key(update: Update[Any]) -> Optional[Hashable]:
+    """Default key of state machines, id of the user who sent the update."""
+    user = getattr(update.actual_update, "from_user", None)
+    if user is not None:
+        return user.id
+    return None
+
+
+@dataclasses.dataclass(init=True, frozen=True, slots=True)
+class Transition(Generic[TUpdate]):
+    source: Optional[str]
+    update_type: type[TUpdate]
+    processor: Callable[[Any], Awaitable[None]]
+    filter: Optional["Filter[TUpdate]"] = None
+    target: Optional[str] = None
+
+
+class StateMachine:
+    """A conversation, declared as states and transitions between them.
+
+    Each user ( or any key ) is in one state, or in none before it starts and after it ends.
+    Transitions are compiled into a table keyed by `(state, update_type)` when the machine
+    is added to a dispatcher, so a step is a dict lookup and the filters of that state only.
+    State machines are checked after continuations and before other handlers.
+
+    The key moves to the target state only after the transition returns ( or stops/continues
+    propagation ). If it fails, times out, or is rejected by `max_concurrency`, the state is kept.
+    Meanwhile the key is held, other updates of it wait ( e.g. with `ParallelProcessor` ), so two
+    quick updates can't take the same transition twice.
+
+    Example:
+        ```py
+        signup = StateMachine("signup")
+
+        @signup.message(None, mf.Regex("^/signup"), target="name")  # -> None is no state
+        async def start(context: MessageContext):
+            await context.reply_text("Your name?")
+
+        @signup.message("name", mf.text_message)  # -> no target, ends the conversation
+        async def got_name(context: MessageContext):
+            await context.reply_text(f"Welcome {context.update.text}!")
+
+        dp.add_state_machine(signup)
+        ```
+
+    Args:
+        name (`str`): Name of the machine, used in handler tags.
+        key (`Callable[[Update], Optional[Hashable]]`, optional): Returns the key that has a state,
+            updates with `None` key are ignored. Defaults to id of the sender.
+        stop_propagation (`bool`, optional): Stop other handlers after a transition. Defaults to True.
+        timeout (`Optional[float]`, optional): Seconds a transition can run before it's cancelled.
+        max_concurrency (`Optional[int | ConcurrencyLimit]`, optional): Maximum number of transitions
+            that run at the same time. Defaults to None ( no limit ).
+        ttl (`Optional[float]`, optional): Seconds a key can stay in a state without a transition,
+            then it's conversation ends. Defaults to a day, None keeps them forever.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        key: Callable[[Update[Any]], Optional[Hashable]] = sender_key,
+        stop_propagation: bool = True,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int | ConcurrencyLimit] = None,
+        ttl: Optional[float] = 86_400,
+    ) -> None:
+        if not name:
+            raise ValueError("Name cannot be None or Empty.")
+
+        self._name = name
+        self._key = key
+        self._stop_propagation = stop_propagation
+        self._timeout = timeout
+        self._max_concurrency = as_concurrency_limit(max_concurrency)
+        self._transitions: list[Transition[Any]] = []
+        self._table: Optional[dict[tuple[Optional[str], type[Any]], list[Transition[Any]]]] = None
+        self._handlers: dict[type[Any], "StateMachineHandler"] = {}
+        self._ttl = ttl
+        # -> key: (state, when it moved there), on `time.monotonic()`.
+        self._states: dict[Hashable, tuple[str, float]] = {}
+        self._pruned_at = time.monotonic()
+        self._held: dict[Hashable, tuple[asyncio.Lock, int]] = {}
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def stop_propagation(self) -> bool:
+        return self._stop_propagation
+
+    @property
+    def update_types(self) -> set[type[Any]]:
+        return {x.update_type for x in self._transitions}
+
+    def add_transition(
+        self,
+        source: Optional[str],
+        update_type: type[TUpdate],
+        processor: Callable[[Any], Awaitable[None]],
+        filter: Optional["Filter[TUpdate]"] = None,
+        target: Optional[str] = None,
+    ) -> Transition[TUpdate]:
+        """Adds a transition. Transitions of the same state and update type are checked in the order they're added.
+
+        Args:
+            source (`Optional[str]`): State the transition starts from, `None` to start the conversation.
+            update_type (`type[TUpdate]`): Type of the update.
+            processor (`Callable[[Any], Awaitable[None]]`): The function to call with the context.
+            filter (`Optional[Filter[TUpdate]]`, optional): Update should pass the filter. Defaults to None.
+            target (`Optional[str]`, optional): Next state, `None` ends the conversation. Defaults to None.
+        """
+        if self._table is not None:
+            raise ValueError(
+                f"State machine {self._name} is compiled, transitions can't be added."
+            )
+
+        transition = Transition(source, update_type, processor, filter, target)
+        self._transitions.append(transition)
+        return transition
+
+    def on(
+        self,
+        source: Optional[str],
+        update_type: type[TUpdate],
+        filter: Optional["Filter[TUpdate]"] = None,
+        target: Optional[str] = None,
+    ):
+        """Adds a transition via decorator, see `add_transition`."""
+
+        def decorator(function: Callable[[Any], Awaitable[None]]):
+            self.add_transition(source, update_type, function, filter, target)
+            return function
+
+        return decorator
+
+    def message(
+        self,
+        source: Optional[str],
+        filter: Optional["Filter[Message]"] = None,
+        target: Optional[str] = None,
+    ) -> Callable[
+        [Callable[[MessageContext], Awaitable[None]]],
+        Callable[[MessageContext], Awaitable[None]],
+    ]:
+        """Adds a transition for messages via decorator, see `add_transition`."""
+        return self.on(source, Message, filter, target)
+
+    def callback_query(
+        self,
+        source: Optional[str],
+        filter: Optional["Filter[CallbackQuery]"] = None,
+        target: Optional[str] = None,
+    ) -> Callable[
+        [Callable[[CallbackQueryContext], Awaitable[None]]],
+        Callable[[CallbackQueryContext], Awaitable[None]],
+    ]:
+        """Adds a transition for callback queries via decorator, see `add_transition`."""
+        return self.on(source, CallbackQuery, filter, target)
+
+    def compile(self, dp: "Dispatcher") -> None:
+        """Builds the transition table, no transitions can be added after this."""
+        table: dict[tuple[Optional[str], type[Any]], list[Transition[Any]]] = {}
+        for transition in self._transitions:
+            table.setdefault((transition.source, transition.update_type), []).append(
+                transition
+            )
+
+        self._table = table
+        self._handlers = {
+            update_type: StateMachineHandler(dp, self, update_type)
+            for update_type in self.update_types
+        }
+
+    def key_of(self, update: Update[Any]) -> Optional[Hashable]:
+        """Returns the key that the update belongs to, `None` if it's ignored."""
+        return self._key(update)
+
+    def state_of(self, key: Hashable) -> Optional[str]:
+        """Returns the state of the key, `None` if it's not in the conversation."""
+        entry = self._states.get(key)
+        if entry is None:
+            return None
+        if self._ttl is not None and time.monotonic() - entry[1] > self._ttl:
+            del self._states[key]
+            return None
+        return entry[0]
+
+    def set_state(self, key: Hashable, state: Optional[str]) -> None:
+        """Moves the key to a state, `None` ends the conversation."""
+        if state is None:
+            self._states.pop(key, None)
+        else:
+            now = time.monotonic()
+            self._states[key] = (state, now)
+            self._prune(now)
+
+    def is_held(self, key: Hashable) -> bool:
+        """Returns True if a transition of the key is running ( or waiting to run )."""
+        return key in self._held
+
+    @contextlib.asynccontextmanager
+    async def hold(self, key: Hashable) -> AsyncIterator[None]:
+        """Holds the key while a transition of it runs, other holders of the key wait."""
+        lock, holders = self._held.get(key) or (asyncio.Lock(), 0)
+        self._held[key] = (lock, holders + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, holders = self._held[key]
+            if holders == 1:
+                del self._held[key]
+            else:
+                self._held[key] = (lock, holders - 1)
+
+    def goto(self, context: Context[Any], state: Optional[str]) -> None:
+        """Overrides the target of the running transition, use it inside transitions."""
+        context.kwargs[_NEXT_STATE] = state
+
+    def reset(self) -> None:
+        """Ends all conversations."""
+        self._states.clear()
+
+    def _prune(self, now: float):
+        # -> at most once a ttl, so it's still O(1) per transition.
+        if self._ttl is None or now - self._pruned_at < self._ttl:
+            return
+        self._pruned_at = now
+        for key in [k for k, (_, at) in self._states.items() if now - at > self._ttl]:
+            del self._states[key]
+
+    def step(
+        self, update: Update[Any], update_type: type[Any]
+    ) -> Optional[tuple["StateMachineHandler", ContainedResult]]:
+        """Finds the transition that the update takes, the state doesn't move until it runs.
+
+        Returns:
+            `Optional[tuple[StateMachineHandler, ContainedResult]]`: Handler to run and
+                filter metadata ( with the transition ), or `None` if no transition is taken.
+        """
+        if self._table is None:
+            raise ValueError(f"State machine {self._name} is not compiled.")
+
+        key = self._key(update)
+        if key is None:
+            return None
+
+        transitions = self._table.get((self.state_of(key), update_type))
+        if not transitions:
+            return None
+
+        actual = update.actual_update
+        for transition in transitions:
+            if transition.filter is None:
+                metadata: dict[str, Any] = {}
+            else:
+                result = transition.filter.evaluate(actual)
+                if not result.result:
+                    continue
+                metadata = dict(result.metadata)
+
+            metadata[TRANSITION] = transition
+            return self._handlers[update_type], ContainedResult(True, metadata)
+        return None
+
+
+class StateMachineHandler(HandlerTemplate):
+    """Runs transitions of a state machine for one update type."""
+
+    def __init__(
+        self, dp: "Dispatcher", machine: StateMachine, update_type: type[Any]
+    ) -> None:
+        self._dp = dp
+        self._machine = machine
+        self._update_type = update_type
+        self._tag = f"{machine.name}:{update_type.__name__}"
+
+    @property
+    def update_type(self) -> type[Any]:
+        return self._update_type
+
+    @property
+    def tag(self) -> str:
+        return self._tag
+
+    @property
+    def dp(self) -> "Dispatcher":
+        return self._dp
+
+    @property
+    def timeout(self) -> Optional[float]:
+        return self._machine._timeout
+
+    @property
+    def max_concurrency(self) -> Optional[ConcurrencyLimit]:
+        return self._machine._max_concurrency
+
+    def should_process(self, update: Update[Any]) -> ContainedResult:
+        result = self._machine.step(update, self._update_type)
+        if result is None:
+            return ContainedResult(False, {})
+        return result[1]
+
+    async def __process__(
+        self, update: Update[Any], *args: Any, **kwargs: Any
+    ) -> Optional[bool]:
+        transition: Transition[Any] = kwargs.pop(TRANSITION)
+        context = self._build_context(update, *args, **kwargs)
+        context.kwargs[TRANSITION] = transition
+        try:
+            propagation = await transition.processor(context)
+        except (ContinuePropagation, BreakPropagation):
+            self._move(update, transition, context)
+            raise
+        self._move(update, transition, context)
+
+        if not isinstance(propagation, bool):
+            propagation = context.marked_propagation
+        if propagation is None and self._machine.stop_propagation:
+            return False
+        return propagation
+
+    def _move(
+        self, update: Update[Any], transition: Transition[Any], context: Context[Any]
+    ):
+        key = self._machine._key(update)
+        if key is not None:
+            self._machine.set_state(
+                key, context.kwargs.pop(_NEXT_STATE, transition.target)
+            )
+
+    def _build_context(
+        self, update: Update[Any], *args: Any, **kwargs: Any
+    ) -> Context[Any]:
+        if self._update_type is Message:
+            return MessageContext(self._dp, update, self._tag, *args, **kwargs)
+        if self._update_type is CallbackQuery:
+            return CallbackQueryContext(self._dp, update, self._tag, *args, **kwargs)
+        return Context(self._dp, update, self._update_type, self._tag, *args, **kwargs)
@@ -4,6 +4,7 @@ from telegrambots.wrapper.types.objects import CallbackQuery, Message
 
 from ...contexts import CallbackQueryContext, MessageContext
 from .handler_template import SealedHandler
+from .concurrency import ConcurrencyLimit
 
 if TYPE_CHECKING:
     from telegrambots.wrapper.types.objects import Update
@@ -22,6 +23,8 @@ class MessageHandler(SealedHandler[MessageContext, Message]):
         continue_after: Optional[list[str]] = None,
         allow_continue_after_self: bool = False,
         priority: int = 0,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int | ConcurrencyLimit] = None,
     ) -> None:
         super().__init__(
             dp,
@@ -32,6 +35,8 @@ class MessageHandler(SealedHandler[MessageContext, Message]):
             continue_after,
             allow_continue_after_self,
             priority,
+            timeout,
+            max_concurrency,
         )
 
     @final
@@ -55,6 +60,8 @@ class CallbackQueryHandler(SealedHandler[CallbackQueryContext, CallbackQuery]):
         continue_after: Optional[list[str]] = None,
         allow_continue_after_self: bool = False,
         priority: int = 0,
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int | ConcurrencyLimit] = None,
     ) -> None:
         super().__init__(
             dp,
@@ -65,6 +72,8 @@ class CallbackQueryHandler(SealedHandler[CallbackQueryContext, CallbackQuery]):
             continue_after,
             allow_continue_after_self,
             priority,
+            timeout,
+            max_concurrency,
         )
 
     @final
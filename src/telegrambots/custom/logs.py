@@ -0,0 +1,127 @@
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+
+dispatcher_logger = logging.getLogger("telegrambots.dispatcher")
+dispatcher_logger.addHandler(logging.NullHandler())  # -> the app decides where logs go.
+
+
+class HotPathLogger:
+    """Logs messages from places that run for every update.
+
+    Check `should_log()` before building the message, so nothing is formatted
+    ( not even arguments ) when the level is disabled or the message is sampled out.
+
+    Example:
+        ```py
+        if hot_logger.should_log():
+            hot_logger.log("Feeding update %s", update.update_id)
+        ```
+    """
+
+    __slots__ = ("logger", "level", "sample_every", "_count")
+
+    def __init__(
+        self, logger: logging.Logger, level: int = logging.DEBUG, sample_every: int = 1
+    ) -> None:
+        """Creates a hot path logger.
+
+        Args:
+            logger (`logging.Logger`): The underlying logger.
+            level (`int`, optional): Level of messages. Defaults to `logging.DEBUG`.
+            sample_every (`int`, optional): Log only one of every n messages. Defaults to 1.
+        """
+        self.logger = logger
+        self.level = level
+        self.sample_every = sample_every
+        self._count = 0
+
+    def should_log(self) -> bool:
+        """Returns True if the next message should be logged."""
+        if not self.logger.isEnabledFor(self.level):
+            return False
+        if self.sample_every <= 1:
+            return True
+        self._count += 1
+        return self._count % self.sample_every == 0
+
+    def log(self, msg: str, *args: Any) -> None:
+        """Logs the message, use only after `should_log()` returned True."""
+        self.logger.log(self.level, msg, *args)
+
+
+hot_path_logger = HotPathLogger(dispatcher_logger)
+
+_listener: Optional[QueueListener] = None
+
+
+class _RawQueueHandler(QueueHandler):
+    """Enqueues records as they are, `QueueHandler.prepare` would format them on the event loop."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def enable_logging(
+    level: int = logging.INFO,
+    *handlers: logging.Handler,
+    sample_every: int = 1,
+    format: str = "%(asctime)s %(message)s",
+    datefmt: str = "%m/%d/%Y %I:%M:%S %p",
+) -> QueueListener:
+    """Sends dispatcher logs to the handlers, through a queue.
+
+    Records are only put into a queue on the event loop, formatting ( of arguments
+    and tracebacks too ) and I/O happen on a background thread. So arguments should
+    not be changed after they're logged.
+
+    Args:
+        level (`int`, optional): Minimum level to log. Defaults to `logging.INFO`.
+            Messages that are logged per update are `logging.DEBUG`.
+        *handlers (`logging.Handler`): Where logs go, stderr if nothing is given.
+        sample_every (`int`, optional): Log only one of every n per update messages. Defaults to 1.
+        format (`str`, optional): Format of the default stderr handler.
+        datefmt (`str`, optional): Date format of the default stderr handler.
+
+    Returns:
+        `QueueListener`: The running listener.
+    """
+    global _listener
+    disable_logging()
+
+    if not handlers:
+        stream = logging.StreamHandler()
+        stream.setFormatter(logging.Formatter(format, datefmt))
+        handlers = (stream,)
+
+    records: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    queue_handler = _RawQueueHandler(records)
+    queue_handler.set_name("telegrambots")  # -> to find it when disabling.
+
+    dispatcher_logger.addHandler(queue_handler)
+    dispatcher_logger.setLevel(level)
+    dispatcher_logger.propagate = False
+    hot_path_logger.sample_every = sample_every
+
+    _listener = QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def disable_logging():
+    """Stops logging enabled by `enable_logging`, pending records are flushed."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+    for handler in list(dispatcher_logger.handlers):
+        if handler.get_name() == "telegrambots":
+            dispatcher_logger.removeHandler(handler)
+    dispatcher_logger.setLevel(logging.NOTSET)
+    dispatcher_logger.propagate = True
+
+
+atexit.register(disable_logging)
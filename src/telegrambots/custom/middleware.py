@@ -0,0 +1,71 @@
+import functools
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Mapping,
+    Optional,
+    Sequence,
+)
+
+from telegrambots.wrapper.types.objects import Update
+
+if TYPE_CHECKING:
+    from .handlers._handlers.handler_template import HandlerTemplate
+
+
+@dataclass(slots=True)
+class Invocation:
+    """A handler that is about to handle an update, passed through middlewares."""
+
+    handler: "HandlerTemplate"
+    update: Update[Any]
+    filter_data: Mapping[str, Any]
+    args: tuple[Any, ...] = ()
+    data: dict[str, Any] = field(default_factory=dict)
+    """Keyword arguments of the handler, middlewares can add data for the context here."""
+
+
+CallNext = Callable[[Invocation], Awaitable[Optional[bool]]]
+
+Middleware = Callable[[CallNext, Invocation], Awaitable[Optional[bool]]]
+"""An async function that wraps handling of updates.
+
+Code before `await call_next(invocation)` runs before the handler, code after it runs after.
+Returning without calling `call_next` skips the handler. The returned value controls propagation,
+like handlers: `None` goes on, `True` continues to next handler and `False` stops.
+
+Example:
+    ```py
+    async def only_admins(call_next: CallNext, invocation: Invocation):
+        user = getattr(invocation.update.actual_update, "from_user", None)
+        if user is None or user.id not in ADMINS:
+            return False  # -> skip the handler, and stop propagation
+        invocation.data["is_admin"] = True  # -> available in the context
+        return await call_next(invocation)
+    ```
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class MiddlewareScope:
+    middleware: Middleware
+    update_type: Optional[type[Any]] = None
+    tags: Optional[frozenset[str]] = None
+
+    def applies_to(self, handler: "HandlerTemplate") -> bool:
+        if self.update_type is not None and handler.update_type is not self.update_type:
+            return False
+        if self.tags is not None and handler.tag not in self.tags:
+            return False
+        return True
+
+
+def compose(middlewares: Sequence[Middleware], terminal: CallNext) -> CallNext:
+    """Composes middlewares into one call, the first one is the outermost."""
+    chain = terminal
+    for middleware in reversed(middlewares):
+        chain = functools.partial(middleware, chain)
+    return chain
@@ -0,0 +1,22 @@
+from ._observers.observer_template import DispatcherObserver
+from ._observers.handler_timings import HandlerTiming, HandlerTimingsObserver
+from ._observers.metrics import (
+    HandlerMetrics,
+    Histogram,
+    MetricsObserver,
+    UpdateLatency,
+)
+from ._observers.loop_watchdog import BlockedLoopReport, LoopWatchdog
+
+
+__all__ = [
+    "DispatcherObserver",
+    "HandlerTiming",
+    "HandlerTimingsObserver",
+    "HandlerMetrics",
+    "Histogram",
+    "MetricsObserver",
+    "UpdateLatency",
+    "BlockedLoopReport",
+    "LoopWatchdog",
+]
@@ -0,0 +1,84 @@
+import statistics
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Optional
+
+from .observer_template import DispatcherObserver
+
+if TYPE_CHECKING:
+    from telegrambots.wrapper.types.objects import Update
+
+    from ...handlers._handlers.handler_template import HandlerTemplate
+
+
+@dataclass
+class HandlerTiming:
+    """Timings of a single handler."""
+
+    update_type: str
+    tag: str
+    durations: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    @property
+    def count(self) -> int:
+        return len(self.durations)
+
+    @property
+    def total(self) -> float:
+        return sum(self.durations)
+
+    def percentile(self, percent: float) -> float:
+        """Returns a percentile of durations, in seconds."""
+        if not self.durations:
+            return 0
+        ordered = sorted(self.durations)
+        index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "update_type": self.update_type,
+            "tag": self.tag,
+            "count": self.count,
+            "errors": self.errors,
+            "total": self.total,
+            "mean": statistics.fmean(self.durations) if self.durations else 0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": max(self.durations, default=0),
+        }
+
+
+class HandlerTimingsObserver(DispatcherObserver):
+    """Collects every duration of every handler."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.timings: dict[tuple[type[Any], str], HandlerTiming] = {}
+
+    def on_handled(
+        self,
+        handler: "HandlerTemplate",
+        update: "Update[Any]",
+        elapsed: float,
+        propagation: Optional[bool],
+        exception: Optional[BaseException],
+    ) -> None:
+        key = (handler.update_type, handler.tag)
+        timing = self.timings.get(key)
+        if timing is None:
+            timing = self.timings[key] = HandlerTiming(
+                handler.update_type.__name__, handler.tag
+            )
+        timing.durations.append(elapsed)
+        if exception is not None:
+            timing.errors += 1
+
+    def summary(self) -> list[dict[str, Any]]:
+        """Summaries of all handlers, slowest ( in total ) first."""
+        return sorted(
+            (x.summary() for x in self.timings.values()),
+            key=lambda x: x["total"],
+            reverse=True,
+        )
@@ -0,0 +1,185 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from ...logs import dispatcher_logger
+from .metrics import LOOP_LAG_BUCKETS, Histogram, MetricsObserver
+
+if TYPE_CHECKING:
+    from ...handlers._handlers.handler_template import HandlerTemplate
+
+
+@dataclass
+class BlockedLoopReport:
+    """The event loop was blocked for too long."""
+
+    blocked_for: float
+    """Seconds the loop was blocked when the stack was sampled."""
+    stack: list[str]
+    tag: Optional[str] = None
+    """Tag of the handler that was running, if any."""
+    update_type: Optional[str] = None
+
+    def __str__(self) -> str:
+        where = f"handler {self.update_type}:{self.tag}" if self.tag else "no handler"
+        return (
+            f"Event loop blocked for {self.blocked_for * 1000:.0f}ms in {where}\n"
+            + "".join(self.stack)
+        )
+
+
+def _log_report(report: BlockedLoopReport):
+    dispatcher_logger.warning("%s", report)
+
+
+class LoopWatchdog:
+    """Measures event loop lag and catches handlers that block the loop.
+
+    A heartbeat task runs on the loop, and a thread checks it. When the heartbeat
+    is late for more than `threshold`, the stack of the loop's thread is sampled and
+    the running handler ( if any ) is found from the task that is running, including
+    tasks of handlers with timeout and background tasks that handlers started.
+
+    Example:
+        ```py
+        watchdog = LoopWatchdog(threshold=0.1, metrics=metrics)
+        await watchdog.start()
+        ```
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.1,
+        interval: float = 0.02,
+        on_block: Optional[Callable[[BlockedLoopReport], Any]] = _log_report,
+        metrics: Optional[MetricsObserver] = None,
+        stack_limit: int = 20,
+        max_reports: Optional[int] = 100,
+    ) -> None:
+        """Creates a watchdog.
+
+        Args:
+            threshold (`float`, optional): Seconds the loop can be blocked before it's reported. Defaults to 0.1.
+            interval (`float`, optional): Seconds between heartbeats. Defaults to 0.02.
+            on_block (`Callable[[BlockedLoopReport], Any]`, optional): Called on the watchdog thread for each block.
+                Logs a warning by default.
+            metrics (`MetricsObserver`, optional): Lag and blocks are also recorded there.
+            stack_limit (`int`, optional): Number of frames to keep in reports. Defaults to 20.
+            max_reports (`Optional[int]`, optional): Latest reports to keep in `reports`. None keeps all of them.
+                Defaults to 100.
+        """
+        self.threshold = threshold
+        self.interval = interval
+        self.on_block = on_block
+        self.metrics = metrics
+        self.stack_limit = stack_limit
+
+        self.reports: deque[BlockedLoopReport] = deque(maxlen=max_reports)
+
+        self._lag = Histogram(LOOP_LAG_BUCKETS)
+        self._beat = time.perf_counter()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task[None]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    @property
+    def lag(self) -> Histogram:
+        """Event loop lag, it's `metrics.loop_lag` if metrics are given ( even after they're reset )."""
+        if self.metrics is not None:
+            return self.metrics.loop_lag
+        return self._lag
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def start(self):
+        """Starts watching the running event loop."""
+        if self._task is not None:
+            raise RuntimeError("Watchdog is already running.")
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.perf_counter()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(
+            target=self._watch, name="telegrambots-watchdog", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    async def stop(self):
+        """Stops watching."""
+        if self._task is None:
+            return
+
+        self._stopping.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *_: Any):
+        await self.stop()
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            self.lag.observe(max(0.0, now - expected))
+            self._beat = now
+
+    def _watch(self):
+        reported_beat: Optional[float] = None
+        while not self._stopping.wait(self.interval):
+            beat = self._beat
+            blocked_for = time.perf_counter() - beat - self.interval
+            if blocked_for < self.threshold or beat == reported_beat:
+                continue
+
+            reported_beat = beat  # -> once per block
+            frame = sys._current_frames().get(self._loop_thread)  # type: ignore
+            if frame is None:
+                continue
+
+            handler = self._running_handler()
+            report = BlockedLoopReport(
+                blocked_for, traceback.format_stack(frame, self.stack_limit)
+            )
+            if handler is not None:
+                report.tag = handler.tag
+                report.update_type = handler.update_type.__name__
+                if self.metrics is not None:
+                    self.metrics.get(handler).blocked += 1
+
+            self.reports.append(report)
+            if self.on_block is not None:
+                try:
+                    self.on_block(report)
+                except Exception:
+                    pass
+
+    def _running_handler(self) -> Optional["HandlerTemplate"]:
+        from ...dispatcher import running_handler
+
+        task = asyncio.current_task(self._loop)
+        if task is None:
+            return None
+        return running_handler(task)
@@ -0,0 +1,470 @@
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Optional, Sequence
+
+from aiohttp import web
+
+from ...exceptions.handlers import HandlerTimeout
+from ...general import DISPATCHED_AT, RECEIVED_AT
+from .observer_template import DispatcherObserver
+
+if TYPE_CHECKING:
+    from telegrambots.wrapper.types.objects import Update
+
+    from ...handlers._handlers.handler_template import HandlerTemplate
+
+
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+
+LOOP_LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+    300,
+    900,
+)
+
+LATENCY_STAGES = (
+    "telegram_delay",  # -> from Message.date ( or like ) till received
+    "ingest_to_dispatch",  # -> from received till dispatcher picked it up
+    "dispatch_to_start",  # -> from dispatch till first handler started
+    "handler_duration",  # -> time spent in handlers, each of them
+)
+
+_STARTED_AT = "handling_started_at"
+
+
+class Histogram:
+    """A cumulative histogram with fixed buckets, like prometheus ones."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # -> last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """Returns `(upper bound, count)` pairs, the last bound is `inf`."""
+        result: list[tuple[float, int]] = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> float:
+        """Estimates a quantile ( 0 to 1 ), interpolating inside its bucket like prometheus does."""
+        if not self.count:
+            return 0
+        rank = q * self.count
+        lower, below = 0.0, 0
+        for bound, total in self.cumulative():
+            if total >= rank:
+                if bound == float("inf"):
+                    return lower  # -> nothing better to say about +Inf bucket.
+                return lower + (bound - lower) * (rank - below) / (total - below)
+            lower, below = bound, total
+        return lower
+
+
+@dataclass
+class HandlerMetrics:
+    """Metrics of a single handler."""
+
+    update_type: str
+    tag: str
+    buckets: Sequence[float] = DEFAULT_BUCKETS
+    matched: int = 0
+    rejected: int = 0
+    filter_seconds: float = 0
+    continued: int = 0
+    broke: int = 0
+    blocked: int = 0
+    timeouts: int = 0
+    overflowed: int = 0
+    exceptions: dict[str, int] = field(default_factory=dict)
+    durations: Histogram = field(init=False)
+
+    def __post_init__(self):
+        self.durations = Histogram(self.buckets)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "update_type": self.update_type,
+            "tag": self.tag,
+            "matched": self.matched,
+            "rejected": self.rejected,
+            "filter_seconds": self.filter_seconds,
+            "handled": self.durations.count,
+            "handler_seconds": self.durations.sum,
+            "handler_p50": self.durations.quantile(0.5),
+            "handler_p99": self.durations.quantile(0.99),
+            "histogram": self.durations.cumulative(),
+            "continued": self.continued,
+            "broke": self.broke,
+            "blocked": self.blocked,
+            "timeouts": self.timeouts,
+            "overflowed": self.overflowed,
+            "exceptions": dict(self.exceptions),
+        }
+
+
+@dataclass
+class UpdateLatency:
+    """Latency of updates of a single type, broken down into stages."""
+
+    update_type: str
+    stages: dict[str, Histogram] = field(
+        default_factory=lambda: {x: Histogram(LATENCY_BUCKETS) for x in LATENCY_STAGES}
+    )
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "update_type": self.update_type,
+            **{
+                stage: {
+                    "count": h.count,
+                    "mean": h.sum / h.count if h.count else 0,
+                    "p50": h.quantile(0.5),
+                    "p90": h.quantile(0.9),
+                    "p99": h.quantile(0.99),
+                }
+                for stage, h in self.stages.items()
+            },
+        }
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+
+
+def _bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def _histogram_lines(name: str, labels: str, histogram: Histogram) -> list[str]:
+    sep = "," if labels else ""
+    lines = [
+        f'{name}_bucket{{{labels}{sep}le="{_bound(bound)}"}} {count}'
+        for bound, count in histogram.cumulative()
+    ]
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {histogram.sum!r}")
+    lines.append(f"{name}_count{suffix} {histogram.count}")
+    return lines
+
+
+class MetricsObserver(DispatcherObserver):
+    """Collects per handler metrics: filter outcomes and time, handler durations,
+    propagation outcomes and exceptions.
+
+    Read them with `snapshot()`, or as prometheus text with `prometheus()`
+    or over http using `start_server()`.
+
+    Example:
+        ```py
+        metrics = dp.add_observer(MetricsObserver())
+        await metrics.start_server(port=9090)  # -> http://localhost:9090/metrics
+        ```
+    """
+
+    def __init__(
+        self, namespace: str = "telegrambots", buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> None:
+        """Creates a metrics observer.
+
+        Args:
+            namespace (`str`, optional): Prefix of prometheus metric names. Defaults to "telegrambots".
+            buckets (`Sequence[float]`, optional): Bucket bounds ( seconds ) of handler duration histograms.
+        """
+        super().__init__()
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self.handlers: dict[tuple[type[Any], str], HandlerMetrics] = {}
+        self.loop_lag = Histogram(LOOP_LAG_BUCKETS)
+        self.latencies: dict[type[Any], UpdateLatency] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+    def get(self, handler: "HandlerTemplate") -> HandlerMetrics:
+        """Returns ( and creates if needed ) metrics of a handler."""
+        key = (handler.update_type, handler.tag)
+        metrics = self.handlers.get(key)
+        if metrics is None:
+            metrics = self.handlers[key] = HandlerMetrics(
+                handler.update_type.__name__, handler.tag, self.buckets
+            )
+        return metrics
+
+    def latency_of(self, update_type: type[Any]) -> UpdateLatency:
+        """Returns ( and creates if needed ) latency of an update type."""
+        latency = self.latencies.get(update_type)
+        if latency is None:
+            latency = self.latencies[update_type] = UpdateLatency(update_type.__name__)
+        return latency
+
+    def on_dispatched(self, update: "Update[Any]") -> None:
+        update_type = update.update_type
+        if update_type is None or not update.has_metadata(RECEIVED_AT):
+            return
+
+        stages = self.latency_of(update_type).stages
+        received_at: float = update.get_metadata(RECEIVED_AT, 0.0)
+        stages["ingest_to_dispatch"].observe(
+            max(0.0, update.get_metadata(DISPATCHED_AT, received_at) - received_at)
+        )
+
+        date = getattr(update.actual_update, "date", None)
+        if isinstance(date, int):
+            stages["telegram_delay"].observe(max(0.0, received_at - date))
+
+    def on_filtered(
+        self,
+        handler: "HandlerTemplate",
+        update: "Update[Any]",
+        elapsed: float,
+        matched: bool,
+    ) -> None:
+        metrics = self.get(handler)
+        metrics.filter_seconds += elapsed
+        if matched:
+            metrics.matched += 1
+        else:
+            metrics.rejected += 1
+
+    def on_overflow(
+        self, handler: "HandlerTemplate", update: "Update[Any]", action: str
+    ) -> None:
+        self.get(handler).overflowed += 1
+
+    def on_handled(
+        self,
+        handler: "HandlerTemplate",
+        update: "Update[Any]",
+        elapsed: float,
+        propagation: Optional[bool],
+        exception: Optional[BaseException],
+    ) -> None:
+        metrics = self.get(handler)
+        metrics.durations.observe(elapsed)
+
+        stages = self.latency_of(handler.update_type).stages
+        stages["handler_duration"].observe(elapsed)
+        if update.has_metadata(DISPATCHED_AT) and not update.has_metadata(_STARTED_AT):
+            started_at = update._set_metadata(_STARTED_AT, time.time() - elapsed)  # type: ignore
+            stages["dispatch_to_start"].observe(
+                max(0.0, started_at - update.get_metadata(DISPATCHED_AT, started_at))
+            )
+        if propagation is True:
+            metrics.continued += 1
+        elif propagation is False:
+            metrics.broke += 1
+        if exception is not None:
+            if isinstance(exception, HandlerTimeout):
+                metrics.timeouts += 1
+            name = type(exception).__name__
+            metrics.exceptions[name] = metrics.exceptions.get(name, 0) + 1
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        """Returns current metrics of all handlers."""
+        return [x.snapshot() for x in self.handlers.values()]
+
+    def loop_snapshot(self) -> dict[str, Any]:
+        """Returns event loop lag, recorded by a `LoopWatchdog`."""
+        return {
+            "samples": self.loop_lag.count,
+            "p50": self.loop_lag.quantile(0.5),
+            "p90": self.loop_lag.quantile(0.9),
+            "p99": self.loop_lag.quantile(0.99),
+            "histogram": self.loop_lag.cumulative(),
+        }
+
+    def latency_snapshot(self) -> list[dict[str, Any]]:
+        """Returns latency stages of each update type, in seconds.
+
+        Stages are `telegram_delay` ( from the date of message till received ),
+        `ingest_to_dispatch` ( waiting in dispatcher's queue ), `dispatch_to_start`
+        ( routing, till the first handler started ) and `handler_duration`.
+        """
+        return [x.snapshot() for x in self.latencies.values()]
+
+    def reset(self):
+        """Forgets all collected metrics."""
+        self.handlers.clear()
+        self.latencies.clear()
+        self.loop_lag = Histogram(self.loop_lag.buckets)
+
+    def prometheus(self) -> str:
+        """Returns metrics in prometheus text exposition format."""
+        ns = self.namespace
+        filtered: list[str] = []
+        filter_seconds: list[str] = []
+        durations: list[str] = []
+        propagations: list[str] = []
+        exceptions: list[str] = []
+        blocked: list[str] = []
+        timeouts: list[str] = []
+        overflowed: list[str] = []
+        loop_lag = _histogram_lines(f"{ns}_loop_lag_seconds", "", self.loop_lag)
+        latencies: list[str] = []
+        for latency in self.latencies.values():
+            for stage, histogram in latency.stages.items():
+                latencies.extend(
+                    _histogram_lines(
+                        f"{ns}_update_latency_seconds",
+                        _labels(update_type=latency.update_type, stage=stage),
+                        histogram,
+                    )
+                )
+
+        for m in self.handlers.values():
+            labels = _labels(update_type=m.update_type, tag=m.tag)
+            for matched, value in (("true", m.matched), ("false", m.rejected)):
+                filtered.append(
+                    f'{ns}_handler_filtered_total{{{labels},matched="{matched}"}} {value}'
+                )
+            filter_seconds.append(
+                f"{ns}_handler_filter_seconds_total{{{labels}}} {m.filter_seconds!r}"
+            )
+            durations.extend(
+                _histogram_lines(f"{ns}_handler_duration_seconds", labels, m.durations)
+            )
+            for outcome, value in (("continue", m.continued), ("break", m.broke)):
+                propagations.append(
+                    f'{ns}_handler_propagation_total{{{labels},outcome="{outcome}"}} {value}'
+                )
+            if m.timeouts:
+                timeouts.append(f"{ns}_handler_timeouts_total{{{labels}}} {m.timeouts}")
+            if m.overflowed:
+                overflowed.append(
+                    f"{ns}_handler_overflowed_total{{{labels}}} {m.overflowed}"
+                )
+            if m.blocked:
+                blocked.append(f"{ns}_handler_blocked_loop_total{{{labels}}} {m.blocked}")
+            for name, value in m.exceptions.items():
+                exceptions.append(
+                    f'{ns}_handler_exceptions_total{{{labels},exception="{_escape(name)}"}} {value}'
+                )
+
+        lines: list[str] = []
+        for name, kind, help, samples in (
+            ("handler_filtered_total", "counter", "Filter checks by outcome.", filtered),
+            (
+                "handler_filter_seconds_total",
+                "counter",
+                "Seconds spent on filters.",
+                filter_seconds,
+            ),
+            (
+                "handler_duration_seconds",
+                "histogram",
+                "Seconds spent in handlers.",
+                durations,
+            ),
+            (
+                "handler_propagation_total",
+                "counter",
+                "Propagation outcomes of handlers.",
+                propagations,
+            ),
+            (
+                "handler_exceptions_total",
+                "counter",
+                "Exceptions raised from handlers.",
+                exceptions,
+            ),
+            (
+                "handler_timeouts_total",
+                "counter",
+                "Times a handler was cancelled because of timeout.",
+                timeouts,
+            ),
+            (
+                "handler_overflowed_total",
+                "counter",
+                "Updates rejected or dropped because a handler was at it's concurrency limit.",
+                overflowed,
+            ),
+            (
+                "handler_blocked_loop_total",
+                "counter",
+                "Times a handler was caught blocking the event loop.",
+                blocked,
+            ),
+            ("loop_lag_seconds", "histogram", "Event loop lag.", loop_lag),
+            (
+                "update_latency_seconds",
+                "histogram",
+                "Latency of updates by stage.",
+                latencies,
+            ),
+        ):
+            lines.append(f"# HELP {ns}_{name} {help}")
+            lines.append(f"# TYPE {ns}_{name} {kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+    async def start_server(self, host: str = "0.0.0.0", port: int = 9090):
+        """Serves prometheus metrics over http at `/metrics`.
+
+        Args:
+            host (`str`, optional): Host to listen on. Defaults to "0.0.0.0".
+            port (`int`, optional): Port to listen on. Defaults to 9090.
+        """
+        if self._runner is not None:
+            raise RuntimeError("Metrics server is already running.")
+
+        async def handle(_: web.Request):
+            return web.Response(
+                body=self.prometheus().encode(),
+                headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+            )
+
+        app = web.Application()
+        app.router.add_get("/metrics", handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+
+    async def stop_server(self):
+        """Stops the metrics server."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,72 @@
+from abc import ABC
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from telegrambots.wrapper.types.objects import Update
+
+    from ...handlers._handlers.handler_template import HandlerTemplate
+
+
+class DispatcherObserver(ABC):
+    """Gets notified about what the dispatcher does.
+
+    Override only what you need, every method does nothing by default.
+    Observers are called inline, so keep them fast.
+    """
+
+    def on_dispatched(self, update: "Update[Any]") -> None:
+        """Called when the dispatcher starts processing an update.
+
+        `RECEIVED_AT` and `DISPATCHED_AT` metadata of the update are set by then.
+
+        Args:
+            update (`Update`): The update.
+        """
+
+    def on_filtered(
+        self,
+        handler: "HandlerTemplate",
+        update: "Update[Any]",
+        elapsed: float,
+        matched: bool,
+    ) -> None:
+        """Called after filters of a handler are checked against an update.
+
+        When filters are shared between handlers, the shared part is timed
+        for the first handler that needed it.
+
+        Args:
+            handler (`HandlerTemplate`): The handler.
+            update (`Update`): The update.
+            elapsed (`float`): Seconds spent in filters.
+            matched (`bool`): If the handler should process the update.
+        """
+
+    def on_overflow(
+        self, handler: "HandlerTemplate", update: "Update[Any]", action: str
+    ) -> None:
+        """Called when a handler is at it's concurrency limit and an update is rejected or dropped.
+
+        Args:
+            handler (`HandlerTemplate`): The handler.
+            update (`Update`): The update that is not processed.
+            action (`str`): `reject` or `drop`.
+        """
+
+    def on_handled(
+        self,
+        handler: "HandlerTemplate",
+        update: "Update[Any]",
+        elapsed: float,
+        propagation: Optional[bool],
+        exception: Optional[BaseException],
+    ) -> None:
+        """Called after a handler processed an update.
+
+        Args:
+            handler (`HandlerTemplate`): The handler.
+            update (`Update`): The update.
+            elapsed (`float`): Seconds spent in the handler.
+            propagation (`Optional[bool]`): True if propagation continued, False if it stopped, None otherwise.
+            exception (`Optional[BaseException]`): The exception that handler raised, if any.
+        """
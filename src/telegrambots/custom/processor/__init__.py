@@ -1,6 +1,13 @@
 from ._processor.sequential_processor import SequentialProcessor
 from ._processor.processor_template import ProcessorTemplate
 from ._processor.parallel_processor import ParallelProcessor
+from ._processor.priority_processor import PriorityProcessor, default_classifier
 
 
-__all__ = ["SequentialProcessor", "ProcessorTemplate", "ParallelProcessor"]
+__all__ = [
+    "SequentialProcessor",
+    "ProcessorTemplate",
+    "ParallelProcessor",
+    "PriorityProcessor",
+    "default_classifier",
+]
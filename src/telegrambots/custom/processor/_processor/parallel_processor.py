@@ -13,6 +13,13 @@ class ParallelProcessor(typing.Generic[TItem], ProcessorTemplate[TItem]):
         ],
     ) -> None:
         super().__init__(to_process)
+        self._tasks: set[asyncio.Task[None]] = set()
 
     async def __processor__(self, item: typing.Any) -> None:
-        asyncio.create_task(self._do_job(item))
+        task = asyncio.create_task(self._do_job(item))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def join(self) -> None:
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,238 @@
+from .processor_template import ProcessorTemplate, TItem
+import asyncio
+import collections
+import typing
+
+from telegrambots.wrapper.types.objects import (
+    CallbackQuery,
+    InlineQuery,
+    Message,
+    PreCheckoutQuery,
+    ShippingQuery,
+    Update,
+)
+
+from ...general import PRIORITY
+from ...logs import dispatcher_logger
+
+
+INTERACTIVE_TYPES: tuple[type[typing.Any], ...] = (
+    CallbackQuery,
+    InlineQuery,
+    PreCheckoutQuery,
+    ShippingQuery,
+)
+
+
+def default_classifier(update: Update[typing.Any]) -> str:
+    """Puts updates into `interactive`, `default` or `bulk` lanes.
+
+    - `interactive`: callback, inline, shipping and pre checkout queries, and commands.
+    - `bulk`: other group messages and low priority updates ( negative `PRIORITY` metadata ).
+    - `default`: everything else.
+    """
+    if update.has_metadata(PRIORITY) and update.get_metadata(PRIORITY, 0) < 0:
+        return "bulk"
+
+    try:
+        update_type = update.update_type
+    except ValueError:
+        return "default"
+
+    if update_type in INTERACTIVE_TYPES:
+        return "interactive"
+
+    if update_type is Message:
+        message: Message = update.actual_update
+        text = message.text or message.caption
+        if text is not None and text.startswith("/"):
+            return "interactive"
+        if message.chat.type in ("group", "supergroup"):
+            return "bulk"
+    return "default"
+
+
+class _Lane:
+    __slots__ = ("name", "weight", "maxsize", "items", "current", "room")
+
+    def __init__(self, name: str, weight: int, maxsize: typing.Optional[int]) -> None:
+        self.name = name
+        self.weight = weight
+        self.maxsize = maxsize
+        self.items: collections.deque[typing.Any] = collections.deque()
+        self.current = 0
+        self.room: typing.Optional[asyncio.Semaphore] = None  # -> free places, if bounded.
+
+
+class PriorityProcessor(typing.Generic[TItem], ProcessorTemplate[TItem]):
+    """Processor that queues items into weighted lanes.
+
+    Lanes are served with smooth weighted round robin: with weights 8 and 1, a busy
+    lane of weight 8 gets 8 turns for each turn of the other one, and an idle lane
+    costs nothing. Use `with_lanes` to configure lanes, the classifier and concurrency.
+
+    Lanes are unbounded by default. If a lane has a `maxsize` and it's full, queueing
+    an item waits until a worker takes one from it ( backpressure ), so the dispatcher
+    stops feeding ( and receiving ) updates instead of buffering them in memory.
+
+    Example:
+        ```py
+        dp = Dispatcher(bot, processor_type=PriorityProcessor.with_lanes(
+            {"interactive": 8, "default": 3, "bulk": 1}, concurrency=4, maxsize={"bulk": 1000}
+        ))
+        ```
+    """
+
+    lanes: typing.ClassVar[typing.Mapping[str, int]] = {
+        "interactive": 8,
+        "default": 3,
+        "bulk": 1,
+    }
+    """Weights of lanes by their name."""
+
+    classifier: typing.ClassVar[typing.Callable[[typing.Any], str]] = staticmethod(
+        default_classifier
+    )
+    """Returns name of the lane of an item."""
+
+    concurrency: typing.ClassVar[int] = 1
+    """Number of items that are processed at the same time."""
+
+    maxsize: typing.ClassVar[typing.Optional[int | typing.Mapping[str, int]]] = None
+    """Maximum queued items of every lane, or of some lanes by their name. None for unbounded lanes."""
+
+    def __init__(
+        self,
+        to_process: typing.Callable[
+            [TItem], typing.Coroutine[typing.Any, typing.Any, None]
+        ],
+    ) -> None:
+        super().__init__(to_process)
+        if self.concurrency < 1:
+            raise ValueError("concurrency should be at least 1.")
+
+        maxsize = self.maxsize
+        self._lanes = {
+            name: _Lane(
+                name,
+                weight,
+                maxsize.get(name) if isinstance(maxsize, typing.Mapping) else maxsize,
+            )
+            for name, weight in self.lanes.items()
+        }
+        if not self._lanes:
+            raise ValueError("At least one lane is required.")
+        for lane in self._lanes.values():
+            if lane.weight < 1:
+                raise ValueError(f"Weight of lane {lane.name} should be at least 1.")
+            if lane.maxsize is not None and lane.maxsize < 1:
+                raise ValueError(f"maxsize of lane {lane.name} should be at least 1.")
+
+        # -> unknown lanes fall into the last one.
+        self._fallback = list(self._lanes.values())[-1]
+        self._available: typing.Optional[asyncio.Semaphore] = None
+        self._workers: list[asyncio.Task[None]] = []
+        self._unfinished = 0
+        self._finished = asyncio.Event()
+        self._finished.set()
+
+    @classmethod
+    def with_lanes(
+        cls,
+        lanes: typing.Mapping[str, int],
+        classifier: typing.Optional[typing.Callable[[typing.Any], str]] = None,
+        concurrency: int = 1,
+        maxsize: typing.Optional[int | typing.Mapping[str, int]] = None,
+    ) -> type["PriorityProcessor[typing.Any]"]:
+        """Creates a processor type with the given lanes.
+
+        Args:
+            lanes (`Mapping[str, int]`): Weights of lanes by their name. Items of unknown lanes go to the last one.
+            classifier (`Callable[[TItem], str]`, optional): Returns lane name of an item.
+                Defaults to `default_classifier`, which needs `interactive`, `default` and `bulk` lanes.
+            concurrency (`int`, optional): Number of items processed at the same time. Defaults to 1.
+            maxsize (`Optional[int | Mapping[str, int]]`, optional): Maximum queued items of every lane,
+                or of some lanes by their name. Queueing into a full lane waits. Defaults to None ( unbounded ).
+        """
+        return type(
+            cls.__name__,
+            (cls,),
+            {
+                "lanes": dict(lanes),
+                "classifier": staticmethod(classifier or cls.classifier),
+                "concurrency": concurrency,
+                "maxsize": dict(maxsize) if isinstance(maxsize, typing.Mapping) else maxsize,
+            },
+        )
+
+    def pending(self) -> dict[str, int]:
+        """Number of queued items in each lane."""
+        return {name: len(lane.items) for name, lane in self._lanes.items()}
+
+    async def __processor__(self, item: TItem) -> None:
+        lane = self._lanes.get(self.classifier(item), self._fallback)
+        if lane.maxsize is not None:
+            if lane.room is None:
+                lane.room = asyncio.Semaphore(lane.maxsize)
+            await lane.room.acquire()  # -> waits while the lane is full.
+        lane.items.append(item)
+        self._unfinished += 1
+        self._finished.clear()
+
+        if self._available is None:
+            self._available = asyncio.Semaphore(0)
+            self._workers = [
+                asyncio.create_task(self._work()) for _ in range(self.concurrency)
+            ]
+        self._available.release()
+
+    async def join(self) -> None:
+        await self._finished.wait()
+
+    async def close(self) -> None:
+        """Cancels workers, queued items are dropped."""
+        workers, self._workers = self._workers, []
+        self._available = None
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+        for lane in self._lanes.values():
+            dropped = len(lane.items)
+            lane.items.clear()
+            lane.current = 0
+            if lane.room is not None:
+                for _ in range(dropped):
+                    lane.room.release()  # -> so nothing waits for a place forever.
+        self._unfinished = 0
+        self._finished.set()
+
+    def _next(self) -> typing.Any:
+        total = 0
+        chosen: typing.Optional[_Lane] = None
+        for lane in self._lanes.values():
+            if lane.items:
+                lane.current += lane.weight
+                total += lane.weight
+                if chosen is None or lane.current > chosen.current:
+                    chosen = lane
+
+        assert chosen is not None  # -> a worker only gets here when an item is queued.
+        chosen.current -= total
+        if chosen.room is not None:
+            chosen.room.release()
+        return chosen.items.popleft()
+
+    async def _work(self) -> None:
+        assert self._available is not None
+        while True:
+            await self._available.acquire()
+            try:
+                await self._do_job(self._next())
+            except Exception:
+                # -> dispatcher handles errors of handlers, this is a bug. keep the worker alive.
+                dispatcher_logger.exception("Failed to process a queued item.")
+            finally:
+                self._unfinished -= 1
+                if not self._unfinished:
+                    self._finished.set()
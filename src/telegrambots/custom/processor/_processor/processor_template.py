@@ -29,6 +29,14 @@ class ProcessorTemplate(typing.Generic[TItem], ABC):
         """
         await self.__processor__(item)
 
+    async def join(self) -> None:
+        """Waits for items that are still being processed."""
+        return None
+
+    async def close(self) -> None:
+        """Stops background work of the processor, if any."""
+        return None
+
     @typing.final
     async def _do_job(self, item: TItem) -> None:
         """Processes an item.
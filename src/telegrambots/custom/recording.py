@@ -0,0 +1,311 @@
+import asyncio
+import gzip
+import json
+import random
+import time
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Coroutine,
+    Hashable,
+    Iterator,
+    Optional,
+)
+
+from telegrambots.wrapper.types.objects import Update
+
+from .general import RECEIVED_AT
+from .logs import dispatcher_logger
+from .observers import HandlerTimingsObserver
+from .stages import UpdateStage
+
+if TYPE_CHECKING:
+    from .dispatcher import Dispatcher
+
+
+def _update_sender(update: Update[Any]) -> Optional[Hashable]:
+    user = getattr(update.actual_update, "from_user", None)
+    if user is not None:
+        return user.id
+    return None
+
+
+def _log_failure(future: "Future[None]"):
+    exception = future.exception()
+    if exception is not None:
+        dispatcher_logger.error(
+            "Failed to write recorded updates.",
+            exc_info=(type(exception), exception, exception.__traceback__),
+        )
+
+
+class _RecordingStage(UpdateStage):
+    def __init__(self, recorder: "UpdateRecorder") -> None:
+        self._recorder = recorder
+
+    async def __process__(
+        self, dp: "Dispatcher", updates: list[Update[Any]]
+    ) -> list[Update[Any]]:
+        for update in updates:
+            self._recorder.record(update)
+        return updates
+
+
+class UpdateRecorder:
+    """Records updates that a dispatcher receives into a gzip compressed jsonl file.
+
+    Each line is `{"t": <unix time>, "update": <raw update>}`. Lines are buffered, and
+    compressed and written in batches on a background thread, not on the event loop.
+
+    Example:
+        ```py
+        recorder = UpdateRecorder("traffic.jsonl.gz", sample_rate=0.1)
+        recorder.attach(dp)
+        ```
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        sample_rate: float = 1,
+        sample_by: Optional[Callable[[Update[Any]], Optional[Hashable]]] = _update_sender,
+        flush_every: int = 100,
+    ) -> None:
+        """Creates a recorder, the file is appended if exists.
+
+        Args:
+            path (`str | Path`): Path of the file.
+            sample_rate (`float`, optional): Part of the traffic to record, from 0 to 1. Defaults to 1.
+            sample_by (`Callable[[Update], Optional[Hashable]]`, optional): Returns a key to sample by, so all updates
+                with the same key are recorded or skipped together ( whole conversations ). By default it's the sender.
+                Updates are sampled randomly if it's None or returns None.
+            flush_every (`int`, optional): Write a batch after this many records. Defaults to 100.
+        """
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("sample_rate should be between 0 and 1.")
+
+        self._path = Path(path)
+        self._sample_rate = sample_rate
+        self._sample_by = sample_by
+        self._flush_every = flush_every
+        self._file: Optional[IO[str]] = None  # -> only used on the writer thread.
+        self._buffer: list[str] = []
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._attached: Optional[tuple["Dispatcher", _RecordingStage]] = None
+        self.recorded = 0
+
+    def should_record(self, update: Update[Any]) -> bool:
+        """Decides if the update is sampled."""
+        if self._sample_rate >= 1:
+            return True
+
+        if self._sample_by is not None:
+            key = self._sample_by(update)
+            if key is not None:
+                return (
+                    zlib.crc32(repr(key).encode()) % 10_000
+                    < self._sample_rate * 10_000
+                )
+        return random.random() < self._sample_rate
+
+    def record(self, update: Update[Any], timestamp: Optional[float] = None):
+        """Records an update, if it's sampled.
+
+        Args:
+            update (`Update`): The update to record.
+            timestamp (`float`, optional): Unix time the update received at. Defaults to
+                it's `RECEIVED_AT` metadata, or now.
+        """
+        if not self.should_record(update):
+            return
+
+        if timestamp is None:
+            timestamp = update.get_metadata(RECEIVED_AT, None) or time.time()
+        self._buffer.append(
+            json.dumps(
+                {
+                    "t": timestamp,
+                    "update": update.serialize(),
+                },
+                ensure_ascii=False,
+            )
+            + "\n"
+        )
+        self.recorded += 1
+        if len(self._buffer) >= self._flush_every:
+            self.flush()
+
+    def attach(self, dp: "Dispatcher"):
+        """Records every update that is fed to the dispatcher, with a stage before other stages.
+
+        Args:
+            dp (`Dispatcher`): The dispatcher.
+        """
+        if self._attached is not None:
+            raise ValueError("Recorder is already attached.")
+
+        self._attached = (dp, dp.add_stage(_RecordingStage(self), index=0))
+        return self
+
+    def detach(self):
+        """Stops recording updates of the dispatcher."""
+        if self._attached is not None:
+            dp, stage = self._attached
+            dp.remove_stage(stage)
+            self._attached = None
+
+    def flush(self):
+        """Sends buffered records to the writer thread, to be written to the file."""
+        if not self._buffer:
+            return
+
+        lines, self._buffer = self._buffer, []
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(
+                1, thread_name_prefix="telegrambots-recorder"
+            )
+        self._writer.submit(self._write, lines).add_done_callback(_log_failure)
+
+    def close(self):
+        """Detaches from dispatcher, waits for pending writes and closes the file."""
+        self.detach()
+        self.flush()
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+            self._writer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write(self, lines: list[str]):
+        if self._file is None:
+            self._file = gzip.open(self._path, "at", encoding="utf-8")
+        self._file.writelines(lines)
+        self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_: Any):
+        self.close()
+
+
+@dataclass
+class ReplayReport:
+    """Result of a replay."""
+
+    updates: int
+    seconds: float
+    handlers: list[dict[str, Any]]
+
+    @property
+    def updates_per_second(self) -> float:
+        return self.updates / self.seconds if self.seconds else 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "updates": self.updates,
+            "seconds": self.seconds,
+            "updates_per_second": self.updates_per_second,
+            "handlers": self.handlers,
+        }
+
+
+class UpdateReplayer:
+    """Feeds recorded updates back into a dispatcher.
+
+    Example:
+        ```py
+        report = await UpdateReplayer("traffic.jsonl.gz").replay(dp, speed=None)
+        print(report.to_dict())
+        ```
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """Creates a replayer.
+
+        Args:
+            path (`str | Path`): Path of a file written by `UpdateRecorder`.
+        """
+        self._path = Path(path)
+
+    def records(self) -> Iterator[tuple[float, dict[str, Any]]]:
+        """Yields `(timestamp, raw update)` of each record, in order. It reads the file, blocking."""
+        with gzip.open(self._path, "rt", encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    yield record["t"], record["update"]
+
+    def _chunks(
+        self, size: int
+    ) -> Iterator[list[tuple[float, dict[str, Any]]]]:
+        chunk: list[tuple[float, dict[str, Any]]] = []
+        for record in self.records():
+            chunk.append(record)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    async def replay(
+        self,
+        dp: "Dispatcher",
+        speed: Optional[float] = 1,
+        feed: Optional[
+            Callable[[Update[Any]], Coroutine[Any, Any, None]]
+        ] = None,
+    ) -> ReplayReport:
+        """Feeds records into the dispatcher, while timing every handler.
+
+        Args:
+            dp (`Dispatcher`): The dispatcher. Make sure it doesn't talk to the real api!
+            speed (`Optional[float]`, optional): 1 to keep original timing, 2 for twice as fast and so on.
+                None feeds as fast as possible. Defaults to 1.
+            feed (`Callable[[Update], Coroutine]`, optional): Used instead of `dp.feed_update`.
+        """
+        if speed is not None and speed <= 0:
+            raise ValueError("speed should be positive or None.")
+
+        feed = feed or dp.feed_update
+        loop = asyncio.get_running_loop()
+        chunks = self._chunks(100)  # -> read and decompressed in the executor, not on the loop.
+        timings = dp.add_observer(HandlerTimingsObserver())
+        count = 0
+        try:
+            started = time.perf_counter()
+            first_timestamp: Optional[float] = None
+            while True:
+                chunk = await loop.run_in_executor(None, next, chunks, None)
+                if chunk is None:
+                    break
+
+                for timestamp, data in chunk:
+                    if speed is not None:
+                        if first_timestamp is None:
+                            first_timestamp = timestamp
+                        delay = (
+                            started
+                            + (timestamp - first_timestamp) / speed
+                            - time.perf_counter()
+                        )
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+
+                    await feed(Update.deserialize(data, client=dp.bot))
+                    count += 1
+
+            await dp.join()
+            elapsed = time.perf_counter() - started
+        finally:
+            dp.remove_observer(timings)
+            chunks.close()
+
+        return ReplayReport(count, elapsed, timings.summary())
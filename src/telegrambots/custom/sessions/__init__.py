@@ -0,0 +1,17 @@
+from ._sessions.session import Session, SessionStore, chat_key, user_key
+from ._sessions.backends import (
+    FileSessionBackend,
+    SessionBackend,
+    SqliteSessionBackend,
+)
+
+
+__all__ = [
+    "Session",
+    "SessionStore",
+    "chat_key",
+    "user_key",
+    "SessionBackend",
+    "SqliteSessionBackend",
+    "FileSessionBackend",
+]
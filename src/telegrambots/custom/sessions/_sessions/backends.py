@@ -0,0 +1,108 @@
+import hashlib
+import os
+import pickle
+import sqlite3
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Mapping, Optional
+
+
+class SessionBackend(ABC):
+    """Persists sessions for `SessionStore`. Sessions are written in batches."""
+
+    @abstractmethod
+    def load(self, key: str) -> Optional[dict[str, Any]]:
+        """Loads a session, `None` if it's not stored."""
+        ...
+
+    @abstractmethod
+    def save_many(self, sessions: Mapping[str, Optional[dict[str, Any]]]) -> None:
+        """Saves a batch of sessions, `None` ( or an empty session ) deletes it."""
+        ...
+
+    def close(self) -> None:
+        """Releases resources of the backend."""
+        ...
+
+
+class SqliteSessionBackend(SessionBackend):
+    """Keeps pickled sessions in a sqlite database.
+
+    Args:
+        path (`str | Path`): Path of the database file.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self._connection = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False
+        )
+        self._connection.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS sessions (
+                key TEXT PRIMARY KEY,
+                data BLOB NOT NULL
+            );
+            """
+        )
+
+    def load(self, key: str) -> Optional[dict[str, Any]]:
+        row = self._connection.execute(
+            "SELECT data FROM sessions WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return pickle.loads(row[0])
+
+    def save_many(self, sessions: Mapping[str, Optional[dict[str, Any]]]) -> None:
+        with self._connection:
+            self._connection.execute("BEGIN")
+            self._connection.executemany(
+                "DELETE FROM sessions WHERE key = ?",
+                ((key,) for key, data in sessions.items() if not data),
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO sessions VALUES (?, ?)",
+                (
+                    (key, pickle.dumps(data))
+                    for key, data in sessions.items()
+                    if data
+                ),
+            )
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class FileSessionBackend(SessionBackend):
+    """Keeps each session in a pickle file, inside a directory.
+
+    Args:
+        directory (`str | Path`): The directory, it's created if it doesn't exist.
+    """
+
+    def __init__(self, directory: str | Path) -> None:
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+    def load(self, key: str) -> Optional[dict[str, Any]]:
+        try:
+            with open(self._path_of(key), "rb") as file:
+                return pickle.load(file)
+        except FileNotFoundError:
+            return None
+
+    def save_many(self, sessions: Mapping[str, Optional[dict[str, Any]]]) -> None:
+        for key, data in sessions.items():
+            path = self._path_of(key)
+            if not data:
+                path.unlink(missing_ok=True)
+                continue
+
+            temp = path.with_suffix(".tmp")
+            with open(temp, "wb") as file:
+                pickle.dump(data, file)
+            os.replace(temp, path)  # -> never leaves a half written session.
+
+    def _path_of(self, key: str) -> Path:
+        return self._directory / (hashlib.sha1(key.encode()).hexdigest() + ".pickle")
@@ -0,0 +1,314 @@
+import asyncio
+import copy
+from collections import OrderedDict
+from typing import Any, Iterator, MutableMapping, Optional
+
+from telegrambots.wrapper.types.objects import Update
+
+from ...logs import dispatcher_logger
+from .backends import SessionBackend
+
+
+def user_key(update: Update[Any]) -> Optional[str]:
+    """Session key of the user who sent the update."""
+    user = getattr(update.actual_update, "from_user", None)
+    if user is not None:
+        return f"user:{user.id}"
+    return None
+
+
+def chat_key(update: Update[Any]) -> Optional[str]:
+    """Session key of the chat that the update belongs to."""
+    actual = update.actual_update
+    chat = getattr(actual, "chat", None)
+    if chat is None:
+        message = getattr(actual, "message", None)  # -> callback queries.
+        chat = getattr(message, "chat", None)
+    if chat is not None:
+        return f"chat:{chat.id}"
+    return None
+
+
+class Session(MutableMapping[str, Any]):
+    """Data of a user or chat, that is kept between updates.
+
+    Assigning or deleting items marks the session to be written. If you change
+    a value in place ( like appending to a list ), call `touch()`.
+    """
+
+    def __init__(
+        self, store: "SessionStore", key: str, data: Optional[dict[str, Any]] = None
+    ) -> None:
+        self._store = store
+        self._key = key
+        self._data: dict[str, Any] = data if data is not None else {}
+
+    @property
+    def key(self) -> str:
+        return self._key
+
+    def __getitem__(self, name: str) -> Any:
+        return self._data[name]
+
+    def __setitem__(self, name: str, value: Any) -> None:
+        self._data[name] = value
+        self.touch()
+
+    def __delitem__(self, name: str) -> None:
+        del self._data[name]
+        self.touch()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"Session({self._key!r}, {self._data!r})"
+
+    def touch(self) -> None:
+        """Marks the session to be written."""
+        self._store._mark_dirty(self._key)
+
+
+class SessionStore:
+    """Keeps recently used sessions in memory ( LRU ), and writes changes to a backend in batches.
+
+    Without a backend, sessions only live in memory and least recently used ones
+    are dropped. With a backend, changed sessions are written every `flush_interval`
+    seconds ( write-behind ) in the default executor, so hot sessions don't cost any I/O
+    and writes don't block the event loop. A batch that fails to be written is retried
+    with the next one.
+
+    Sessions that are not in memory are read from the backend in the default executor
+    by `load` and `preload`. The dispatcher preloads sessions of each update before it's
+    handled ( if `preload` ), so `context.session` is already in memory. `get` reads
+    the backend on the event loop, if the session is not in memory.
+
+    Args:
+        max_size (`int`, optional): Maximum sessions in memory. Defaults to 10000.
+        backend (`Optional[SessionBackend]`, optional): Where sessions are persisted. Defaults to None.
+        flush_interval (`float`, optional): Seconds between writes of changed sessions. Defaults to 5.
+        preload (`bool`, optional): If the dispatcher should load sessions of updates before
+            they're handled. Defaults to True.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10_000,
+        backend: Optional[SessionBackend] = None,
+        flush_interval: float = 5,
+        preload: bool = True,
+    ) -> None:
+        if max_size <= 0:
+            raise ValueError("max_size should be positive.")
+
+        self._max_size = max_size
+        self._backend = backend
+        self._flush_interval = flush_interval
+        self._preload = preload
+        self._cache: OrderedDict[str, Session] = OrderedDict()
+        self._dirty: set[str] = set()
+        # -> changed sessions that are evicted before they're written.
+        self._evicted: dict[str, dict[str, Any]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task[None]] = None
+        self._writing = asyncio.Lock()  # -> batches are written in order.
+        self._pending: list[dict[str, dict[str, Any]]] = []  # -> batches that are not written yet.
+        self._loading: dict[str, asyncio.Future[Optional[dict[str, Any]]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._cache
+
+    @property
+    def preloads(self) -> bool:
+        """If sessions of updates should be loaded before they're handled."""
+        return self._preload and self._backend is not None
+
+    def get(self, key: str) -> Session:
+        """Returns the session of the key, loads it from the backend if it's not in memory.
+
+        The backend is read on the event loop, use `load` to read it in the executor.
+        """
+        session = self._cache.get(key)
+        if session is not None:
+            self._cache.move_to_end(key)
+            return session
+
+        if self._backend is None or self._known(key):
+            return self._insert(key)
+        return self._insert(key, self._backend.load(key))
+
+    async def load(self, key: str) -> Session:
+        """Returns the session of the key, reads it from the backend in the default executor
+        if it's not in memory.
+        """
+        session = self._cache.get(key)
+        if session is not None:
+            self._cache.move_to_end(key)
+            return session
+
+        if self._backend is None or self._known(key):
+            return self._insert(key)
+
+        loading = self._loading.get(key)
+        if loading is None:
+            # -> concurrent loads of a key share one read.
+            loading = asyncio.get_running_loop().run_in_executor(
+                None, self._backend.load, key
+            )
+            self._loading[key] = loading
+            loading.add_done_callback(lambda _: self._loading.pop(key, None))
+        data = await asyncio.shield(loading)
+
+        session = self._cache.get(key)
+        if session is not None:
+            return session  # -> loaded by another call while it was being read.
+        if self._known(key):
+            return self._insert(key)  # -> discarded while it was being read.
+        return self._insert(key, data)
+
+    async def preload(self, update: Update[Any]) -> None:
+        """Loads sessions of the update's sender and chat, if they're not in memory."""
+        for key in (user_key(update), chat_key(update)):
+            if key is not None and key not in self._cache:
+                await self.load(key)
+
+    def of(self, update: Update[Any], chat: bool = False) -> Session:
+        """Returns the session of the update's sender, or it's chat.
+
+        Args:
+            update (`Update`): The update.
+            chat (`bool`, optional): Use the chat's session instead. Defaults to False.
+        """
+        key = chat_key(update) if chat else user_key(update)
+        if key is None:
+            raise ValueError(
+                f"Update {update.update_id} has no {'chat' if chat else 'user'} to have a session."
+            )
+        return self.get(key)
+
+    def discard(self, key: str) -> None:
+        """Removes a session, from the backend too."""
+        self._cache.pop(key, None)
+        self._evicted.pop(key, None)
+        if self._backend is not None:
+            self._evicted[key] = {}  # -> an empty session is deleted when it's flushed.
+            self._schedule_flush()
+
+    async def flush(self) -> None:
+        """Writes changed sessions to the backend now.
+
+        If it fails, the batch is kept to be written with the next one, and the error is raised.
+        """
+        batch = self._take_batch()
+        if not batch or self._backend is None:
+            return
+
+        self._pending.append(batch)
+        try:
+            async with self._writing:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self._backend.save_many, batch
+                )
+        except BaseException:
+            self._requeue(batch)
+            raise
+        finally:
+            self._pending.remove(batch)
+
+    async def close(self) -> None:
+        """Writes changed sessions, then closes the backend."""
+        await self.flush()
+        if self._backend is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._backend.close)
+
+    def _take_batch(self) -> dict[str, dict[str, Any]]:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if self._backend is None:
+            self._dirty.clear()
+            return {}
+
+        batch = self._evicted
+        self._evicted = {}
+        for key in self._dirty:
+            session = self._cache.get(key)
+            if session is not None:
+                # -> it's written on another thread, while handlers may change it.
+                batch[key] = copy.deepcopy(session._data)
+        self._dirty.clear()
+        return batch
+
+    def _known(self, key: str) -> bool:
+        # -> the backend may not have it yet.
+        return key in self._evicted or any(key in batch for batch in self._pending)
+
+    def _insert(self, key: str, data: Optional[dict[str, Any]] = None) -> Session:
+        if key in self._evicted:
+            data = self._evicted.pop(key)
+            self._dirty.add(key)
+        else:
+            for batch in reversed(self._pending):  # -> newest batch wins.
+                if key in batch:
+                    data = copy.deepcopy(batch[key])
+                    break
+
+        session = Session(self, key, data)
+        self._cache[key] = session
+        while len(self._cache) > self._max_size:
+            self._evict()
+        return session
+
+    def _requeue(self, batch: dict[str, dict[str, Any]]):
+        for key, data in batch.items():
+            if key in self._dirty or key in self._evicted:
+                continue  # -> changed again, newer data is written.
+            if key in self._cache:
+                self._dirty.add(key)
+            else:
+                self._evicted[key] = data
+        self._schedule_flush()
+
+    def _flush_in_background(self):
+        self._flush_handle = None
+
+        async def flush():
+            try:
+                await self.flush()
+            except Exception:
+                dispatcher_logger.exception(
+                    "Failed to write sessions, retrying in %ss.", self._flush_interval
+                )
+
+        self._flush_task = asyncio.create_task(flush())
+
+    def _evict(self):
+        key, session = self._cache.popitem(last=False)
+        if key in self._dirty:
+            self._dirty.discard(key)
+            if self._backend is not None:
+                self._evicted[key] = copy.deepcopy(session._data)
+
+    def _mark_dirty(self, key: str):
+        if self._backend is None:
+            return
+        self._dirty.add(key)
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._flush_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # -> no loop, changes are written on `flush` or `close`.
+        self._flush_handle = loop.call_later(
+            self._flush_interval, self._flush_in_background
+        )
@@ -0,0 +1,46 @@
+from ._stages.stage_template import UpdateStage
+from ._stages.staleness import (
+    AGGREGATED,
+    STALE,
+    StaleAction,
+    StalenessPolicy,
+    StalePolicy,
+    batch_ages,
+    update_age,
+)
+from ._stages.media_group import (
+    MAX_MEDIA_GROUP_SIZE,
+    MEDIA_GROUP,
+    MediaGroupStage,
+    media_group_of,
+)
+from ._stages.throttle import (
+    COLLAPSED,
+    THROTTLED,
+    Throttle,
+    ThrottleAction,
+    ThrottleRule,
+    ThrottleScope,
+)
+
+
+__all__ = [
+    "UpdateStage",
+    "AGGREGATED",
+    "STALE",
+    "StaleAction",
+    "StalenessPolicy",
+    "StalePolicy",
+    "batch_ages",
+    "update_age",
+    "COLLAPSED",
+    "THROTTLED",
+    "Throttle",
+    "ThrottleAction",
+    "ThrottleRule",
+    "ThrottleScope",
+    "MAX_MEDIA_GROUP_SIZE",
+    "MEDIA_GROUP",
+    "MediaGroupStage",
+    "media_group_of",
+]
@@ -0,0 +1,129 @@
+import asyncio
+from typing import TYPE_CHECKING, Any, Hashable, Optional
+
+from telegrambots.wrapper.types.objects import Message
+
+from ...logs import hot_path_logger
+from .stage_template import UpdateStage
+
+if TYPE_CHECKING:
+    from telegrambots.wrapper.types.objects import Update
+
+    from ...dispatcher import Dispatcher
+
+
+MEDIA_GROUP = "media_group"
+"""Update metadata key: all messages of the album, ordered by message id."""
+
+MAX_MEDIA_GROUP_SIZE = 10
+"""Telegram doesn't send albums bigger than this."""
+
+
+def media_group_of(update: "Update[Message]") -> list[Message]:
+    """Returns messages of the album that the update represents, or only it's message if it's not an album."""
+    if update.has_metadata(MEDIA_GROUP):
+        return update.get_metadata(MEDIA_GROUP, [])
+    return [update.actual_update]
+
+
+class _Album:
+    __slots__ = ("updates", "timer")
+
+    def __init__(self) -> None:
+        self.updates: list["Update[Message]"] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class MediaGroupStage(UpdateStage):
+    """Buffers messages of an album ( same `media_group_id` ), and dispatches them as one update.
+
+    Messages of an album arrive as separate updates. They're held until no more of them comes
+    for `wait` seconds, then only the first one goes on ( the one with caption, usually ) with
+    all messages as `MEDIA_GROUP` metadata, see `media_group_of`. Held updates pass the stages
+    after this one only, and albums that are still held when the dispatcher stops are dispatched then.
+
+    Example:
+        ```py
+        dp.add_stage(MediaGroupStage(wait=0.5))
+
+        @dp.add.handlers.via_decorator.message(mf.any_message)
+        async def photos(context: MessageContext):
+            album = media_group_of(context.wrapper_update)
+            await context.reply_text(f"Got {len(album)} photos.")
+        ```
+
+    Args:
+        wait (`float`, optional): Seconds to wait for next messages of an album. Defaults to 0.5.
+    """
+
+    def __init__(self, wait: float = 0.5) -> None:
+        self.wait = wait
+        self._albums: dict[tuple[Hashable, str], _Album] = {}
+        self._dp: Optional["Dispatcher"] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of albums that are held."""
+        return len(self._albums)
+
+    async def __process__(
+        self, dp: "Dispatcher", updates: list["Update[Any]"]
+    ) -> list["Update[Any]"]:
+        self._dp = dp
+        passed: list["Update[Any]"] = []
+        for update in updates:
+            actual = update.actual_update
+            group_id = getattr(actual, "media_group_id", None)
+            if not isinstance(actual, Message) or group_id is None:
+                passed.append(update)
+                continue
+
+            key = (actual.chat.id, group_id)
+            album = self._albums.get(key)
+            if album is None:
+                album = self._albums[key] = _Album()
+            album.updates.append(update)
+
+            if album.timer is not None:
+                album.timer.cancel()
+            if len(album.updates) >= MAX_MEDIA_GROUP_SIZE:
+                self._release(key)
+            else:
+                album.timer = asyncio.get_running_loop().call_later(
+                    self.wait, self._release, key
+                )
+        return passed
+
+    def flush(self):
+        """Dispatches all held albums now, in background."""
+        for key in list(self._albums):
+            self._release(key)
+
+    async def close(self, dp: "Dispatcher") -> None:
+        for key in list(self._albums):
+            first = self._take(key)
+            if first is not None:
+                await dp.feed_after(self, [first])
+
+    def _release(self, key: tuple[Hashable, str]):
+        first = self._take(key)
+        if first is not None and self._dp is not None:
+            self._dp.run_background(self._dp.feed_after(self, [first]))
+
+    def _take(self, key: tuple[Hashable, str]) -> Optional["Update[Message]"]:
+        album = self._albums.pop(key, None)
+        if album is None:
+            return None
+        if album.timer is not None:
+            album.timer.cancel()
+
+        updates = sorted(album.updates, key=lambda x: x.actual_update.message_id)
+        first = updates[0]
+        first._set_metadata(  # type: ignore
+            MEDIA_GROUP, [x.actual_update for x in updates]
+        )
+        if hot_path_logger.should_log():
+            hot_path_logger.log(
+                "Dispatching album %s of %d messages", key[1], len(updates)
+            )
+        return first
@@ -0,0 +1,38 @@
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from telegrambots.wrapper.types.objects import Update
+
+    from ...dispatcher import Dispatcher
+
+
+class UpdateStage(ABC):
+    """A step that updates pass before they are routed to handlers.
+
+    Stages see updates in batches ( as they're fed ), and can drop, merge,
+    reorder or mark them. Stages run in the order they're added to the dispatcher.
+    """
+
+    @abstractmethod
+    async def __process__(
+        self, dp: "Dispatcher", updates: list["Update[Any]"]
+    ) -> list["Update[Any]"]:
+        """Processes a batch of updates.
+
+        Args:
+            dp (`Dispatcher`): The dispatcher.
+            updates (`list[Update]`): Updates in the order they were fed.
+
+        Returns:
+            `list[Update]`: Updates that should go on, in the order they should be processed.
+        """
+        ...
+
+    async def close(self, dp: "Dispatcher") -> None:
+        """Called when the dispatcher stops, before the bot is closed. e.g. to dispatch held updates.
+
+        Args:
+            dp (`Dispatcher`): The dispatcher.
+        """
+        return None
@@ -0,0 +1,215 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Literal, Optional
+
+from telegrambots.wrapper.types.objects import CallbackQuery
+
+from ...general import PRIORITY
+from ...logs import hot_path_logger
+from .stage_template import UpdateStage
+
+if TYPE_CHECKING:
+    from telegrambots.wrapper.types.objects import Update
+
+    from ...dispatcher import Dispatcher
+
+
+StaleAction = Literal["drop", "aggregate", "low_priority"]
+
+STALE = "stale"
+"""Update metadata key: age of a stale update in seconds."""
+AGGREGATED = "aggregated"
+"""Update metadata key: older stale updates that were merged into this one."""
+
+
+def update_age(update: "Update[Any]", now: float) -> Optional[float]:
+    """Age of an update in seconds, from it's `date` ( e.g. `Message.date` ).
+
+    Returns None for updates that have no date ( e.g. callback queries ), see `batch_ages`.
+    """
+    date = getattr(update.actual_update, "date", None)
+    if isinstance(date, int):
+        return now - date
+    return None
+
+
+def batch_ages(updates: list["Update[Any]"], now: float) -> list[Optional[float]]:
+    """Ages of a batch of updates in seconds, None if it's unknown.
+
+    Updates without a date ( e.g. callback queries ) are sent before updates with greater ids,
+    so they're at least as old as the oldest of those that have a date. That lower bound is their age.
+    ( `CallbackQuery.message.date` is not used, it's the date of the message, not of the press. )
+    """
+    ages = [update_age(x, now) for x in updates]
+    oldest_after: Optional[float] = None
+    for index in sorted(
+        range(len(updates)), key=lambda i: updates[i].update_id, reverse=True
+    ):
+        age = ages[index]
+        if age is None:
+            ages[index] = oldest_after
+        elif oldest_after is None or age > oldest_after:
+            oldest_after = age
+    return ages
+
+
+def _chat_or_sender(update: "Update[Any]") -> Optional[Hashable]:
+    actual = update.actual_update
+    chat = getattr(actual, "chat", None)
+    if chat is not None:
+        return chat.id
+    user = getattr(actual, "from_user", None)
+    if user is not None:
+        return user.id
+    return None
+
+
+@dataclass
+class StalePolicy:
+    """What to do with updates of a type that are older than `max_age`."""
+
+    max_age: float
+    action: StaleAction = "drop"
+    aggregate_by: Callable[["Update[Any]"], Optional[Hashable]] = _chat_or_sender
+    answer_text: Optional[str] = None
+    """Answer for stale callback queries ( if they're dropped or aggregated ), empty answer if None."""
+
+
+class StalenessPolicy(UpdateStage):
+    """Sheds load of stale updates ( e.g. a backlog after an outage ), per update type.
+
+    Age of an update comes from it's `date`. Update types without one ( like `CallbackQuery` ) are
+    as old as the oldest dated update that comes after them in the same batch, see `batch_ages`.
+    If there's none, their age is unknown and they're kept.
+
+    Actions:
+        - `drop`: stale updates are ignored. Stale callback queries are answered ( best effort ),
+            so buttons stop loading.
+        - `aggregate`: only the newest stale update of each chat ( or `aggregate_by` key ) is processed,
+            older ones are available as `AGGREGATED` metadata of it.
+        - `low_priority`: stale updates are processed after fresh ones, with `PRIORITY` metadata set to -1.
+
+    Stale updates that go on have `STALE` metadata set to their age.
+
+    Example:
+        ```py
+        dp.add_stage(
+            StalenessPolicy()
+            .set(Message, max_age=60, action="aggregate")
+            .set(ChatJoinRequest, max_age=3600, action="low_priority")
+            .set(CallbackQuery, max_age=30, action="drop", answer_text="Expired, try again.")
+        )
+        ```
+    """
+
+    def __init__(self) -> None:
+        self.policies: dict[type[Any], StalePolicy] = {}
+        self.dropped = 0
+
+    def set(
+        self,
+        update_type: type[Any],
+        max_age: float,
+        action: StaleAction = "drop",
+        *,
+        aggregate_by: Optional[Callable[["Update[Any]"], Optional[Hashable]]] = None,
+        answer_text: Optional[str] = None,
+    ):
+        """Sets the policy of an update type.
+
+        Args:
+            update_type (`type[Any]`): Type of updates, like `Message`.
+            max_age (`float`): Updates older than this ( seconds ) are stale.
+            action (`StaleAction`, optional): What to do with stale updates. Defaults to "drop".
+            aggregate_by (`Callable[[Update], Optional[Hashable]]`, optional): Key to aggregate by,
+                chat or sender by default. Updates with None key are dropped.
+            answer_text (`Optional[str]`, optional): Text to answer stale callback queries with.
+        """
+        if action not in ("drop", "aggregate", "low_priority"):
+            raise ValueError(f"Unknown action: {action}")
+
+        self.policies[update_type] = StalePolicy(
+            max_age, action, aggregate_by or _chat_or_sender, answer_text
+        )
+        return self
+
+    async def __process__(
+        self, dp: "Dispatcher", updates: list["Update[Any]"]
+    ) -> list["Update[Any]"]:
+        if not self.policies:
+            return updates
+
+        now = time.time()
+        fresh: list["Update[Any]"] = []
+        late: list["Update[Any]"] = []
+        aggregated: dict[tuple[type[Any], Hashable], "Update[Any]"] = {}
+        expired: list[tuple[CallbackQuery, Optional[str]]] = []
+        ages = batch_ages(updates, now)
+
+        for update, age in zip(updates, ages):
+            try:
+                policy = self.policies.get(update.update_type)
+            except ValueError:
+                policy = None  # -> unknown update type, dispatcher reports it.
+            if policy is None:
+                fresh.append(update)
+                continue
+
+            if age is None or age <= policy.max_age:
+                fresh.append(update)
+                continue
+
+            update._set_metadata(STALE, age)  # type: ignore
+            if policy.action == "low_priority":
+                update._set_metadata(PRIORITY, -1)  # type: ignore
+                late.append(update)
+                continue
+
+            key = policy.aggregate_by(update) if policy.action == "aggregate" else None
+            if key is not None:
+                group = (update.update_type, key)
+                previous = aggregated.get(group)
+                if previous is not None:
+                    # -> updates come in order, so the newer one replaces.
+                    older: list[Any] = previous.get_metadata(AGGREGATED, [])
+                    update._set_metadata(AGGREGATED, older + [previous])  # type: ignore
+                    self._shed(previous, policy, expired)
+                aggregated[group] = update
+                continue
+
+            self._shed(update, policy, expired)
+
+        if expired:
+            self._answer(dp, expired)
+
+        if not late and not aggregated:
+            return fresh
+        # -> stale ones after fresh ones, in their original order.
+        order = {id(x): i for i, x in enumerate(updates)}
+        return fresh + sorted(
+            late + list(aggregated.values()), key=lambda x: order[id(x)]
+        )
+
+    def _shed(
+        self,
+        update: "Update[Any]",
+        policy: StalePolicy,
+        expired: list[tuple[CallbackQuery, Optional[str]]],
+    ):
+        self.dropped += 1
+        if isinstance(update.actual_update, CallbackQuery):
+            expired.append((update.actual_update, policy.answer_text))
+        if hot_path_logger.should_log():
+            hot_path_logger.log("Shed stale update %s", update.update_id)
+
+    @staticmethod
+    def _answer(dp: "Dispatcher", expired: list[tuple[CallbackQuery, Optional[str]]]):
+        async def answer():
+            # -> best effort, they may be too old to answer anyway.
+            await asyncio.gather(
+                *(dp.bot.answer_callback_query(q.id, text) for q, text in expired),
+                return_exceptions=True,
+            )
+
+        dp.run_background(answer())
@@ -0,0 +1,262 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Hashable, Literal, Optional
+
+from ...logs import hot_path_logger
+from .stage_template import UpdateStage
+
+if TYPE_CHECKING:
+    from telegrambots.wrapper.types.objects import Update
+
+    from ...dispatcher import Dispatcher
+
+
+ThrottleAction = Literal["drop", "collapse", "route"]
+ThrottleScope = Literal["user", "chat"]
+
+THROTTLED = "throttled"
+"""Update metadata key: scope of the rule that throttled the update."""
+COLLAPSED = "collapsed"
+"""Update metadata key: older throttled updates that were collapsed into this one."""
+
+
+def _sender(update: "Update[Any]") -> Optional[Hashable]:
+    user = getattr(update.actual_update, "from_user", None)
+    if user is not None:
+        return user.id
+    return None
+
+
+def _chat(update: "Update[Any]") -> Optional[Hashable]:
+    actual = update.actual_update
+    chat = getattr(actual, "chat", None)
+    if chat is None:
+        chat = getattr(getattr(actual, "message", None), "chat", None)
+    if chat is not None:
+        return chat.id
+    return None
+
+
+class _Window:
+    """Sliding window counter, estimates the count from current and previous fixed windows."""
+
+    __slots__ = ("start", "current", "previous", "routed")
+
+    def __init__(self, start: float) -> None:
+        self.start = start
+        self.current = 0
+        self.previous = 0
+        self.routed = False
+
+    def hit(self, now: float, window: float) -> float:
+        elapsed = now - self.start
+        if elapsed >= window:
+            periods = int(elapsed // window)
+            self.previous = self.current if periods == 1 else 0
+            self.current = 0
+            self.start += periods * window
+            self.routed = False
+        self.current += 1
+        return self.previous * (1 - (now - self.start) / window) + self.current
+
+
+class _Collapsed:
+    """Throttled updates of a key that are held until its window ends."""
+
+    __slots__ = ("updates", "timer")
+
+    def __init__(self) -> None:
+        self.updates: list["Update[Any]"] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+@dataclass
+class ThrottleRule:
+    """Updates of a key ( user or chat ) over `limit` in `window` seconds are throttled."""
+
+    scope: str
+    limit: int
+    window: float
+    action: ThrottleAction = "drop"
+    key: Callable[["Update[Any]"], Optional[Hashable]] = _sender
+    handler_tag: Optional[str] = None
+    """Tag of the handler that throttled updates are routed to ( for `route` )."""
+    windows: dict[Hashable, _Window] = field(default_factory=dict, repr=False)
+    pruned_at: float = field(default=0, repr=False)
+
+
+class Throttle(UpdateStage):
+    """Flood control, throttles users or chats that send too many updates, before any filter is checked.
+
+    Each key costs a counter update, no matter how many updates it sends.
+
+    Actions:
+        - `drop`: throttled updates are ignored.
+        - `collapse`: throttled updates of a key are held until the key's window ends, then only
+            the newest one goes on ( passing the stages after this one only ), older ones are available
+            as `COLLAPSED` metadata of it. So a flooding key gets at most one update per window,
+            no matter how they're batched. Held updates are dispatched when the dispatcher stops.
+        - `route`: the first throttled update of a key in each window goes to `handler_tag` only ( to warn
+            the user, for example ), others are dropped. The handler should be registered with
+            `continue_after=[THROTTLED]`, so it's not used for other updates.
+
+    Updates that go on have `THROTTLED` metadata set to the scope of the rule.
+
+    Example:
+        ```py
+        dp.add.handlers.message("slow_down", slow_down, continue_after=[THROTTLED])
+
+        dp.add_stage(
+            Throttle()
+            .set("user", limit=20, window=10, action="route", handler_tag="slow_down")
+            .set("chat", limit=100, window=10, action="collapse")
+        )
+        ```
+    """
+
+    def __init__(self) -> None:
+        self.rules: list[ThrottleRule] = []
+        self.dropped = 0
+        self._collapsed: dict[tuple[int, Hashable], _Collapsed] = {}
+        self._dp: Optional["Dispatcher"] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of keys that have collapsed updates held."""
+        return len(self._collapsed)
+
+    def set(
+        self,
+        scope: ThrottleScope,
+        limit: int,
+        window: float,
+        action: ThrottleAction = "drop",
+        *,
+        key: Optional[Callable[["Update[Any]"], Optional[Hashable]]] = None,
+        handler_tag: Optional[str] = None,
+    ):
+        """Adds a rule, rules are checked in the order they're added.
+
+        Args:
+            scope (`ThrottleScope`): Count updates per `user` or per `chat`.
+            limit (`int`): Maximum updates of a key in the window.
+            window (`float`): Length of the window in seconds.
+            action (`ThrottleAction`, optional): What to do with throttled updates. Defaults to "drop".
+            key (`Callable[[Update], Optional[Hashable]]`, optional): Custom key instead of the scope's.
+                Updates with None key are not counted.
+            handler_tag (`Optional[str]`, optional): Handler of throttled updates, for `route`.
+        """
+        if scope not in ("user", "chat"):
+            raise ValueError(f"Unknown scope: {scope}")
+        if action not in ("drop", "collapse", "route"):
+            raise ValueError(f"Unknown action: {action}")
+        if action == "route" and not handler_tag:
+            raise ValueError("handler_tag is required to route throttled updates.")
+        if limit <= 0 or window <= 0:
+            raise ValueError("limit and window should be positive.")
+
+        self.rules.append(
+            ThrottleRule(
+                scope,
+                limit,
+                window,
+                action,
+                key or (_sender if scope == "user" else _chat),
+                handler_tag,
+            )
+        )
+        return self
+
+    async def __process__(
+        self, dp: "Dispatcher", updates: list["Update[Any]"]
+    ) -> list["Update[Any]"]:
+        if not self.rules:
+            return updates
+
+        self._dp = dp
+        now = time.monotonic()  # -> windows shouldn't jump when the wall clock does.
+        passed: list["Update[Any]"] = []
+
+        for update in updates:
+            throttled: Optional[tuple[int, ThrottleRule, Hashable, _Window]] = None
+            for i, rule in enumerate(self.rules):
+                key = rule.key(update)
+                if key is None:
+                    continue
+                window = rule.windows.get(key)
+                if window is None:
+                    window = rule.windows[key] = _Window(now)
+                # -> counts every rule, so a flood keeps all of them up to date.
+                if window.hit(now, rule.window) > rule.limit and throttled is None:
+                    throttled = (i, rule, key, window)
+
+            if throttled is None:
+                passed.append(update)
+                continue
+
+            i, rule, key, window = throttled
+            if rule.action == "collapse":
+                self._hold((i, key), update, window.start + rule.window - now)
+            elif rule.action == "route" and not window.routed:
+                window.routed = True
+                update._set_metadata(THROTTLED, rule.scope)  # type: ignore
+                dp.run_background(dp.process_with(rule.handler_tag, update))  # type: ignore
+            else:
+                self._drop(update)
+
+        for rule in self.rules:
+            self._prune(rule, now)
+        return passed
+
+    async def close(self, dp: "Dispatcher") -> None:
+        for key in list(self._collapsed):
+            newest = self._take(key)
+            if newest is not None:
+                await dp.feed_after(self, [newest])
+
+    def _hold(self, key: tuple[int, Hashable], update: "Update[Any]", delay: float):
+        held = self._collapsed.get(key)
+        if held is None:
+            held = self._collapsed[key] = _Collapsed()
+            # -> the timer is loop time, which is monotonic too.
+            held.timer = asyncio.get_running_loop().call_later(
+                max(delay, 0), self._release, key
+            )
+        elif held.updates:
+            self._drop(held.updates[-1])  # -> only the newest one goes on.
+        held.updates.append(update)
+
+    def _release(self, key: tuple[int, Hashable]):
+        newest = self._take(key)
+        if newest is not None and self._dp is not None:
+            self._dp.run_background(self._dp.feed_after(self, [newest]))
+
+    def _take(self, key: tuple[int, Hashable]) -> Optional["Update[Any]"]:
+        held = self._collapsed.pop(key, None)
+        if held is None or not held.updates:
+            return None
+        if held.timer is not None:
+            held.timer.cancel()
+
+        *older, newest = held.updates
+        newest._set_metadata(THROTTLED, self.rules[key[0]].scope)  # type: ignore
+        if older:
+            newest._set_metadata(COLLAPSED, older)  # type: ignore
+        return newest
+
+    def _drop(self, update: "Update[Any]"):
+        self.dropped += 1
+        if hot_path_logger.should_log():
+            hot_path_logger.log("Throttled update %s", update.update_id)
+
+    @staticmethod
+    def _prune(rule: ThrottleRule, now: float):
+        # -> at most once a window, so it's still O(1) per update.
+        if now - rule.pruned_at < rule.window:
+            return
+        rule.pruned_at = now
+        for key in [
+            k for k, w in rule.windows.items() if now - w.start >= 2 * rule.window
+        ]:
+            del rule.windows[key]
@@ -0,0 +1,4 @@
+from .fake_server import FakeBotApiServer, RecordedRequest
+
+
+__all__ = ["FakeBotApiServer", "RecordedRequest"]
@@ -0,0 +1,510 @@
+import asyncio
+import itertools
+import json
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Optional,
+)
+
+from aiohttp import web
+from telegrambots.wrapper.types.objects import Update
+
+FILE_METHODS = {
+    "sendDocument": "document",
+    "sendPhoto": "photo",
+    "sendVideo": "video",
+    "sendAudio": "audio",
+    "sendAnimation": "animation",
+    "sendSticker": "sticker",
+    "sendVoice": "voice",
+    "sendVideoNote": "video_note",
+}
+
+JSON_FIELDS = frozenset(
+    {
+        "reply_markup",
+        "entities",
+        "caption_entities",
+        "explanation_entities",
+        "allowed_updates",
+        "media",
+        "results",
+        "commands",
+        "scope",
+        "options",
+        "permissions",
+        "message_ids",
+        "reply_parameters",
+        "link_preview_options",
+        "prices",
+        "shipping_options",
+        "menu_button",
+    }
+)
+"""Parameters that are sent as JSON in forms, others ( like `text` or `chat_id` ) are kept as they're sent."""
+
+
+def _chat_id(chat_id: Any) -> Any:
+    # -> "@channel" usernames are kept as is.
+    try:
+        return int(chat_id)
+    except ValueError:
+        return chat_id
+
+
+@dataclass
+class RecordedRequest:
+    """A request that fake server received."""
+
+    method: str
+    params: dict[str, Any]
+    files: dict[str, int] = field(default_factory=dict)  # -> field name: size
+    received_at: float = field(default_factory=time.time)
+    status: int = 200
+
+
+class FakeBotApiServer:
+    """A local fake of Telegram Bot API, to test bots offline and under load.
+
+    Implements `getMe`, `getUpdates`, `sendMessage`, `answerCallbackQuery`,
+    `editMessageText` and file sending methods. Updates are pushed by you
+    ( or a script ), and requests are recorded ( the latest `max_requests` ones ).
+
+    Example:
+        ```py
+        async with FakeBotApiServer() as server:
+            bot = TelegramBot(server.token, base_url=server.url)
+            server.push_message("/start", user_id=1)
+        ```
+    """
+
+    def __init__(
+        self,
+        token: str = "123456:FAKE",
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float | Callable[[str], float] = 0,
+        rate_limit_probability: float = 0,
+        retry_after: int = 1,
+        max_poll_timeout: float = 1,
+        max_requests: Optional[int] = 100_000,
+        seed: Optional[int] = None,
+    ) -> None:
+        """Creates the fake server. Call `start` or use `async with` to run it.
+
+        Args:
+            token (`str`, optional): The only token that server accepts.
+            host (`str`, optional): Host to listen on. Defaults to "127.0.0.1".
+            port (`int`, optional): Port to listen on, a free port if 0. Defaults to 0.
+            latency (`float | Callable[[str], float]`, optional): Seconds to wait before answering a request,
+                or a function that takes api method name and returns seconds. Defaults to 0.
+            rate_limit_probability (`float`, optional): Probability of answering with 429 ( except `getUpdates` ). Defaults to 0.
+            retry_after (`int`, optional): `retry_after` parameter of 429 responses. Defaults to 1.
+            max_poll_timeout (`float`, optional): `getUpdates` waits at most this long, no matter what bot asks. Defaults to 1.
+            max_requests (`Optional[int]`, optional): Recorded requests to keep, older ones are dropped.
+                None keeps all of them. Defaults to 100000.
+            seed (`int`, optional): Seed for rate limit injection.
+        """
+        self.token = token
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.rate_limit_probability = rate_limit_probability
+        self.retry_after = retry_after
+        self.max_poll_timeout = max_poll_timeout
+
+        self.requests: deque[RecordedRequest] = deque(maxlen=max_requests)
+        self.bot_user: dict[str, Any] = {
+            "id": int(token.split(":")[0]),
+            "is_bot": True,
+            "first_name": "Fake bot",
+            "username": "fake_bot",
+        }
+
+        self._random = random.Random(seed)
+        self._updates: list[dict[str, Any]] = []
+        self._new_updates = asyncio.Condition()
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+        self._handlers: dict[str, Callable[[dict[str, Any]], Awaitable[Any] | Any]] = {
+            "getMe": lambda _: self.bot_user,
+            "sendMessage": self._send_message,
+            "answerCallbackQuery": lambda _: True,
+            "editMessageText": self._edit_message_text,
+        }
+        for method, kind in FILE_METHODS.items():
+            self._handlers[method] = self._file_sender(kind)
+
+        self._runner: Optional[web.AppRunner] = None
+        self._scripts: list["asyncio.Task[None]"] = []
+        self._notifying: set["asyncio.Task[None]"] = set()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_: Any):
+        await self.stop()
+
+    @property
+    def url(self) -> str:
+        """Base url to pass to `TelegramBot`."""
+        return f"http://{self.host}:{self.port}"
+
+    def calls(self, method: str) -> list[RecordedRequest]:
+        """Returns recorded requests of an api method."""
+        return [x for x in self.requests if x.method == method]
+
+    def clear(self):
+        """Forgets recorded requests."""
+        self.requests.clear()
+
+    def add_method(
+        self, method: str, handle: Callable[[dict[str, Any]], Awaitable[Any] | Any]
+    ):
+        """Adds or replaces an api method.
+
+        Args:
+            method (`str`): Api method name, like `"sendChatAction"`.
+            handle (`Callable[[dict[str, Any]], Any]`): Takes request parameters and returns the result.
+        """
+        self._handlers[method] = handle
+
+    async def start(self):
+        """Starts listening."""
+        app = web.Application(client_max_size=50 * 1024**2)
+        app.router.add_route("*", "/bot{token}/{method}", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def stop(self):
+        """Stops running scripts and the server."""
+        for task in self._scripts:
+            task.cancel()
+        await asyncio.gather(*self._scripts, return_exceptions=True)
+        self._scripts.clear()
+        await asyncio.gather(*self._notifying, return_exceptions=True)
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    # region Updates
+
+    def push_update(self, update: dict[str, Any] | Update[Any]) -> dict[str, Any]:
+        """Queues an update for `getUpdates`. `update_id` is set if missing.
+
+        Args:
+            update (`dict[str, Any] | Update`): The update to queue.
+        """
+        if isinstance(update, Update):
+            update = update.serialize()  # type: ignore
+        data: dict[str, Any] = dict(update)  # type: ignore
+        data.setdefault("update_id", next(self._update_ids))
+        self._updates.append(data)
+        try:
+            task = asyncio.get_running_loop().create_task(self._notify())
+        except RuntimeError:
+            pass  # -> no one can be waiting without a running loop.
+        else:
+            self._notifying.add(task)  # -> the loop only keeps a weak reference.
+            task.add_done_callback(self._notifying.discard)
+        return data
+
+    def push_message(
+        self,
+        text: str,
+        user_id: int = 1,
+        chat_id: Optional[int] = None,
+        chat_type: str = "private",
+        date: Optional[int] = None,
+        **fields: Any,
+    ) -> dict[str, Any]:
+        """Queues a message update.
+
+        Args:
+            text (`str`): Text of the message.
+            user_id (`int`, optional): The sender. Defaults to 1.
+            chat_id (`int`, optional): The chat, same as sender if not given.
+            chat_type (`str`, optional): Type of the chat. Defaults to "private".
+            date (`int`, optional): Unix time of the message, now if not given.
+            **fields (`Any`): Other fields of the message.
+        """
+        return self.push_update(
+            {
+                "message": {
+                    "message_id": next(self._message_ids),
+                    "date": int(time.time()) if date is None else date,
+                    "chat": {"id": chat_id or user_id, "type": chat_type},
+                    "from": self._user(user_id),
+                    "text": text,
+                    **fields,
+                }
+            }
+        )
+
+    def push_callback_query(
+        self,
+        data: str,
+        user_id: int = 1,
+        message_id: Optional[int] = None,
+        chat_id: Optional[int] = None,
+    ) -> dict[str, Any]:
+        """Queues a callback query update.
+
+        Args:
+            data (`str`): Data of the callback query.
+            user_id (`int`, optional): The sender. Defaults to 1.
+            message_id (`int`, optional): Id of the message with the button.
+            chat_id (`int`, optional): The chat of the message, same as sender if not given.
+        """
+        return self.push_update(
+            {
+                "callback_query": {
+                    "id": str(next(self._update_ids)),
+                    "from": self._user(user_id),
+                    "chat_instance": str(chat_id or user_id),
+                    "data": data,
+                    "message": {
+                        "message_id": message_id or next(self._message_ids),
+                        "date": int(time.time()),
+                        "chat": {"id": chat_id or user_id, "type": "private"},
+                        "from": self.bot_user,
+                    },
+                }
+            }
+        )
+
+    def run_script(
+        self,
+        script: Callable[["FakeBotApiServer"], AsyncIterator[Any] | Awaitable[Any]],
+    ):
+        """Runs a coroutine or an async generator that pushes updates, in background.
+
+        Args:
+            script (`Callable[[FakeBotApiServer], AsyncIterator[Any] | Awaitable[Any]]`): Takes the server.
+        """
+
+        async def run():
+            result = script(self)
+            if hasattr(result, "__aiter__"):
+                async for _ in result:  # type: ignore
+                    pass
+            else:
+                await result  # type: ignore
+
+        self._scripts.append(asyncio.create_task(run()))
+
+    def generate(
+        self,
+        factory: Callable[[int], dict[str, Any]],
+        count: int,
+        rate: Optional[float] = None,
+    ):
+        """Pushes `count` updates made by `factory` in background.
+
+        Args:
+            factory (`Callable[[int], dict[str, Any]]`): Takes a sequence number and returns an update.
+            count (`int`): Number of updates to push.
+            rate (`float`, optional): Updates per second, all at once if not given.
+        """
+
+        async def script(server: "FakeBotApiServer"):
+            started = time.perf_counter()
+            for index in range(count):
+                if rate:
+                    delay = started + index / rate - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                server.push_update(factory(index))
+
+        self.run_script(script)
+
+    @property
+    def pending_updates(self) -> int:
+        """Number of updates that bot has not confirmed yet."""
+        return len(self._updates)
+
+    async def _notify(self):
+        async with self._new_updates:
+            self._new_updates.notify_all()
+
+    async def _get_updates(self, params: dict[str, Any]):
+        offset = int(params.get("offset") or 0)
+        limit = int(params.get("limit") or 100)
+        timeout = min(float(params.get("timeout") or 0), self.max_poll_timeout)
+        allowed = params.get("allowed_updates") or None
+
+        if offset:
+            self._updates = [x for x in self._updates if x["update_id"] >= offset]
+
+        def select():
+            return [
+                x
+                for x in self._updates
+                if allowed is None or any(key in x for key in allowed)
+            ][:limit]
+
+        selected = select()
+        if not selected and timeout > 0:
+            async with self._new_updates:
+                try:
+                    await asyncio.wait_for(
+                        self._new_updates.wait_for(lambda: bool(select())), timeout
+                    )
+                except asyncio.TimeoutError:
+                    pass
+            selected = select()
+        return selected
+
+    # endregion
+
+    # region Api methods
+
+    def _user(self, user_id: int) -> dict[str, Any]:
+        return {"id": user_id, "is_bot": False, "first_name": f"User {user_id}"}
+
+    def _message(self, chat_id: Any, **fields: Any) -> dict[str, Any]:
+        return {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": _chat_id(chat_id), "type": "private"},
+            "from": self.bot_user,
+            **{k: v for k, v in fields.items() if v is not None},
+        }
+
+    def _send_message(self, params: dict[str, Any]):
+        return self._message(params["chat_id"], text=params.get("text"))
+
+    def _edit_message_text(self, params: dict[str, Any]):
+        if "inline_message_id" in params:
+            return True
+        message = self._message(params["chat_id"], text=params.get("text"))
+        message["message_id"] = int(params["message_id"])
+        message["edit_date"] = message["date"]
+        return message
+
+    def _file_sender(self, kind: str):
+        def send(params: dict[str, Any]):
+            file = {
+                "file_id": f"fake-{kind}-{next(self._message_ids)}",
+                "file_unique_id": "fake",
+            }
+            if kind == "photo":
+                media: Any = [file | {"width": 1, "height": 1}]
+            elif kind in ("video", "animation", "video_note"):
+                media = file | {"width": 1, "height": 1, "duration": 1, "length": 1}
+            elif kind in ("audio", "voice"):
+                media = file | {"duration": 1}
+            elif kind == "sticker":
+                media = file | {
+                    "width": 1,
+                    "height": 1,
+                    "is_animated": False,
+                    "is_video": False,
+                }
+            else:
+                media = file
+            return self._message(
+                params["chat_id"], caption=params.get("caption"), **{kind: media}
+            )
+
+        return send
+
+    # endregion
+
+    async def _read_params(
+        self, request: web.Request, recorded: RecordedRequest
+    ) -> dict[str, Any]:
+        params: dict[str, Any] = dict(request.query)
+        if request.content_type == "application/json":
+            params |= await request.json()
+        elif request.content_type == "multipart/form-data":
+            reader = await request.multipart()
+            async for part in reader:  # type: ignore
+                if part.filename:  # type: ignore
+                    size = 0
+                    while chunk := await part.read_chunk():  # type: ignore
+                        size += len(chunk)
+                    recorded.files[part.name] = size  # type: ignore
+                    params[part.name] = part.filename  # type: ignore
+                else:
+                    params[part.name] = await part.text()  # type: ignore
+        elif request.can_read_body:
+            params |= dict(await request.post())
+
+        for key, value in params.items():
+            if key in JSON_FIELDS and isinstance(value, str):
+                try:
+                    params[key] = json.loads(value)
+                except ValueError:
+                    pass
+        return params
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        recorded = RecordedRequest(method, {})
+        self.requests.append(recorded)
+
+        if request.match_info["token"] != self.token:
+            return self._error(recorded, 401, "Unauthorized")
+
+        recorded.params = await self._read_params(request, recorded)
+
+        latency = self.latency(method) if callable(self.latency) else self.latency
+        if latency > 0:
+            await asyncio.sleep(latency)
+
+        if method == "getUpdates":
+            return self._ok(await self._get_updates(recorded.params))
+
+        if (
+            self.rate_limit_probability
+            and self._random.random() < self.rate_limit_probability
+        ):
+            return self._error(
+                recorded,
+                429,
+                f"Too Many Requests: retry after {self.retry_after}",
+                {"retry_after": self.retry_after},
+            )
+
+        handle = self._handlers.get(method)
+        if handle is None:
+            return self._error(recorded, 404, "Not Found")
+
+        result = handle(recorded.params)
+        if asyncio.iscoroutine(result):
+            result = await result
+        return self._ok(result)
+
+    @staticmethod
+    def _ok(result: Any) -> web.Response:
+        return web.json_response({"ok": True, "result": result})
+
+    @staticmethod
+    def _error(
+        recorded: RecordedRequest,
+        code: int,
+        description: str,
+        parameters: Optional[dict[str, Any]] = None,
+    ) -> web.Response:
+        recorded.status = code
+        body: dict[str, Any] = {
+            "ok": False,
+            "error_code": code,
+            "description": description,
+        }
+        if parameters:
+            body["parameters"] = parameters
+        return web.json_response(body, status=code)